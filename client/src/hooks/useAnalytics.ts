@@ -0,0 +1,41 @@
+import { useQuery } from "react-query";
+import { analyticsAPI, AnalyticsRange } from "../services/api";
+
+const analyticsOptions = {
+  staleTime: 5 * 60 * 1000, // 5 minutes
+  cacheTime: 10 * 60 * 1000, // 10 minutes
+};
+
+export const useFleetSummary = (params?: AnalyticsRange) => {
+  return useQuery(
+    ["analytics", "summary", params],
+    () => analyticsAPI.getSummary(params),
+    analyticsOptions
+  );
+};
+
+export const useCarrierAnalytics = (params?: AnalyticsRange) => {
+  return useQuery(
+    ["analytics", "carriers", params],
+    () => analyticsAPI.getCarriers(params),
+    analyticsOptions
+  );
+};
+
+export const useDriverAnalytics = (params?: AnalyticsRange) => {
+  return useQuery(
+    ["analytics", "drivers", params],
+    () => analyticsAPI.getDrivers(params),
+    analyticsOptions
+  );
+};
+
+export const useDailyAnalytics = (
+  params?: AnalyticsRange & { by?: "carrier" }
+) => {
+  return useQuery(
+    ["analytics", "daily", params],
+    () => analyticsAPI.getDaily(params),
+    analyticsOptions
+  );
+};
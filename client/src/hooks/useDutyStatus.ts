@@ -39,6 +39,7 @@ export const useCreateDutyStatus = () => {
           "dutyStatuses",
           variables.tripId.toString(),
         ]);
+        queryClient.invalidateQueries(["trip", variables.tripId.toString()]);
       },
     }
   );
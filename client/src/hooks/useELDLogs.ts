@@ -32,6 +32,7 @@ export const useELDLogs = (tripId: string) => {
           .then((res) => res.data),
       onSuccess: () => {
         queryClient.invalidateQueries({ queryKey: ["eldLogs", tripId] });
+        queryClient.invalidateQueries({ queryKey: ["trip", tripId] });
       },
     }
   );
@@ -1,36 +1,24 @@
 import { useQuery } from "react-query";
-import { api, Trip, DutyStatus, ELDLog } from "../services/api";
+import { api, TripBundle } from "../services/api";
 
+// The trip page's trip, duty statuses and ELD logs come from one request.
 export const useTripDetails = (tripId: string) => {
-  const tripQuery = useQuery<Trip, Error>({
-    queryKey: ["trip", tripId],
-    queryFn: () => api.get(`/api/trips/${tripId}/`).then((res) => res.data),
-    enabled: !!tripId,
-  });
-
-  const dutyStatusQuery = useQuery<DutyStatus[], Error>({
-    queryKey: ["dutyStatuses", tripId],
-    queryFn: () =>
-      api.get(`/api/trips/${tripId}/duty-status/`).then((res) => res.data),
-    enabled: !!tripId,
-  });
-
-  const eldLogQuery = useQuery<ELDLog[], Error>({
-    queryKey: ["eldLogs", tripId],
+  const bundleQuery = useQuery<TripBundle, Error>({
+    queryKey: ["trip", tripId, "bundle"],
     queryFn: () =>
-      api.get(`/api/trips/${tripId}/eld-logs/`).then((res) => res.data),
+      api.get(`/api/trips/${tripId}/bundle/`).then((res) => res.data),
     enabled: !!tripId,
   });
 
   return {
-    trip: tripQuery.data,
-    tripLoading: tripQuery.isLoading,
-    tripError: tripQuery.error,
-    dutyStatuses: dutyStatusQuery.data,
-    dutyStatusLoading: dutyStatusQuery.isLoading,
-    dutyStatusError: dutyStatusQuery.error,
-    eldLogs: eldLogQuery.data,
-    eldLogLoading: eldLogQuery.isLoading,
-    eldLogError: eldLogQuery.error,
+    trip: bundleQuery.data?.trip,
+    tripLoading: bundleQuery.isLoading,
+    tripError: bundleQuery.error,
+    dutyStatuses: bundleQuery.data?.duty_statuses,
+    dutyStatusLoading: bundleQuery.isLoading,
+    dutyStatusError: bundleQuery.error,
+    eldLogs: bundleQuery.data?.eld_logs,
+    eldLogLoading: bundleQuery.isLoading,
+    eldLogError: bundleQuery.error,
   };
 };
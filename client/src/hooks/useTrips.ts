@@ -1,7 +1,12 @@
 import { useQuery, useMutation, useQueryClient } from 'react-query';
 import { tripsAPI, Trip } from '../services/api';
 
-export const useTrips = (params?: { status?: string; limit?: number; offset?: number }) => {
+export const useTrips = (params?: {
+  status?: string;
+  limit?: number;
+  offset?: number;
+  view?: "summary";
+}) => {
   return useQuery(['trips', params], () => tripsAPI.getTrips(params), {
     staleTime: 5 * 60 * 1000, // 5 minutes
     cacheTime: 10 * 60 * 1000, // 10 minutes
@@ -21,6 +26,7 @@ export const useCreateTrip = () => {
   return useMutation(tripsAPI.createTrip, {
     onSuccess: () => {
       queryClient.invalidateQueries(['trips']);
+      queryClient.invalidateQueries(['analytics']);
     },
   });
 };
@@ -34,6 +40,7 @@ export const useUpdateTrip = () => {
     {
       onSuccess: (data) => {
         queryClient.invalidateQueries(['trips']);
+        queryClient.invalidateQueries(['analytics']);
         queryClient.setQueryData(['trip', data.id], data);
       },
     }
@@ -46,6 +53,7 @@ export const useDeleteTrip = () => {
   return useMutation(tripsAPI.deleteTrip, {
     onSuccess: () => {
       queryClient.invalidateQueries(['trips']);
+      queryClient.invalidateQueries(['analytics']);
     },
   });
 };
@@ -88,7 +88,9 @@ const AdminDashboard: React.FC = () => {
   // React Query Hooks for data fetching and mutations
   const { data: carriers = [], isLoading: carriersLoading } = useCarriers();
   const { data: vehicles = [], isLoading: vehiclesLoading } = useVehicles();
-  const { data: trips = [], isLoading: tripsLoading } = useTrips();
+  const { data: trips = [], isLoading: tripsLoading } = useTrips({
+    view: "summary",
+  });
   const { data: drivers = [], isLoading: driversLoading } = useDrivers();
   const createCarrierMutation = useCreateCarrier();
   const deleteCarrierMutation = useDeleteCarrier();
@@ -19,6 +19,7 @@ import {
 import { useTrips, useUpdateTrip, useDeleteTrip } from "../hooks/useTrips";
 import { useVehicles } from "../hooks/useVehicles";
 import { useDrivers } from "../hooks/useDrivers";
+import { useFleetSummary } from "../hooks/useAnalytics";
 import Button from "../components/UI/Button";
 import Card from "../components/UI/Card";
 import Input from "../components/UI/Input";
@@ -33,28 +34,21 @@ const ManagerDashboard: React.FC = () => {
   const [tripToDelete, setTripToDelete] = useState<number | null>(null);
 
   // API hooks
-  const { data: trips = [], isLoading, error } = useTrips();
+  // The summary view carries only what the trip table and stats read.
+  const { data: trips = [], isLoading, error } = useTrips({ view: "summary" });
   const { data: vehicles = [] } = useVehicles();
   const { data: drivers = [] } = useDrivers();
   const updateTripMutation = useUpdateTrip();
   const deleteTripMutation = useDeleteTrip();
 
-  // Calculate summary stats from real data (carrier-wide)
-  const inProgressTrips = trips.filter((trip) => trip.status === "IN_PROGRESS");
-  const completedTrips = trips.filter((trip) => trip.status === "COMPLETED");
-  const totalFuelConsumed = trips.reduce(
-    (sum, trip) => sum + Number(trip.fuel_used || 0),
-    0
-  );
-  const totalMiles = trips.reduce(
-    (sum, trip) => sum + Number(trip.total_miles || 0),
-    0
-  );
-  
+  // Carrier-wide stats are aggregated by the server
+  const { data: summary } = useFleetSummary();
+  const inProgressCount = summary?.status_counts.IN_PROGRESS ?? 0;
+  const completedCount = summary?.status_counts.COMPLETED ?? 0;
+  const totalFuelConsumed = summary?.fuel_used ?? 0;
+
   // Fleet fuel efficiency (kilometers per liter)
-  const fleetFuelEfficiency = totalFuelConsumed > 0 
-    ? (totalMiles / totalFuelConsumed).toFixed(1) 
-    : "0.0";
+  const fleetFuelEfficiency = (summary?.fuel_efficiency ?? 0).toFixed(1);
 
   // Filter trips based on search, status, and vehicle
   const filteredTrips = trips.filter((trip) => {
@@ -219,7 +213,7 @@ const ManagerDashboard: React.FC = () => {
                       In Progress
                     </p>
                     <p className="text-2xl font-bold text-gray-900 dark:text-white">
-                      {inProgressTrips.length}
+                      {inProgressCount}
                     </p>
                   </div>
                 </div>
@@ -243,7 +237,7 @@ const ManagerDashboard: React.FC = () => {
                       Completed
                     </p>
                     <p className="text-2xl font-bold text-gray-900 dark:text-white">
-                      {completedTrips.length}
+                      {completedCount}
                     </p>
                   </div>
                 </div>
@@ -188,6 +188,13 @@ export interface RouteResponse {
   total_miles: number;
 }
 
+export interface TripBundle {
+  trip: Trip;
+  duty_statuses: DutyStatus[];
+  eld_logs: ELDLog[];
+  route?: { total_miles: number; duty_statuses: DutyStatus[] };
+}
+
 // Auth API
 export const authAPI = {
   login: async (
@@ -226,9 +233,11 @@ export const tripsAPI = {
     status?: string;
     limit?: number;
     offset?: number;
+    view?: "summary";
   }): Promise<Trip[]> => {
     const response = await api.get("/api/trips/", { params });
-    return response.data;
+    // Requests with a limit get a cursor page rather than a bare list.
+    return Array.isArray(response.data) ? response.data : response.data.results;
   },
 
   getTrip: async (id: number): Promise<Trip> => {
@@ -391,4 +400,86 @@ export const driversAPI = {
   },
 };
 
+// Analytics API (aggregated server-side over the trips the user can see)
+export interface AnalyticsRange {
+  start?: string;
+  end?: string;
+}
+
+export interface TripTotals {
+  trips: number;
+  completed_trips: number;
+  total_miles: number;
+  fuel_used: number;
+  total_engine_hours: number;
+  fuel_efficiency: number | null;
+}
+
+export interface FleetSummary extends TripTotals {
+  status_counts: Record<Trip["status"], number>;
+}
+
+export interface CarrierTotals extends TripTotals {
+  carrier: number;
+  carrier_name: string;
+}
+
+export interface DriverTotals extends TripTotals {
+  driver: number;
+  carrier: number;
+  driver_name: string;
+}
+
+export interface DailyTotals {
+  date: string;
+  carrier?: number;
+  trips_started: number;
+  completed_trips: number;
+  total_miles: number;
+  fuel_consumed: number;
+  total_engine_hours: number;
+  total_idle_hours: number;
+}
+
+export const analyticsAPI = {
+  getSummary: async (params?: AnalyticsRange): Promise<FleetSummary> => {
+    const response = await api.get("/api/analytics/summary/", { params });
+    return response.data;
+  },
+
+  getCarriers: async (params?: AnalyticsRange): Promise<CarrierTotals[]> => {
+    const response = await api.get("/api/analytics/carriers/", { params });
+    return response.data;
+  },
+
+  getDrivers: async (params?: AnalyticsRange): Promise<DriverTotals[]> => {
+    const response = await api.get("/api/analytics/drivers/", { params });
+    return response.data;
+  },
+
+  getDaily: async (
+    params?: AnalyticsRange & { by?: "carrier" }
+  ): Promise<DailyTotals[]> => {
+    const response = await api.get("/api/analytics/daily/", { params });
+    return response.data;
+  },
+};
+
+// Batch API: several GETs in one round trip, answered in order
+export interface BatchResult<T = unknown> {
+  path: string;
+  status: number;
+  body: T;
+}
+
+export const batchAPI = {
+  get: async (paths: string[]): Promise<BatchResult[]> => {
+    const response = await api.post(
+      "/api/batch/",
+      paths.map((path) => ({ path }))
+    );
+    return response.data;
+  },
+};
+
 export default api;
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from apps.core.principal import remember_principal
+from .tokens import principal_from_token
+
+
+class JWTDriverAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that loads the user's driver profile in the same query,
+    so resolving the request principal needs no query of its own.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = self.user_model.objects.select_related("driver").get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+class JWTClaimsAuthentication(JWTDriverAuthentication):
+    """
+    Authenticates from the principal claims in the access token, without a
+    database query, and returns a TokenUser instead of a User.
+
+    Requests fall back to loading the user when the token has no principal
+    claims, when the method is not in ``JWT_CLAIMS_AUTH_METHODS`` (safe
+    methods by default), or when the view sets ``claims_authentication =
+    False`` because it needs the full User row.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        principal = principal_from_token(validated_token)
+        if principal is None or not self.allows_claims(request):
+            return self.get_user(validated_token), validated_token
+        remember_principal(request, principal)
+        return api_settings.TOKEN_USER_CLASS(validated_token), validated_token
+
+    def allows_claims(self, request):
+        methods = getattr(
+            settings, "JWT_CLAIMS_AUTH_METHODS", ("GET", "HEAD", "OPTIONS")
+        )
+        if request.method not in methods:
+            return False
+        view = (getattr(request, "parser_context", None) or {}).get("view")
+        return getattr(view, "claims_authentication", True)
@@ -1,6 +1,10 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth.models import User
 from apps.core.models import Driver, Carrier
+from .tokens import access_token_for
 
 
 class RegisterSerializer(serializers.Serializer):
@@ -34,3 +38,26 @@ class RegisterSerializer(serializers.Serializer):
 class LoginSerializer(serializers.Serializer):
     username = serializers.CharField()
     password = serializers.CharField(write_only=True)
+
+
+class PrincipalTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Issues refreshed access tokens with the user's current principal claims,
+    so role and carrier changes reach the claims within one access lifetime.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        refresh = self.token_class(data.get("refresh", attrs["refresh"]))
+        user = (
+            User.objects.select_related("driver")
+            .filter(
+                **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]},
+                is_active=True,
+            )
+            .first()
+        )
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        data["access"] = str(access_token_for(refresh, user))
+        return data
@@ -1,3 +1,80 @@
-from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from apps.core.factories import (
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_user,
+    create_vehicle,
+)
 
-# Create your tests here.
+
+class ClaimsAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        self.carrier = create_carrier()
+        self.user = create_user(email="d1@example.com", password="password123")
+        self.driver = create_driver(self.carrier, self.user)
+        self.trip = create_trip(self.driver, create_vehicle(self.carrier))
+
+    def login(self):
+        response = self.client.post(
+            "/api/auth/login/",
+            {"username": "driver1", "password": "password123"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response.data
+
+    def request(self, method, url, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, **kwargs)
+        return response, [query["sql"] for query in queries]
+
+    def test_login_issues_principal_claims(self):
+        access = AccessToken(self.login()["access"])
+        self.assertEqual(access["driver_id"], self.driver.id)
+        self.assertEqual(access["role"], "DRIVER")
+        self.assertEqual(access["carrier_id"], self.carrier.id)
+        self.assertFalse(access["is_staff"])
+
+    def test_reads_skip_the_user_and_driver_queries(self):
+        self.login()
+        response, queries = self.request("get", "/api/trips/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([trip["id"] for trip in response.data], [self.trip.id])
+        # Only the trip listing and its ETag aggregate.
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(all('FROM "core_trip"' in query for query in queries))
+
+    def test_writes_and_profile_load_the_user(self):
+        self.login()
+        response, queries = self.request("get", "/api/user-info/")
+        self.assertEqual(response.data["email"], "d1@example.com")
+        self.assertEqual(response.data["driver_id"], self.driver.id)
+        self.assertIn('FROM "auth_user"', queries[0])
+
+        response, queries = self.request(
+            "post", f"/api/trips/{self.trip.id}/eld-logs/generate/", data={}
+        )
+        self.assertIn('FROM "auth_user"', queries[0])
+
+    def test_tokens_without_claims_still_authenticate(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response, queries = self.request("get", "/api/trips/")
+        self.assertEqual(len(response.data), 1)
+        self.assertIn('FROM "auth_user"', queries[0])
+
+    def test_refresh_reissues_current_claims(self):
+        refresh = self.login()["refresh"]
+        self.driver.role = "MANAGER"
+        self.driver.save()
+        response = self.client.post(
+            "/api/auth/refresh/", {"refresh": refresh}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data["access"])["role"], "MANAGER")
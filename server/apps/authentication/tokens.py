@@ -0,0 +1,29 @@
+"""
+Access tokens that carry the user's principal as claims, so read requests
+can be authorized without loading the user or driver rows.
+"""
+
+from rest_framework_simplejwt.settings import api_settings
+from apps.core.principal import Principal, principal_for_user
+
+PRINCIPAL_CLAIMS = ("is_staff", "is_superuser", "driver_id", "role", "carrier_id")
+
+
+def access_token_for(refresh, user):
+    """An access token for ``refresh`` with the user's current principal claims."""
+    access = refresh.access_token
+    principal = principal_for_user(user)
+    access["username"] = user.get_username()
+    for name in PRINCIPAL_CLAIMS:
+        access[name] = getattr(principal, name)
+    return access
+
+
+def principal_from_token(token):
+    """The principal in a token's claims, or None for tokens issued without them."""
+    if any(name not in token for name in PRINCIPAL_CLAIMS):
+        return None
+    return Principal(
+        user_id=token[api_settings.USER_ID_CLAIM],
+        **{name: token[name] for name in PRINCIPAL_CLAIMS},
+    )
@@ -6,6 +6,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from drf_yasg.utils import swagger_auto_schema
 from .serializers import RegisterSerializer, LoginSerializer
+from .tokens import access_token_for
 from django.contrib.auth import get_user_model
 from datetime import timedelta
 
@@ -27,7 +28,7 @@ class RegisterView(generics.CreateAPIView):
             return Response(
                 {
                     "refresh": str(refresh),
-                    "access": str(refresh.access_token),
+                    "access": str(access_token_for(refresh, user)),
                 },
                 status=status.HTTP_201_CREATED,
             )
@@ -55,7 +56,7 @@ class LoginView(APIView):
                 return Response(
                     {
                         "refresh": str(refresh),
-                        "access": str(refresh.access_token),
+                        "access": str(access_token_for(refresh, user)),
                     },
                     status=status.HTTP_200_OK,
                 )
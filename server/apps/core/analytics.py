@@ -0,0 +1,149 @@
+"""
+Fleet analytics read from the daily rollup tables.
+
+Every function takes a rollup queryset that is already scoped to what the
+caller may see and to the requested date range, so the cost of a query
+depends on the number of days asked for rather than on the size of the trip
+and ELD log history. Summary, carrier and driver totals are those of the
+trips starting in the range, as stored on each trip; the daily rows give the
+miles, fuel, engine and idle hours the ELD logs record for each day.
+"""
+
+from django.db.models import Sum
+
+from .models import CarrierDailyRollup, DailyRollup
+
+TRIP_STATUSES = list(DailyRollup.TRIP_COUNT_FIELDS)
+
+
+def number(value):
+    """Aggregates are None for empty groups and Decimal for decimal columns."""
+    return float(value) if value is not None else 0.0
+
+
+def carrier_field(rollups):
+    """The carrier of a row: its key for carrier rollups, the driver's otherwise."""
+    return "carrier" if rollups.model is CarrierDailyRollup else "driver__carrier"
+
+
+def rollup_metrics():
+    return {f"sum_{name}": Sum(name) for name in DailyRollup.METRIC_FIELDS}
+
+
+def status_counts(row):
+    return {
+        status: row[f"sum_{field}"] or 0
+        for status, field in DailyRollup.TRIP_COUNT_FIELDS.items()
+    }
+
+
+def trip_row(row):
+    counts = status_counts(row)
+    miles, fuel = number(row["sum_trip_miles"]), number(row["sum_trip_fuel_used"])
+    return {
+        "trips": sum(counts.values()),
+        "completed_trips": counts["COMPLETED"],
+        "total_miles": miles,
+        "fuel_used": fuel,
+        "total_engine_hours": number(row["sum_trip_engine_hours"]),
+        "fuel_efficiency": miles / fuel if fuel else None,
+    }
+
+
+def has_activity(row):
+    """Rollup rows can be left at zero when the logs and trips behind them go away."""
+    return any(row[f"sum_{name}"] for name in DailyRollup.METRIC_FIELDS)
+
+
+def fleet_summary(rollups):
+    """Headline totals plus the number of trips in each status."""
+    row = rollups.aggregate(**rollup_metrics())
+    summary = trip_row(row)
+    summary["status_counts"] = status_counts(row)
+    return summary
+
+
+def carrier_totals(rollups):
+    """Totals per carrier."""
+    carrier = carrier_field(rollups)
+    rows = (
+        rollups.values(carrier, f"{carrier}__name")
+        .annotate(**rollup_metrics())
+        .order_by(f"{carrier}__name")
+    )
+    return [
+        {
+            "carrier": row[carrier],
+            "carrier_name": row[f"{carrier}__name"],
+            **trip_row(row),
+        }
+        for row in rows
+        if has_activity(row)
+    ]
+
+
+def driver_totals(rollups):
+    """Totals per driver, largest mileage first."""
+    rows = (
+        rollups.values(
+            "driver",
+            "driver__carrier",
+            "driver__user__username",
+            "driver__user__first_name",
+            "driver__user__last_name",
+        )
+        .annotate(**rollup_metrics())
+        .order_by("-sum_trip_miles", "driver")
+    )
+    return [
+        {
+            "driver": row["driver"],
+            "carrier": row["driver__carrier"],
+            "driver_name": " ".join(
+                name
+                for name in (
+                    row["driver__user__first_name"],
+                    row["driver__user__last_name"],
+                )
+                if name
+            )
+            or row["driver__user__username"],
+            **trip_row(row),
+        }
+        for row in rows
+        if has_activity(row)
+    ]
+
+
+def daily_totals(rollups, by_carrier=False):
+    """
+    One row per day (and carrier, with ``by_carrier``): trips started that
+    day, and miles, fuel, engine and idle hours logged that day.
+    """
+    carrier = carrier_field(rollups)
+    keys = ["day", carrier] if by_carrier else ["day"]
+    # Order by the carrier id rather than the carrier, which would join
+    # Carrier for its default ordering.
+    rows = (
+        rollups.values(*keys)
+        .annotate(**rollup_metrics())
+        .order_by(*keys[:1], *(f"{key}_id" for key in keys[1:]))
+    )
+    days = []
+    for row in rows:
+        if not has_activity(row):
+            continue
+        counts = status_counts(row)
+        day = {
+            "date": row["day"],
+            "trips_started": sum(counts.values()),
+            "completed_trips": counts["COMPLETED"],
+            "total_miles": number(row["sum_total_miles"]),
+            "fuel_consumed": number(row["sum_fuel_consumed"]),
+            "total_engine_hours": number(row["sum_total_engine_hours"]),
+            "total_idle_hours": number(row["sum_total_idle_hours"]),
+        }
+        if by_carrier:
+            day["carrier"] = row[carrier]
+        days.append(day)
+    return days
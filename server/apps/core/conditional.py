@@ -0,0 +1,121 @@
+"""
+ETag and Last-Modified validators for conditional GETs.
+
+Every model carries ``updated_at``, and every write path keeps it current
+(including the .update() and bulk paths), so a representation is unchanged
+as long as the rows it is built from and the related rows its serializer
+reads keep their ``updated_at``. Validators come from one COUNT/MAX aggregate
+that loads no rows. The count in the ETag notices deletions as well as edits;
+MAX(updated_at) does not, so lists are sent without Last-Modified.
+"""
+
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .principal import get_principal
+from .serializers import query_plan
+
+
+def timestamped_relations(model, serializer):
+    """
+    The select_related paths the serializer reads whose models have an
+    ``updated_at`` column, e.g. ``driver`` and ``driver__carrier``.
+    """
+    select, _, _ = query_plan(serializer)
+    paths = []
+    for path in select:
+        parts = path.split("__")
+        for depth in range(1, len(parts) + 1):
+            prefix = "__".join(parts[:depth])
+            related = related_model(model, parts[:depth])
+            if related is not None and prefix not in paths and has_updated_at(related):
+                paths.append(prefix)
+    return paths
+
+
+def related_model(model, parts):
+    for part in parts:
+        try:
+            model = model._meta.get_field(part).related_model
+        except FieldDoesNotExist:
+            return None
+        if model is None:
+            return None
+    return model
+
+
+def has_updated_at(model):
+    try:
+        model._meta.get_field("updated_at")
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def aggregate_validators(request, queryset, relations=()):
+    """
+    (etag, last_modified) for the rows of a queryset, from one aggregate
+    that loads none of them. Empty querysets get an ETag but no
+    Last-Modified.
+    """
+    aggregates = {"count": Count("pk"), "updated_0": Max("updated_at")}
+    for index, path in enumerate(relations, start=1):
+        aggregates[f"updated_{index}"] = Max(f"{path}__updated_at")
+    row = queryset.order_by().aggregate(**aggregates)
+    stamps = [value for name, value in row.items() if name != "count" and value]
+    return make_validators(request, row["count"], stamps)
+
+
+def collection_validators(request, queryset, relations=()):
+    """
+    aggregate_validators() without Last-Modified. Deleting a row leaves the
+    newest ``updated_at`` where it was, so If-Modified-Since alone would
+    answer 304 for a list that lost rows; only the ETag is trusted.
+    """
+    etag, _ = aggregate_validators(request, queryset, relations)
+    return etag, None
+
+
+def make_validators(request, count, stamps):
+    """
+    The ETag also covers the full path, so ?fields=, ?view= and cursors get
+    their own, and the principal, so one browser's accounts never share one.
+    """
+    raw = "|".join(
+        [
+            request.get_full_path(),
+            str(get_principal(request).user_id),
+            str(count),
+            *(stamp.isoformat() for stamp in stamps),
+        ]
+    )
+    etag = '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+    last_modified = int(max(stamps).timestamp()) if stamps else None
+    return etag, last_modified
+
+
+def conditional_response(request, validators, render):
+    """
+    Returns 304 Not Modified when the request's If-None-Match or
+    If-Modified-Since match ``validators``, and ``render()`` otherwise.
+    Either way the response carries the validators and must be revalidated
+    before reuse.
+    """
+    etag, last_modified = validators
+    http_request = getattr(request, "_request", request)
+    response = get_conditional_response(
+        http_request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = render()
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+        patch_vary_headers(response, ["Authorization"])
+    return response
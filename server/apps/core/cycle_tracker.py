@@ -0,0 +1,125 @@
+"""
+Rolling 70-hour/8-day cycle totals.
+
+A CycleWindow holds a driver's on-duty minutes for the eight days ending on
+its newest day, in a ring buffer indexed by day ordinal, and their running
+sum. Adding a duty status's minutes and reading the hours used or left as of
+a day touch at most eight slots, however long the driver's history is.
+DriverCycle stores one window per driver; duty status writes feed it through
+record_cycle_minutes() in models.py.
+"""
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .duty_grid import ON_DUTY_STATUSES, local_midnight
+from .hos_logic import HOSCalculator
+
+CYCLE_DAYS = 8
+CYCLE_LIMIT_MINUTES = int(HOSCalculator.MAX_CYCLE_HOURS * 60)
+
+
+def on_duty_minutes_by_day(status, start_time, end_time):
+    """
+    {day: minutes} of a duty status cut at local midnight, empty for
+    statuses that do not count towards the cycle.
+    """
+    if status not in ON_DUTY_STATUSES or end_time <= start_time:
+        return {}
+    minutes = {}
+    day = timezone.localtime(start_time).date()
+    last = timezone.localtime(end_time).date()
+    while day <= last:
+        start = max(start_time, local_midnight(day))
+        end = min(end_time, local_midnight(day + timedelta(days=1)))
+        count = round((end - start).total_seconds() / 60)
+        if count:
+            minutes[day] = count
+        day += timedelta(days=1)
+    return minutes
+
+
+def cycle_changes(old, new):
+    """
+    {day: minutes} to add to a cycle when a duty status given as (status,
+    start_time, end_time) changes from ``old`` to ``new``; either may be None.
+    """
+    changes = dict(on_duty_minutes_by_day(*new)) if new else {}
+    for day, minutes in (on_duty_minutes_by_day(*old) if old else {}).items():
+        changes[day] = changes.get(day, 0) - minutes
+    return {day: minutes for day, minutes in changes.items() if minutes}
+
+
+class CycleWindow:
+    """
+    The ring buffer itself. ``last_day`` is the newest day held; slot
+    ``day.toordinal() % CYCLE_DAYS`` holds the minutes of each of the eight
+    days ending on it. Minutes for days that have left the window are
+    dropped, since they can no longer count towards any cycle.
+    """
+
+    __slots__ = ("last_day", "minutes", "total")
+
+    def __init__(self, last_day, minutes=None, total=None):
+        self.last_day = last_day
+        self.minutes = list(minutes or [0] * CYCLE_DAYS)
+        self.total = sum(self.minutes) if total is None else total
+
+    @classmethod
+    def from_days(cls, last_day, day_minutes):
+        """A window ending on ``last_day`` from {day: minutes}."""
+        window = cls(last_day)
+        for day, minutes in day_minutes.items():
+            window.add(day, minutes)
+        return window
+
+    def first_day(self):
+        return self.last_day - timedelta(days=CYCLE_DAYS - 1)
+
+    def slot(self, day):
+        return day.toordinal() % CYCLE_DAYS
+
+    def advance(self, day):
+        """Moves the window forward to end on ``day``, emptying the days it passes."""
+        if day <= self.last_day:
+            return
+        if day - self.last_day >= timedelta(days=CYCLE_DAYS):
+            self.minutes = [0] * CYCLE_DAYS
+            self.total = 0
+        else:
+            expired = self.first_day()
+            while expired <= day - timedelta(days=CYCLE_DAYS):
+                self.total -= self.minutes[self.slot(expired)]
+                self.minutes[self.slot(expired)] = 0
+                expired += timedelta(days=1)
+        self.last_day = day
+
+    def add(self, day, minutes):
+        self.advance(day)
+        if day < self.first_day():
+            return
+        self.minutes[self.slot(day)] += minutes
+        self.total += minutes
+
+    def used_minutes(self, day):
+        """
+        On-duty minutes in the eight days ending on ``day``, or None when the
+        window has already moved past the start of that cycle.
+        """
+        if day < self.last_day:
+            return None
+        used = self.total
+        expired = self.first_day()
+        while expired <= min(self.last_day, day - timedelta(days=CYCLE_DAYS)):
+            used -= self.minutes[self.slot(expired)]
+            expired += timedelta(days=1)
+        return used
+
+
+def cycle_summary(day, used_minutes):
+    return {
+        "date": day,
+        "on_duty_hours": used_minutes / 60,
+        "available_hours": max(0, CYCLE_LIMIT_MINUTES - used_minutes) / 60,
+    }
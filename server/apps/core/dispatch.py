@@ -0,0 +1,128 @@
+"""
+Dispatch ranking: a carrier's drivers and vehicles nearest a pickup.
+
+A driver or vehicle is wherever its latest trip last reported
+(``current_latitude``/``current_longitude``); those on a trip in progress are
+not available. The query itself drops positions outside a bounding box
+around the pickup through the spatial cell index (geocell.py), and the rest
+get great-circle distances in one vectorized pass with the formula the
+planner uses (hos_batch.calculate_distances).
+
+Drivers are ranked by the hours it takes to drive to the pickup, keeping
+only those whose remaining 70-hour cycle covers that drive plus the hours
+the load needs; more remaining hours break ties. Vehicles are ranked by
+distance.
+"""
+
+import numpy as np
+from django.db.models import OuterRef, Subquery
+
+from .cycle_tracker import CYCLE_LIMIT_MINUTES
+from .geocell import bounding_box, within_box
+from .hos_batch import calculate_distances
+from .hos_logic import HOSCalculator
+from .models import Driver, Trip, Vehicle, fleet_cycle_minutes
+
+
+def latest_positions(owners, owner_field, box):
+    """
+    (owner_id, trip_id, latitude, longitude) of the latest trip of each of
+    ``owners`` inside ``box``, skipping owners whose latest trip is in progress.
+    """
+    latest = (
+        Trip.objects.filter(**{owner_field: OuterRef("pk")})
+        .order_by("-start_time", "-id")
+        .values("id")[:1]
+    )
+    trips = Trip.objects.filter(
+        within_box(box, "current_cell", "current_latitude", "current_longitude"),
+        id__in=owners.annotate(latest_trip=Subquery(latest)).values("latest_trip"),
+    ).exclude(status="IN_PROGRESS")
+    return list(
+        trips.values_list(owner_field, "id", "current_latitude", "current_longitude")
+    )
+
+
+def nearby(positions, latitude, longitude, radius_miles):
+    """Owner ids, trip ids, coordinates and distances of the positions within range."""
+    owners = np.array([row[0] for row in positions], dtype=np.int64)
+    trips = np.array([row[1] for row in positions], dtype=np.int64)
+    coordinates = np.array([row[2:] for row in positions], dtype=float).reshape(-1, 2)
+    distances = calculate_distances(coordinates, [latitude, longitude])
+    within = distances <= radius_miles
+    return owners[within], trips[within], coordinates[within], distances[within]
+
+
+def candidate(owner, trip, coordinates, distance):
+    return {
+        "id": int(owner),
+        "trip": int(trip),
+        "location": [float(coordinates[1]), float(coordinates[0])],
+        "distance_miles": round(float(distance), 1),
+    }
+
+
+def rank_drivers(
+    carrier_id, latitude, longitude, radius_miles, hours_needed=0.0, limit=20
+):
+    """The carrier's available drivers within ``radius_miles``, best first."""
+    positions = latest_positions(
+        Driver.objects.filter(carrier=carrier_id),
+        "driver",
+        bounding_box(latitude, longitude, radius_miles),
+    )
+    owners, trips, coordinates, distances = nearby(
+        positions, latitude, longitude, radius_miles
+    )
+    used = fleet_cycle_minutes(owners.tolist())
+    used_minutes = np.array([used[owner] for owner in owners.tolist()], dtype=float)
+    available = np.maximum(CYCLE_LIMIT_MINUTES - used_minutes, 0) / 60
+    to_pickup = distances / HOSCalculator.AVERAGE_SPEED_MPH
+    eligible = np.flatnonzero(available >= to_pickup + hours_needed)
+    # np.lexsort sorts by its last key first.
+    order = eligible[np.lexsort((-available[eligible], to_pickup[eligible]))][:limit]
+
+    names = {
+        driver.id: driver.user.get_full_name() or driver.user.username
+        for driver in Driver.objects.filter(
+            id__in=owners[order].tolist()
+        ).select_related("user")
+    }
+    return [
+        {
+            **candidate(
+                owners[index], trips[index], coordinates[index], distances[index]
+            ),
+            "name": names.get(int(owners[index]), ""),
+            "hours_to_pickup": round(float(to_pickup[index]), 2),
+            "available_hours": round(float(available[index]), 2),
+        }
+        for index in order
+    ]
+
+
+def rank_vehicles(carrier_id, latitude, longitude, radius_miles, limit=20):
+    """The carrier's available vehicles within ``radius_miles``, nearest first."""
+    positions = latest_positions(
+        Vehicle.objects.filter(carrier=carrier_id),
+        "vehicle",
+        bounding_box(latitude, longitude, radius_miles),
+    )
+    owners, trips, coordinates, distances = nearby(
+        positions, latitude, longitude, radius_miles
+    )
+    order = np.argsort(distances, kind="stable")[:limit]
+    numbers = dict(
+        Vehicle.objects.filter(id__in=owners[order].tolist()).values_list(
+            "id", "vehicle_number"
+        )
+    )
+    return [
+        {
+            **candidate(
+                owners[index], trips[index], coordinates[index], distances[index]
+            ),
+            "vehicle_number": numbers.get(int(owners[index]), ""),
+        }
+        for index in order
+    ]
@@ -0,0 +1,235 @@
+"""
+Fixed-slot daily duty grids.
+
+A driver's day is the 24-hour log grid of the FMCSA forms: 1440 one-minute
+slots from local midnight, each holding the code of the duty status logged
+for that minute (0 when nothing was logged). Minutes claimed by more than one
+status are marked in a second byte array. Per-status totals, gaps, overlaps
+and the runs a grid is drawn from are then array operations rather than
+walks over DutyStatus rows.
+
+Grids are built from the statuses logged on every trip of the driver,
+leaving out those materialized from a route plan as the cycle tracker does,
+and kept in Django's cache
+under a per-driver generation, so an 8-day recap costs two cache round trips
+once warm. Anything that writes a driver's duty statuses calls
+forget_driver_grids(); DutyStatus.save() does so through a signal.
+"""
+
+import uuid
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+SLOTS_PER_DAY = 24 * 60
+STATUS_CODES = {
+    "OFF_DUTY": 1,
+    "SLEEPER_BERTH": 2,
+    "DRIVING": 3,
+    "ON_DUTY_NOT_DRIVING": 4,
+}
+STATUSES = {code: status for status, code in STATUS_CODES.items()}
+ON_DUTY_STATUSES = ("DRIVING", "ON_DUTY_NOT_DRIVING")
+
+GRID_CACHE_TIMEOUT = getattr(settings, "DUTY_GRID_CACHE_TIMEOUT", 60 * 60 * 24)
+
+
+def runs(values):
+    """(value, start, end) for each run of equal values in a 1-D array."""
+    if not len(values):
+        return []
+    edges = np.flatnonzero(values[1:] != values[:-1]) + 1
+    starts = np.concatenate(([0], edges))
+    ends = np.concatenate((edges, [len(values)]))
+    return [
+        (int(values[start]), int(start), int(end)) for start, end in zip(starts, ends)
+    ]
+
+
+def local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class DayGrid:
+    """
+    One driver-day. ``length`` is the number of minutes the local day has,
+    so the hour a spring-forward day skips is not reported as a gap; the
+    extra hour of a fall-back day falls outside the 24-hour grid.
+    """
+
+    __slots__ = ("day", "slots", "overlaps", "length")
+
+    def __init__(self, day, slots=None, overlaps=None):
+        self.day = day
+        self.slots = bytearray(slots or SLOTS_PER_DAY)
+        self.overlaps = bytearray(overlaps or SLOTS_PER_DAY)
+        start = local_midnight(day)
+        minutes = (local_midnight(day + timedelta(days=1)) - start).total_seconds() / 60
+        self.length = min(SLOTS_PER_DAY, int(minutes))
+
+    @classmethod
+    def from_statuses(cls, day, statuses):
+        """A grid from (status, start_time, end_time) tuples, in any order."""
+        grid = cls(day)
+        for status, start_time, end_time in statuses:
+            grid.fill(status, start_time, end_time)
+        return grid
+
+    @classmethod
+    def from_bytes(cls, day, data):
+        return cls(day, data[:SLOTS_PER_DAY], data[SLOTS_PER_DAY:])
+
+    def to_bytes(self):
+        return bytes(self.slots) + bytes(self.overlaps)
+
+    def minute_of(self, moment):
+        """Minutes from local midnight to ``moment``, clamped to the grid."""
+        seconds = (moment - local_midnight(self.day)).total_seconds()
+        return max(0, min(self.length, round(seconds / 60)))
+
+    def fill(self, status, start_time, end_time):
+        start, end = self.minute_of(start_time), self.minute_of(end_time)
+        if start >= end:
+            return
+        slots = np.frombuffer(self.slots, dtype=np.uint8)
+        overlaps = np.frombuffer(self.overlaps, dtype=np.uint8)
+        overlaps[start:end] |= slots[start:end] != 0
+        slots[start:end] = STATUS_CODES[status]
+
+    def minutes(self):
+        """{status: minutes logged}, every status included."""
+        counts = np.bincount(
+            np.frombuffer(self.slots, dtype=np.uint8), minlength=len(STATUSES) + 1
+        )
+        return {status: int(counts[code]) for code, status in STATUSES.items()}
+
+    def totals(self):
+        """{status: hours logged}."""
+        return {status: minutes / 60 for status, minutes in self.minutes().items()}
+
+    def on_duty_hours(self):
+        minutes = self.minutes()
+        return sum(minutes[status] for status in ON_DUTY_STATUSES) / 60
+
+    def gaps(self):
+        """(start_minute, end_minute) ranges with no status logged."""
+        empty = np.frombuffer(self.slots, dtype=np.uint8)[: self.length] == 0
+        return [(start, end) for value, start, end in runs(empty) if value]
+
+    def overlap_ranges(self):
+        """(start_minute, end_minute) ranges claimed by more than one status."""
+        overlaps = np.frombuffer(self.overlaps, dtype=np.uint8)[: self.length]
+        return [(start, end) for value, start, end in runs(overlaps) if value]
+
+    def segments(self):
+        """The runs to draw: {"status", "start_minute", "end_minute"}, gaps as None."""
+        slots = np.frombuffer(self.slots, dtype=np.uint8)[: self.length]
+        return [
+            {"status": STATUSES.get(code), "start_minute": start, "end_minute": end}
+            for code, start, end in runs(slots)
+        ]
+
+    def as_dict(self):
+        return {
+            "date": self.day,
+            "totals": self.totals(),
+            "segments": self.segments(),
+            "gaps": [list(gap) for gap in self.gaps()],
+            "overlaps": [list(overlap) for overlap in self.overlap_ranges()],
+        }
+
+
+def generation_key(driver_id):
+    return f"duty-grid-generation:{driver_id}"
+
+
+def grid_cache_key(driver_id, generation, day):
+    return f"duty-grid:v1:{driver_id}:{generation}:{day.isoformat()}"
+
+
+def forget_driver_grids(driver_id):
+    """Drops every cached grid of a driver by moving it to a new generation."""
+    cache.delete(generation_key(driver_id))
+
+
+def driver_generation(driver_id):
+    key = generation_key(driver_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        # A concurrent first reader may have picked one already; use theirs.
+        if not cache.add(key, generation, None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def build_day_grids(driver_id, days):
+    """{day: DayGrid} for a driver's days from one query over their logged statuses."""
+    from .models import DutyStatus
+
+    days = sorted(days)
+    start, end = local_midnight(days[0]), local_midnight(days[-1] + timedelta(days=1))
+    rows = DutyStatus.objects.filter(
+        trip__driver=driver_id,
+        plan_version__isnull=True,
+        start_time__lt=end,
+        end_time__gt=start,
+    ).values_list("status", "start_time", "end_time")
+    grids = {day: DayGrid(day) for day in days}
+    for status, start_time, end_time in rows:
+        # Statuses that run past midnight are drawn on each day they touch.
+        day = max(days[0], timezone.localtime(start_time).date())
+        last = min(days[-1], timezone.localtime(end_time).date())
+        while day <= last:
+            if day in grids:
+                grids[day].fill(status, start_time, end_time)
+            day += timedelta(days=1)
+    return grids
+
+
+def driver_day_grids(driver_id, days):
+    """{day: DayGrid} for the given days of a driver, cached grids first."""
+    days = list(days)
+    generation = driver_generation(driver_id)
+    keys = {grid_cache_key(driver_id, generation, day): day for day in days}
+    grids = {
+        keys[key]: DayGrid.from_bytes(keys[key], data)
+        for key, data in cache.get_many(keys).items()
+    }
+    missing = [day for day in days if day not in grids]
+    if missing:
+        built = build_day_grids(driver_id, missing)
+        cache.set_many(
+            {
+                grid_cache_key(driver_id, generation, day): grid.to_bytes()
+                for day, grid in built.items()
+            },
+            GRID_CACHE_TIMEOUT,
+        )
+        grids.update(built)
+    return {day: grids[day] for day in days}
+
+
+def cycle_recap(driver_id, today, days=8, limit_hours=70):
+    """
+    The driver's on-duty hours for each of the ``days`` days ending today,
+    and the hours left under the limit today and, once the oldest day rolls
+    off, tomorrow.
+    """
+    window = [today - timedelta(days=offset) for offset in reversed(range(days))]
+    grids = driver_day_grids(driver_id, window)
+    rows = [
+        {"date": day, "on_duty_hours": grids[day].on_duty_hours()} for day in window
+    ]
+    total = sum(row["on_duty_hours"] for row in rows)
+    return {
+        "days": rows,
+        "on_duty_hours": total,
+        "available_hours": max(0.0, limit_hours - total),
+        "available_tomorrow": max(
+            0.0, limit_hours - (total - rows[0]["on_duty_hours"])
+        ),
+    }
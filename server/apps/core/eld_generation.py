@@ -0,0 +1,110 @@
+"""
+ELD logs for every day of a planned trip.
+
+The plan's duty statuses are cut at local midnight, so a status that runs
+past midnight counts towards both days. Each day's log gets the plan's miles
+in proportion to that day's driving time and the driving time as engine
+hours; on-duty hours (driving plus on duty, not driving) are reported
+alongside. Plans too short to have any driving put all their miles on the
+day of the dropoff.
+"""
+
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.utils import timezone
+
+from .duty_grid import ON_DUTY_STATUSES
+from .models import ELDLog
+
+# Columns a generated day writes; fuel and idle hours are left as logged.
+GENERATED_FIELDS = ["total_miles", "total_engine_hours"]
+
+
+def parse_timezone(name):
+    """The zone named by a request, or the server's; ValueError for unknown names."""
+    if not name:
+        return timezone.get_default_timezone()
+    try:
+        return ZoneInfo(str(name))
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def as_datetime(value):
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def duty_hours_by_day(duty_statuses, tz):
+    """
+    {date: {"driving_hours", "on_duty_hours"}} for the local days ``tz`` the
+    duty statuses cover, in date order. Off-duty time is not counted.
+    """
+    days = {}
+    for duty_status in duty_statuses:
+        if duty_status["status"] not in ON_DUTY_STATUSES:
+            continue
+        start = as_datetime(duty_status["start_time"]).astimezone(dt_timezone.utc)
+        end = as_datetime(duty_status["end_time"]).astimezone(dt_timezone.utc)
+        while start < end:
+            local_day = start.astimezone(tz).date()
+            # Durations are taken in UTC so DST changes do not distort them.
+            midnight = datetime.combine(
+                local_day + timedelta(days=1), time.min, tzinfo=tz
+            ).astimezone(dt_timezone.utc)
+            cut = min(end, midnight)
+            hours = (cut - start).total_seconds() / 3600
+            day = days.setdefault(
+                local_day, {"driving_hours": 0.0, "on_duty_hours": 0.0}
+            )
+            day["on_duty_hours"] += hours
+            if duty_status["status"] == "DRIVING":
+                day["driving_hours"] += hours
+            start = cut
+    return dict(sorted(days.items()))
+
+
+def daily_miles(days, total_miles):
+    """
+    {date: miles} splitting ``total_miles`` over duty_hours_by_day() ``days``
+    by driving time. Without driving time they all go to the last day, the
+    one the plan's dropoff ends on.
+    """
+    total_driving = sum(day["driving_hours"] for day in days.values())
+    if not total_driving:
+        miles = {date: 0.0 for date in days}
+        if days:
+            miles[max(days)] = total_miles
+        return miles
+    return {
+        date: total_miles * day["driving_hours"] / total_driving
+        for date, day in days.items()
+    }
+
+
+def daily_eld_logs(trip, route_data, tz):
+    """
+    Unsaved ELDLogs for each day of ``route_data``, plus the per-day hours
+    they were computed from.
+    """
+    days = duty_hours_by_day(route_data.get("duty_statuses", []), tz)
+    miles = daily_miles(days, route_data.get("total_miles", 0))
+    logs = [
+        ELDLog(
+            trip=trip,
+            date=date,
+            total_miles=miles[date],
+            total_engine_hours=Decimal(f"{day['driving_hours']:.2f}"),
+        )
+        for date, day in days.items()
+    ]
+    summary = [
+        {
+            "date": date,
+            "driving_hours": round(day["driving_hours"], 2),
+            "on_duty_hours": round(day["on_duty_hours"], 2),
+        }
+        for date, day in days.items()
+    ]
+    return logs, summary
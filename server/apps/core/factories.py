@@ -0,0 +1,61 @@
+"""
+Rows for tests. Most tests start from the same fleet: driver1 of Rapid
+Logistics, truck V1 and a trip from Los Angeles to New York. Each factory
+creates one of those, and keyword arguments override its fields.
+"""
+
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+
+from .models import Carrier, Driver, Vehicle, Trip
+
+User = get_user_model()
+
+START = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def at(day, hour, minute=0):
+    """``hour``:``minute`` UTC on the given day of January 2024."""
+    return datetime(2024, 1, day, hour, minute, tzinfo=timezone.utc)
+
+
+def create_carrier(name="Rapid Logistics", **fields):
+    fields.setdefault("main_office_address", "123 Rapid St")
+    return Carrier.objects.create(name=name, **fields)
+
+
+def create_user(username="driver1", email="", password="pass", **fields):
+    return User.objects.create_user(username, email, password, **fields)
+
+
+def create_driver(carrier, user=None, license_number="D1", **fields):
+    """A driver of ``carrier``, with a new user named driver1 unless given one."""
+    return Driver.objects.create(
+        user=user or create_user(),
+        license_number=license_number,
+        carrier=carrier,
+        **fields,
+    )
+
+
+def create_vehicle(carrier, vehicle_number="V1", **fields):
+    fields.setdefault("license_plate", f"{vehicle_number}LP")
+    fields.setdefault("state", "CA")
+    return Vehicle.objects.create(
+        vehicle_number=vehicle_number, carrier=carrier, **fields
+    )
+
+
+def create_trip(driver, vehicle, **fields):
+    """A trip from Los Angeles to New York starting at START."""
+    defaults = {
+        "current_longitude": -118.0,
+        "current_latitude": 34.0,
+        "pickup_longitude": -118.0,
+        "pickup_latitude": 34.0,
+        "dropoff_longitude": -74.0,
+        "dropoff_latitude": 40.0,
+        "start_time": START,
+    }
+    return Trip.objects.create(driver=driver, vehicle=vehicle, **{**defaults, **fields})
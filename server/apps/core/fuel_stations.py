@@ -0,0 +1,167 @@
+"""
+Truck-stop locations for the planner's fueling stops.
+
+``manage.py build_fuel_stations`` turns a CSV of stations into one file at
+settings.FUEL_STATIONS_PATH. Like the road graph (see routing.py), it is a
+JSON header followed by flat arrays. It is memory-mapped, and the stations
+are sorted by geocell so that the stations near a stretch of road are a few
+binary searches away.
+
+When the file is configured, every "Fueling Stop" in a plan is moved to the
+station nearest the route over the last FUEL_WINDOW_MILES driven before the
+stop. Stops with no station within MAX_DETOUR_MILES of that stretch keep the
+position materialize_plan interpolates for them. The schedule does not
+change, only where the stop is.
+"""
+
+import math
+import uuid
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+from .geocell import bounding_box, cells_of, indices_in_box
+from .hos_batch import calculate_distances
+from .routing import RoutePath, read_arrays, write_arrays
+
+MAGIC = b"FUELSTNS"
+# A fueling stop may be anywhere on this last stretch before it.
+FUEL_WINDOW_MILES = 150.0
+# How far off the route a station may be.
+MAX_DETOUR_MILES = 10.0
+# Spacing of the points the route is checked at.
+SAMPLE_MILES = 1.0
+
+
+def build_stations(names, latitudes, longitudes):
+    """The arrays and header values of a station file, stations in cell order."""
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    if not len(latitudes):
+        raise ValueError("A station index needs stations.")
+    if np.any(np.abs(latitudes) > 90) or np.any(np.abs(longitudes) > 180):
+        raise ValueError("Station coordinates are out of range.")
+    cells = cells_of(latitudes, longitudes)
+    order = np.argsort(cells, kind="stable")
+    arrays = {
+        "names": np.asarray(names, dtype=str)[order],
+        "latitudes": latitudes[order],
+        "longitudes": longitudes[order],
+        "cells": cells[order],
+    }
+    return arrays, {"build_id": uuid.uuid4().hex}
+
+
+def write_stations(path, arrays, **meta):
+    write_arrays(path, MAGIC, arrays, **meta)
+
+
+class StationIndex:
+    """A station file opened read-only, one array entry per station."""
+
+    def __init__(self, path):
+        header, arrays = read_arrays(path, MAGIC)
+        self.path = path
+        self.build_id = header["build_id"]
+        self.cache_key = f"fuel-stations:{self.build_id}"
+        self.names = arrays["names"]
+        self.latitudes = arrays["latitudes"]
+        self.longitudes = arrays["longitudes"]
+        self.cells = arrays["cells"]
+
+    def nearest_to_path(self, latitudes, longitudes):
+        """
+        (station, miles off) of the station nearest any of the given points,
+        or None when none is within MAX_DETOUR_MILES of them.
+        """
+        points = np.column_stack((latitudes, longitudes))
+        middle = points[len(points) // 2]
+        reach = calculate_distances(points, middle).max() + MAX_DETOUR_MILES
+        candidates = indices_in_box(
+            self.cells, bounding_box(middle[0], middle[1], reach)
+        )
+        if not len(candidates):
+            return None
+        stations = np.column_stack(
+            (self.latitudes[candidates], self.longitudes[candidates])
+        )
+        distances = calculate_distances(
+            np.repeat(stations, len(points), axis=0),
+            np.tile(points, (len(stations), 1)),
+        ).reshape(len(stations), len(points))
+        off_route = distances.min(axis=1)
+        best = int(np.argmin(off_route))
+        if off_route[best] > MAX_DETOUR_MILES:
+            return None
+        return int(candidates[best]), float(off_route[best])
+
+    def place_fuel_stops(self, duty_statuses, route, pickup_location, dropoff_location):
+        """
+        Gives each "Fueling Stop" in a plan's ``duty_statuses`` the location
+        and name of its station. Progress along the route is the share of the
+        plan's driving done, as in materialize_plan.
+        """
+        durations = [
+            (
+                datetime.fromisoformat(duty["end_time"])
+                - datetime.fromisoformat(duty["start_time"])
+            ).total_seconds()
+            / 3600
+            for duty in duty_statuses
+        ]
+        total_driving_hours = sum(
+            hours
+            for duty, hours in zip(duty_statuses, durations)
+            if duty["status"] == "DRIVING"
+        )
+        if not total_driving_hours or not route.miles:
+            return
+        if route.polyline is not None:
+            path = RoutePath(route.polyline)
+        else:
+            path = RoutePath(
+                points=[
+                    (pickup_location[1], pickup_location[0]),
+                    (dropoff_location[1], dropoff_location[0]),
+                ]
+            )
+        window = FUEL_WINDOW_MILES / route.miles
+
+        driven = 0.0
+        last_stop = 0.0
+        for duty, hours in zip(duty_statuses, durations):
+            if duty["status"] == "DRIVING":
+                driven += hours
+                continue
+            if duty["location_description"] != "Fueling Stop":
+                continue
+            last = driven / total_driving_hours
+            first = max(last_stop, last - window)
+            last_stop = last
+            samples = max(2, math.ceil((last - first) * route.miles / SAMPLE_MILES))
+            latitudes, longitudes = path.coordinates_at(
+                np.linspace(first, last, samples + 1)
+            )
+            nearest = self.nearest_to_path(latitudes, longitudes)
+            if nearest is None:
+                continue
+            station = nearest[0]
+            duty["longitude"] = float(self.longitudes[station])
+            duty["latitude"] = float(self.latitudes[station])
+            if self.names[station]:
+                duty["station"] = str(self.names[station])
+
+
+@lru_cache(maxsize=None)
+def load_fuel_stations(path):
+    """The StationIndex at ``path``, None without one; loaded once per process."""
+    if not path:
+        return None
+    return StationIndex(path)
+
+
+def get_fuel_stations():
+    """The station index configured in settings.FUEL_STATIONS_PATH."""
+    return load_fuel_stations(getattr(settings, "FUEL_STATIONS_PATH", ""))
@@ -0,0 +1,157 @@
+"""
+Fixed-grid spatial cells.
+
+The globe is cut into CELL_DEGREES squares numbered row by row from the
+south-west corner, and each stored coordinate keeps the number of its cell in
+an indexed integer column next to it (Trip.current_cell, DutyStatus.cell,
+...). A bounding box then turns into one index range per row of cells it
+covers, and only rows in those cells are checked against the exact box and,
+for radius queries, the great-circle distance. Nothing here needs PostGIS.
+
+Models fill their cells in save() and in the bulk paths through
+set_cells(); ``manage.py backfill_cells`` fills rows written before the
+columns existed or by raw updates.
+"""
+
+import math
+
+import numpy as np
+from django.db.models import Q
+
+from .hos_batch import calculate_distances
+
+# A quarter degree is about 17 miles north to south.
+CELL_DEGREES = 0.25
+COLUMNS = round(360 / CELL_DEGREES)
+ROWS = round(180 / CELL_DEGREES)
+# Boxes needing more ranges than this are looked up as one range of whole rows.
+MAX_RANGES = 64
+
+# Slightly less than a degree of latitude really spans, so boxes err wide.
+MILES_PER_DEGREE = 69.0
+
+
+def cell_row(latitude):
+    return min(ROWS - 1, max(0, math.floor((latitude + 90) / CELL_DEGREES)))
+
+
+def cell_column(longitude):
+    return math.floor(((longitude + 180) % 360) / CELL_DEGREES) % COLUMNS
+
+
+def cell_of(latitude, longitude):
+    """The cell holding a coordinate, or None when either half is missing."""
+    if latitude is None or longitude is None:
+        return None
+    return cell_row(latitude) * COLUMNS + cell_column(longitude)
+
+
+def cells_of(latitudes, longitudes):
+    """cell_of() over arrays of coordinates."""
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    rows = np.clip(np.floor((latitudes + 90) / CELL_DEGREES), 0, ROWS - 1)
+    columns = np.floor(np.mod(longitudes + 180, 360) / CELL_DEGREES) % COLUMNS
+    return rows.astype(np.int64) * COLUMNS + columns.astype(np.int64)
+
+
+def wrap_longitude(longitude):
+    return (longitude + 180) % 360 - 180
+
+
+def bounding_box(latitude, longitude, radius_miles):
+    """
+    (min_latitude, max_latitude, min_longitude, max_longitude) around every
+    point within ``radius_miles``. The longitude bounds are None when the box
+    would reach a pole or go all the way around; a box crossing the
+    antimeridian has min_longitude > max_longitude.
+    """
+    delta = radius_miles / MILES_PER_DEGREE
+    min_latitude, max_latitude = latitude - delta, latitude + delta
+    if min_latitude <= -90 or max_latitude >= 90:
+        return max(min_latitude, -90.0), min(max_latitude, 90.0), None, None
+    # Degrees of longitude are shortest on the edge nearest a pole.
+    widest = math.cos(math.radians(max(abs(min_latitude), abs(max_latitude))))
+    longitude_delta = delta / widest
+    if longitude_delta >= 180:
+        return min_latitude, max_latitude, None, None
+    return (
+        min_latitude,
+        max_latitude,
+        wrap_longitude(longitude - longitude_delta),
+        wrap_longitude(longitude + longitude_delta),
+    )
+
+
+def cell_ranges(box):
+    """Inclusive (first, last) cell number ranges covering a bounding box."""
+    min_latitude, max_latitude, min_longitude, max_longitude = box
+    first_row, last_row = cell_row(min_latitude), cell_row(max_latitude)
+    if min_longitude is None:
+        return [(first_row * COLUMNS, last_row * COLUMNS + COLUMNS - 1)]
+    first_column, last_column = cell_column(min_longitude), cell_column(max_longitude)
+    if first_column <= last_column:
+        columns = [(first_column, last_column)]
+    else:
+        columns = [(first_column, COLUMNS - 1), (0, last_column)]
+    if (last_row - first_row + 1) * len(columns) > MAX_RANGES:
+        return [(first_row * COLUMNS, last_row * COLUMNS + COLUMNS - 1)]
+    return [
+        (row * COLUMNS + first, row * COLUMNS + last)
+        for row in range(first_row, last_row + 1)
+        for first, last in columns
+    ]
+
+
+def indices_in_box(sorted_cells, box):
+    """
+    Positions in an ascending array of cell numbers that fall in ``box``'s
+    cell ranges, found by binary search.
+    """
+    return np.concatenate(
+        [
+            np.arange(
+                np.searchsorted(sorted_cells, first, side="left"),
+                np.searchsorted(sorted_cells, last, side="right"),
+            )
+            for first, last in cell_ranges(box)
+        ]
+    )
+
+
+def within_box(box, cell_field, latitude_field, longitude_field):
+    """A Q matching rows whose coordinate lies in ``box``, led by its cell index."""
+    min_latitude, max_latitude, min_longitude, max_longitude = box
+    cells = Q()
+    for first, last in cell_ranges(box):
+        if first == last:
+            cells |= Q(**{cell_field: first})
+        else:
+            cells |= Q(**{f"{cell_field}__range": (first, last)})
+    condition = cells & Q(**{f"{latitude_field}__range": (min_latitude, max_latitude)})
+    if min_longitude is None:
+        return condition
+    if min_longitude <= max_longitude:
+        return condition & Q(
+            **{f"{longitude_field}__range": (min_longitude, max_longitude)}
+        )
+    return condition & (
+        Q(**{f"{longitude_field}__gte": min_longitude})
+        | Q(**{f"{longitude_field}__lte": max_longitude})
+    )
+
+
+def within_radius(rows, latitude, longitude, radius_miles):
+    """
+    The rows within ``radius_miles`` of a coordinate and their distances,
+    nearest first. Each row ends with its latitude and longitude.
+    """
+    rows = list(rows)
+    coordinates = np.array([row[-2:] for row in rows], dtype=float).reshape(-1, 2)
+    distances = calculate_distances(coordinates, [latitude, longitude])
+    order = np.argsort(distances, kind="stable")
+    return [
+        (rows[index], float(distances[index]))
+        for index in order
+        if distances[index] <= radius_miles
+    ]
@@ -0,0 +1,286 @@
+"""
+Vectorized batch counterpart of ``HOSCalculator.plan_trip``.
+
+Every trip in the batch is stepped through the same HOS state machine as the
+scalar planner, but all trips advance together: one pass of the ``while`` loop
+below handles one iteration of ``plan_trip``'s driving loop for every trip that
+still has driving left, using NumPy arrays for the per-trip state. The loop
+therefore runs as many times as the longest trip needs, not once per trip.
+"""
+
+from datetime import timedelta, timezone
+
+import numpy as np
+
+from .hos_logic import HOSCalculator
+
+EARTH_RADIUS_KM = 6371
+KM_TO_MILES = 0.621371
+MICROSECONDS_PER_HOUR = 3_600_000_000
+
+# Segment kinds, in the order the scalar planner can emit them.
+PICKUP, DRIVING, BREAK, FUELING, RESET, DROPOFF, RESTART = range(7)
+SEGMENTS = (
+    ("ON_DUTY_NOT_DRIVING", "Pickup"),
+    ("DRIVING", "Driving"),
+    ("ON_DUTY_NOT_DRIVING", "30-minute break"),
+    ("ON_DUTY_NOT_DRIVING", "Fueling Stop"),
+    ("OFF_DUTY", "10-hour Reset"),
+    ("ON_DUTY_NOT_DRIVING", "Dropoff"),
+    ("OFF_DUTY", "34-hour Restart"),
+)
+
+
+def calculate_distances(coords1, coords2):
+    """
+    Vectorized ``HOSCalculator.calculate_distance``: great-circle miles between
+    each pair of rows in two ``(n, 2)`` coordinate arrays.
+    """
+    coords1 = np.asarray(coords1, dtype=float).reshape(-1, 2)
+    coords2 = np.asarray(coords2, dtype=float).reshape(-1, 2)
+    lat1, lon1 = coords1[:, 0], coords1[:, 1]
+    lat2, lon2 = coords2[:, 0], coords2[:, 1]
+    d_lat = np.radians(lat2 - lat1)
+    d_lon = np.radians(lon2 - lon1)
+    a = np.sin(d_lat / 2) * np.sin(d_lat / 2) + np.cos(np.radians(lat1)) * np.cos(
+        np.radians(lat2)
+    ) * np.sin(d_lon / 2) * np.sin(d_lon / 2)
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c * KM_TO_MILES
+
+
+def hours_to_microseconds(hours):
+    """
+    Convert an array of hours to integer microseconds, rounding exactly the way
+    ``timedelta(hours=...)`` does so batch timestamps match the scalar planner.
+    """
+    hours = np.asarray(hours, dtype=float)
+    whole = np.trunc(hours)
+    fraction = np.rint((hours - whole) * float(MICROSECONDS_PER_HOUR))
+    return whole.astype(np.int64) * MICROSECONDS_PER_HOUR + fraction.astype(np.int64)
+
+
+class _Segments:
+    """Append-only columnar log of the segments emitted during planning."""
+
+    def __init__(self):
+        self.trips = []
+        self.kinds = []
+        self.hours = []
+
+    def add(self, trips, kind, hours):
+        if trips.size:
+            self.trips.append(trips)
+            self.kinds.append(np.full(trips.size, kind, dtype=np.int8))
+            self.hours.append(
+                np.broadcast_to(np.asarray(hours, dtype=float), trips.shape)
+            )
+
+    def columns(self):
+        trips = np.concatenate(self.trips)
+        # A stable sort keeps each trip's segments in emission order.
+        order = np.argsort(trips, kind="stable")
+        return (
+            trips[order],
+            np.concatenate(self.kinds)[order],
+            np.concatenate(self.hours)[order],
+        )
+
+
+def plan_trips(
+    start_times,
+    current_cycle_hours,
+    pickup_locations,
+    dropoff_locations,
+    fuel_stops=False,
+):
+    """
+    Plan many trips in one vectorized pass.
+
+    ``pickup_locations`` and ``dropoff_locations`` are ``(n, 2)`` arrays in the
+    same coordinate order ``HOSCalculator`` is given, ``start_times`` is a
+    sequence of ``n`` datetimes and ``current_cycle_hours`` is a scalar or
+    ``n`` values of 70-hour cycle time already used. ``fuel_stops`` is
+    ``HOSCalculator``'s opt-in 1000-mile fueling rule. Returns a list with one
+    ``plan_trip``-shaped result dict per trip, in input order.
+    """
+    start_times = list(start_times)
+    count = len(start_times)
+    if count == 0:
+        return []
+    total_miles = calculate_distances(pickup_locations, dropoff_locations)
+    if total_miles.shape != (count,):
+        raise ValueError("Every trip needs one pickup and one dropoff location.")
+    remaining = total_miles / HOSCalculator.AVERAGE_SPEED_MPH
+    cycle_hours = np.broadcast_to(
+        np.asarray(current_cycle_hours, dtype=float), (count,)
+    ).copy()
+
+    segments = _Segments()
+    _restart_if_needed(segments, np.arange(count), cycle_hours, 1.0)
+    segments.add(np.arange(count), PICKUP, 1.0)
+    cycle_hours += 1.0
+    all_cycle_hours = cycle_hours
+
+    trips = np.flatnonzero(remaining >= 1.0)
+    remaining = remaining[trips]
+    cycle_hours = cycle_hours[trips]
+    driving_in_shift = np.zeros(trips.size)
+    on_duty_in_shift = np.ones(trips.size)
+    driving_since_break = np.zeros(trips.size)
+    miles_since_fuel = np.zeros(trips.size)
+
+    while trips.size:
+        cycle_left = HOSCalculator.MAX_CYCLE_HOURS - cycle_hours
+        restart = (cycle_left <= 0) | (
+            (cycle_left < 0.5)
+            & (
+                (driving_since_break >= HOSCalculator.BREAK_AFTER_DRIVING_HOURS)
+                | (miles_since_fuel >= HOSCalculator.FUEL_INTERVAL_MILES)
+            )
+        )
+        segments.add(trips[restart], RESTART, HOSCalculator.RESTART_HOURS)
+        driving_in_shift[restart] = 0.0
+        on_duty_in_shift[restart] = 0.0
+        driving_since_break[restart] = 0.0
+        cycle_hours[restart] = 0.0
+
+        reset = ~restart & (
+            (driving_in_shift >= HOSCalculator.MAX_DRIVING_HOURS)
+            | (on_duty_in_shift >= HOSCalculator.MAX_ON_DUTY_HOURS)
+        )
+        segments.add(trips[reset], RESET, 10.0)
+        driving_in_shift[reset] = 0.0
+        on_duty_in_shift[reset] = 0.0
+        driving_since_break[reset] = 0.0
+
+        skipped = restart | reset
+        fueling = ~skipped & (miles_since_fuel >= HOSCalculator.FUEL_INTERVAL_MILES)
+        segments.add(trips[fueling], FUELING, 0.5)
+        on_duty_in_shift[fueling] += 0.5
+        cycle_hours[fueling] += 0.5
+        miles_since_fuel[fueling] = 0.0
+
+        drive_duration = np.minimum(
+            np.minimum(remaining, HOSCalculator.MAX_DRIVING_HOURS - driving_in_shift),
+            np.minimum(
+                HOSCalculator.MAX_ON_DUTY_HOURS - on_duty_in_shift,
+                HOSCalculator.BREAK_AFTER_DRIVING_HOURS - driving_since_break,
+            ),
+        )
+        drive_duration = np.minimum(drive_duration, cycle_left)
+        skipped |= fueling
+        driving = ~skipped & (drive_duration > 0)
+        drive_duration = np.where(driving, drive_duration, 0.0)
+        segments.add(trips[driving], DRIVING, drive_duration[driving])
+        driving_in_shift += drive_duration
+        on_duty_in_shift += drive_duration
+        driving_since_break += drive_duration
+        cycle_hours += drive_duration
+        remaining -= drive_duration
+        if fuel_stops:
+            miles_since_fuel += drive_duration * HOSCalculator.AVERAGE_SPEED_MPH
+
+        on_break = (
+            ~skipped
+            & (driving_since_break >= HOSCalculator.BREAK_AFTER_DRIVING_HOURS)
+            & (remaining > 0)
+            & (cycle_hours + 0.5 <= HOSCalculator.MAX_CYCLE_HOURS)
+        )
+        segments.add(trips[on_break], BREAK, 0.5)
+        on_duty_in_shift[on_break] += 0.5
+        cycle_hours[on_break] += 0.5
+        driving_since_break[on_break] = 0.0
+
+        keep = remaining > 0
+        all_cycle_hours[trips[~keep]] = cycle_hours[~keep]
+        trips = trips[keep]
+        remaining = remaining[keep]
+        cycle_hours = cycle_hours[keep]
+        driving_in_shift = driving_in_shift[keep]
+        on_duty_in_shift = on_duty_in_shift[keep]
+        driving_since_break = driving_since_break[keep]
+        miles_since_fuel = miles_since_fuel[keep]
+
+    _restart_if_needed(segments, np.arange(count), all_cycle_hours, 1.0)
+    segments.add(np.arange(count), DROPOFF, 1.0)
+    return _build_results(start_times, total_miles, *segments.columns())
+
+
+def _restart_if_needed(segments, trips, cycle_hours, on_duty_hours):
+    """``HOSCalculator.restart_if_needed`` for ``trips``; resets their cycle."""
+    restart = cycle_hours + on_duty_hours > HOSCalculator.MAX_CYCLE_HOURS
+    segments.add(trips[restart], RESTART, HOSCalculator.RESTART_HOURS)
+    cycle_hours[restart] = 0.0
+
+
+def _build_results(start_times, total_miles, trips, kinds, hours):
+    durations = hours_to_microseconds(hours)
+    ends = np.cumsum(durations)
+    bounds = np.searchsorted(trips, np.arange(len(start_times) + 1))
+    counts = np.diff(bounds)
+    # Rebase the running total so every trip's offsets start at zero.
+    trip_base = np.concatenate(([0], ends))[bounds[:-1]]
+    ends -= np.repeat(trip_base, counts)
+    starts = ends - durations
+
+    start_text, end_text = _isoformat(start_times, counts, starts, ends)
+    kinds = kinds.tolist()
+    results = []
+    for index in range(len(start_times)):
+        duty_statuses = []
+        for position in range(bounds[index], bounds[index + 1]):
+            status, description = SEGMENTS[kinds[position]]
+            duty_statuses.append(
+                {
+                    "status": status,
+                    "start_time": start_text[position],
+                    "end_time": end_text[position],
+                    "location_description": description,
+                }
+            )
+        results.append(
+            {"total_miles": float(total_miles[index]), "duty_statuses": duty_statuses}
+        )
+    return results
+
+
+def _isoformat(start_times, counts, *offset_arrays):
+    """
+    ``(start_time + timedelta(microseconds=offset)).isoformat()`` for every
+    segment offset, formatted in bulk for naive and fixed-offset start times.
+    """
+    if not all(
+        start_time.tzinfo is None or isinstance(start_time.tzinfo, timezone)
+        for start_time in start_times
+    ):
+        # Zones with DST can change offset mid-trip, so let datetime decide.
+        owners = np.repeat(np.arange(len(start_times)), counts).tolist()
+        return [
+            [
+                (start_times[owner] + timedelta(microseconds=offset)).isoformat()
+                for owner, offset in zip(owners, offsets.tolist())
+            ]
+            for offsets in offset_arrays
+        ]
+
+    wall_times = [start_time.replace(tzinfo=None) for start_time in start_times]
+    suffixes = np.repeat(
+        [
+            start_time.isoformat()[len(wall_time.isoformat()) :]
+            for start_time, wall_time in zip(start_times, wall_times)
+        ],
+        counts,
+    ).tolist()
+    wall_times = np.repeat(np.array(wall_times, dtype="datetime64[us]"), counts)
+    formatted = []
+    for offsets in offset_arrays:
+        stamps = wall_times + offsets.astype("timedelta64[us]")
+        text = np.datetime_as_string(stamps, unit="us")
+        # datetime.isoformat() drops the microseconds field when it is zero.
+        whole_seconds = stamps == stamps.astype("datetime64[s]")
+        text[whole_seconds] = np.datetime_as_string(stamps[whole_seconds], unit="s")
+        formatted.append(
+            [stamp + suffix for stamp, suffix in zip(text.tolist(), suffixes)]
+        )
+    return formatted
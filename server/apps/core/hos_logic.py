@@ -1,17 +1,51 @@
+import logging
 import math
+from collections import namedtuple
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
+# A route between two locations: miles, driving hours, the average speed over
+# it and, from routers that know the roads, an encoded polyline.
+Route = namedtuple("Route", ["miles", "hours", "speed_mph", "polyline"])
+
 
 class HOSCalculator:
+    AVERAGE_SPEED_MPH = 50.0
+    MAX_DRIVING_HOURS = 11.0
+    MAX_ON_DUTY_HOURS = 14.0
+    BREAK_AFTER_DRIVING_HOURS = 8.0
+    FUEL_INTERVAL_MILES = 1000
+    MAX_CYCLE_HOURS = 70.0
+    RESTART_HOURS = 34.0
+
     def __init__(
-        self, start_time, current_cycle_hours, pickup_location, dropoff_location
+        self,
+        start_time,
+        current_cycle_hours,
+        pickup_location,
+        dropoff_location,
+        router=None,
+        fuel_stations=None,
+        fuel_stops=False,
     ):
         self.start_time = start_time
         self.current_cycle_hours = current_cycle_hours
         self.pickup_location = pickup_location
         self.dropoff_location = dropoff_location
+        # Without a router (see routing.py) trips are a straight line driven
+        # at AVERAGE_SPEED_MPH.
+        self.router = router
+        # With a station index (see fuel_stations.py) fueling stops are put
+        # at real stations; without one they have no location of their own.
+        self.fuel_stations = fuel_stations
+        # The 1000-mile fueling rule counts driven miles only when asked to
+        # (or when there are stations to stop at); by default plans have no
+        # fueling stops.
+        self.fuel_stops = fuel_stops or fuel_stations is not None
         self.duty_statuses = []
         self.miles_since_last_fuel_stop = 0.0
+        self.cycle_hours = float(current_cycle_hours)
 
     def calculate_distance(self, coord1, coord2):
         lat1, lon1 = coord1
@@ -26,12 +60,34 @@ class HOSCalculator:
         distance = R * c * 0.621371  # convert km to miles
         return distance
 
-    def plan_trip(self):
-        total_miles = self.calculate_distance(
-            self.pickup_location, self.dropoff_location
+    def plan_route(self):
+        """The Route from pickup to dropoff."""
+        if self.router is not None:
+            return self.router.route(self.pickup_location, self.dropoff_location)
+        miles = self.calculate_distance(self.pickup_location, self.dropoff_location)
+        return Route(
+            miles, miles / self.AVERAGE_SPEED_MPH, self.AVERAGE_SPEED_MPH, None
         )
-        avg_speed = 50.0  # mph
-        total_driving_hours = total_miles / avg_speed
+
+    def plan_result(self, route):
+        if self.fuel_stations is not None:
+            self.fuel_stations.place_fuel_stops(
+                self.duty_statuses,
+                route,
+                self.pickup_location,
+                self.dropoff_location,
+            )
+        result = {"total_miles": route.miles, "duty_statuses": self.duty_statuses}
+        if route.polyline is not None:
+            result["total_driving_hours"] = route.hours
+            result["polyline"] = route.polyline
+        return result
+
+    def plan_trip(self):
+        route = self.plan_route()
+        total_miles = route.miles
+        avg_speed = route.speed_mph
+        total_driving_hours = route.hours
 
         current_time = self.start_time
         driving_in_shift = 0.0
@@ -39,6 +95,7 @@ class HOSCalculator:
         driving_since_break = 0.0
 
         # 1. Pickup (1 hour, on-duty not driving)
+        current_time = self.restart_if_needed(current_time, 1.0)
         self.add_duty_status(
             "ON_DUTY_NOT_DRIVING",
             current_time,
@@ -47,9 +104,11 @@ class HOSCalculator:
         )
         current_time += timedelta(hours=1)
         on_duty_in_shift += 1.0
+        self.cycle_hours += 1.0
 
         # If the trip is very short, skip the main driving loop
         if total_driving_hours < 1.0:
+            current_time = self.restart_if_needed(current_time, 1.0)
             self.add_duty_status(
                 "ON_DUTY_NOT_DRIVING",
                 current_time,
@@ -57,17 +116,47 @@ class HOSCalculator:
                 "Dropoff",
             )
             current_time += timedelta(hours=1)
-            return {"total_miles": total_miles, "duty_statuses": self.duty_statuses}
+            return self.plan_result(route)
 
         # 2. Main Driving Loop
         while total_driving_hours > 0:
-            print(f"Starting loop with {total_driving_hours:.2f} hours left")
-            print(
-                f"Driving time this shift: {driving_in_shift:.2f} hours, On-duty time: {on_duty_in_shift:.2f} hours"
+            logger.debug(
+                "Starting loop with %.2f hours left; driving time this shift: "
+                "%.2f hours, on-duty time: %.2f hours",
+                total_driving_hours,
+                driving_in_shift,
+                on_duty_in_shift,
             )
 
+            # Check for the 70-hour/8-day limit: a 34-hour restart is taken
+            # once the cycle is used up, or when a due break or fuel stop
+            # no longer fits in it.
+            cycle_left = self.MAX_CYCLE_HOURS - self.cycle_hours
+            if cycle_left <= 0 or (
+                cycle_left < 0.5
+                and (
+                    driving_since_break >= self.BREAK_AFTER_DRIVING_HOURS
+                    or self.miles_since_last_fuel_stop >= self.FUEL_INTERVAL_MILES
+                )
+            ):
+                self.add_duty_status(
+                    "OFF_DUTY",
+                    current_time,
+                    current_time + timedelta(hours=self.RESTART_HOURS),
+                    "34-hour Restart",
+                )
+                current_time += timedelta(hours=self.RESTART_HOURS)
+                driving_in_shift = 0.0
+                on_duty_in_shift = 0.0
+                driving_since_break = 0.0
+                self.cycle_hours = 0.0
+                continue
+
             # Check for end-of-shift (11-hour driving or 14-hour on-duty limit)
-            if driving_in_shift >= 11.0 or on_duty_in_shift >= 14.0:
+            if (
+                driving_in_shift >= self.MAX_DRIVING_HOURS
+                or on_duty_in_shift >= self.MAX_ON_DUTY_HOURS
+            ):
                 self.add_duty_status(
                     "OFF_DUTY",
                     current_time,
@@ -80,7 +169,7 @@ class HOSCalculator:
                 driving_since_break = 0.0
                 continue
 
-            if self.miles_since_last_fuel_stop >= 1000:
+            if self.miles_since_last_fuel_stop >= self.FUEL_INTERVAL_MILES:
                 self.add_duty_status(
                     "ON_DUTY_NOT_DRIVING",
                     current_time,
@@ -89,13 +178,14 @@ class HOSCalculator:
                 )
                 current_time += timedelta(minutes=30)
                 on_duty_in_shift += 0.5
+                self.cycle_hours += 0.5
                 self.miles_since_last_fuel_stop = 0.0
                 continue
 
             # Determine the maximum time we can drive before hitting the next limit
-            time_to_11h_limit = 11.0 - driving_in_shift
-            time_to_14h_limit = 14.0 - on_duty_in_shift
-            time_to_break_needed = 8.0 - driving_since_break
+            time_to_11h_limit = self.MAX_DRIVING_HOURS - driving_in_shift
+            time_to_14h_limit = self.MAX_ON_DUTY_HOURS - on_duty_in_shift
+            time_to_break_needed = self.BREAK_AFTER_DRIVING_HOURS - driving_since_break
 
             # Drive duration should be the minimum of these limits
             drive_duration = min(
@@ -103,9 +193,10 @@ class HOSCalculator:
                 time_to_11h_limit,
                 time_to_14h_limit,
                 time_to_break_needed,
+                cycle_left,
             )
 
-            print(f"Drive duration for this loop: {drive_duration:.2f} hours")
+            logger.debug("Drive duration for this loop: %.2f hours", drive_duration)
 
             if drive_duration > 0:
                 self.add_duty_status(
@@ -118,14 +209,24 @@ class HOSCalculator:
                 driving_in_shift += drive_duration
                 on_duty_in_shift += drive_duration
                 driving_since_break += drive_duration
+                self.cycle_hours += drive_duration
                 total_driving_hours -= drive_duration
+                if self.fuel_stops:
+                    self.miles_since_last_fuel_stop += drive_duration * avg_speed
 
-                print(f"After driving: {driving_since_break:.2f} hours since break")
+                logger.debug(
+                    "After driving: %.2f hours since break", driving_since_break
+                )
 
             # Check if a break is required after driving 8 hours
-            if driving_since_break >= 8.0 and total_driving_hours > 0:
-                print(
-                    f"Taking 30-minute break after {driving_since_break:.2f} hours of driving."
+            if (
+                driving_since_break >= self.BREAK_AFTER_DRIVING_HOURS
+                and total_driving_hours > 0
+                and self.cycle_hours + 0.5 <= self.MAX_CYCLE_HOURS
+            ):
+                logger.debug(
+                    "Taking 30-minute break after %.2f hours of driving.",
+                    driving_since_break,
                 )
                 self.add_duty_status(
                     "ON_DUTY_NOT_DRIVING",
@@ -135,14 +236,11 @@ class HOSCalculator:
                 )
                 current_time += timedelta(minutes=30)
                 on_duty_in_shift += 0.5
+                self.cycle_hours += 0.5
                 driving_since_break = 0.0  # Reset the break clock
 
-        # Debugging: Final check before returning result
-        print("\nFinal Duty Statuses:")
-        for duty in self.duty_statuses:
-            print(f"Description: {duty['location_description']}")
-
         # 3. Dropoff (1 hour, on-duty not driving)
+        current_time = self.restart_if_needed(current_time, 1.0)
         self.add_duty_status(
             "ON_DUTY_NOT_DRIVING",
             current_time,
@@ -150,14 +248,151 @@ class HOSCalculator:
             "Dropoff",
         )
 
-        # Debugging: Final check before returning result
-        print("\nFinal Duty Statuses Before Returning:")
-        for duty in self.duty_statuses:
-            print(f"Description: {duty['location_description']}")
+        return self.plan_result(route)
 
-        return {"total_miles": total_miles, "duty_statuses": self.duty_statuses}
+    def plan_trip_closed_form(self):
+        """
+        Produce the same schedule as ``plan_trip`` without simulating its loop.
 
-    def add_duty_status(self, status, start, end, description):
+        Every shift drives the same chunks (8 hours, a 30-minute break, then
+        the remaining 3 hours up to the 11-hour limit), so the number of shifts
+        follows from the total driving time and each break, fuel stop and
+        10-hour reset is placed directly. The work done is proportional to the
+        number of segments returned. Limits under which the 14-hour window
+        could cut a shift short, and trips that would need a 34-hour restart
+        to stay within the 70-hour cycle, fall back to ``plan_trip``.
+        """
+        route = self.plan_route()
+        total_miles = route.miles
+        avg_speed = route.speed_mph
+        total_driving_hours = route.hours
+        chunks = self._shift_driving_chunks(avg_speed)
+        if chunks is None or not self._fits_in_cycle(
+            total_miles, total_driving_hours, chunks
+        ):
+            # plan_trip() routes again; routers cache their last route.
+            return self.plan_trip()
+        one_hour = timedelta(hours=1)
+        half_hour = timedelta(minutes=30)
+        reset = timedelta(hours=10)
+
+        current_time = self.start_time
+        current_time = self._record_duty_status(
+            "ON_DUTY_NOT_DRIVING", current_time, one_hour, "Pickup"
+        )
+        if total_driving_hours >= 1.0:
+            remaining = total_driving_hours
+            for shift in range(self._shift_count(total_driving_hours)):
+                if shift:
+                    current_time = self._record_duty_status(
+                        "OFF_DUTY", current_time, reset, "10-hour Reset"
+                    )
+                for chunk in chunks:
+                    if self.miles_since_last_fuel_stop >= self.FUEL_INTERVAL_MILES:
+                        current_time = self._record_duty_status(
+                            "ON_DUTY_NOT_DRIVING",
+                            current_time,
+                            half_hour,
+                            "Fueling Stop",
+                        )
+                        self.miles_since_last_fuel_stop = 0.0
+                    drive_duration = min(remaining, chunk)
+                    current_time = self._record_duty_status(
+                        "DRIVING",
+                        current_time,
+                        timedelta(hours=drive_duration),
+                        "Driving",
+                    )
+                    remaining -= drive_duration
+                    if self.fuel_stops:
+                        self.miles_since_last_fuel_stop += drive_duration * avg_speed
+                    if remaining <= 0:
+                        break
+                    if drive_duration >= self.BREAK_AFTER_DRIVING_HOURS:
+                        current_time = self._record_duty_status(
+                            "ON_DUTY_NOT_DRIVING",
+                            current_time,
+                            half_hour,
+                            "30-minute break",
+                        )
+        self._record_duty_status(
+            "ON_DUTY_NOT_DRIVING", current_time, one_hour, "Dropoff"
+        )
+        return self.plan_result(route)
+
+    def _shift_driving_chunks(self, speed_mph=None):
+        """
+        Driving chunks of one full shift, or None when the closed form does not
+        apply: fractional limits (chunk arithmetic would no longer be exact) or
+        a 14-hour window tight enough to end a shift before 11 hours of driving
+        at ``speed_mph`` (AVERAGE_SPEED_MPH by default).
+        """
+        max_driving = self.MAX_DRIVING_HOURS
+        break_after = self.BREAK_AFTER_DRIVING_HOURS
+        if not (float(max_driving).is_integer() and float(break_after).is_integer()):
+            return None
+        chunks = [break_after] * int(max_driving // break_after)
+        if max_driving % break_after:
+            chunks.append(max_driving % break_after)
+
+        breaks = sum(chunk >= break_after for chunk in chunks)
+        refuels = 0
+        if self.fuel_stops:
+            refuels = 1 + int(
+                max_driving
+                * (speed_mph or self.AVERAGE_SPEED_MPH)
+                // self.FUEL_INTERVAL_MILES
+            )
+        # Pickup hour + driving + breaks + fuel stops, the busiest possible shift.
+        busiest_shift = 1.0 + max_driving + 0.5 * (breaks + refuels)
+        if busiest_shift >= self.MAX_ON_DUTY_HOURS:
+            return None
+        return chunks
+
+    def _shift_count(self, total_driving_hours):
+        """Number of shifts needed to drive total_driving_hours."""
+        max_driving = self.MAX_DRIVING_HOURS
+        shifts = max(1, math.ceil(total_driving_hours / max_driving))
+        # Correct for rounding in the division; the subtractions are exact.
+        while total_driving_hours - max_driving * shifts > 0:
+            shifts += 1
+        while shifts > 1 and total_driving_hours - max_driving * (shifts - 1) <= 0:
+            shifts -= 1
+        return shifts
+
+    def restart_if_needed(self, current_time, on_duty_hours):
+        """
+        Takes a 34-hour restart before ``on_duty_hours`` of work that would
+        run past the 70-hour cycle, and returns the time work can start.
+        """
+        if self.cycle_hours + on_duty_hours <= self.MAX_CYCLE_HOURS:
+            return current_time
+        self.add_duty_status(
+            "OFF_DUTY",
+            current_time,
+            current_time + timedelta(hours=self.RESTART_HOURS),
+            "34-hour Restart",
+        )
+        self.cycle_hours = 0.0
+        return current_time + timedelta(hours=self.RESTART_HOURS)
+
+    def _fits_in_cycle(self, total_miles, total_driving_hours, chunks):
+        """
+        Whether the whole trip's on-duty time, counted generously, stays
+        within the 70-hour cycle, so ``plan_trip`` would take no restart.
+        """
+        shifts = self._shift_count(total_driving_hours)
+        breaks = shifts * sum(
+            chunk >= self.BREAK_AFTER_DRIVING_HOURS for chunk in chunks
+        )
+        refuels = 0
+        if self.fuel_stops:
+            refuels = 1 + int(total_miles // self.FUEL_INTERVAL_MILES)
+        on_duty = 2.0 + total_driving_hours + 0.5 * (breaks + refuels)
+        return self.cycle_hours + on_duty <= self.MAX_CYCLE_HOURS
+
+    def _record_duty_status(self, status, start, duration, description):
+        end = start + duration
         self.duty_statuses.append(
             {
                 "status": status,
@@ -166,5 +401,8 @@ class HOSCalculator:
                 "location_description": description,
             }
         )
-        # Add debug print to show the description being added
-        print(f"Added duty status: {description}")
+        return end
+
+    def add_duty_status(self, status, start, end, description):
+        self._record_duty_status(status, start, end - start, description)
+        logger.debug("Added duty status: %s", description)
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from apps.core.models import DutyStatus, Trip, set_cells
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the spatial index cells of trips and duty statuses from their "
+        "coordinates, a batch of rows at a time. Without --all only rows "
+        "missing a cell are filled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every row, e.g. after changing the cell size",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Rows updated per query",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        for model in (Trip, DutyStatus):
+            filled = self.backfill(model, options["all"], options["batch_size"])
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {filled} rows")
+        self.stdout.write(self.style.SUCCESS("Spatial cells are up to date."))
+
+    def backfill(self, model, everything, batch_size):
+        cell_fields = list(model.CELL_FIELDS)
+        coordinate_fields = [
+            field for pair in model.CELL_FIELDS.values() for field in pair
+        ]
+        missing = Q()
+        if not everything:
+            for cell_field in cell_fields:
+                missing |= Q(**{f"{cell_field}__isnull": True})
+        rows = model.objects.filter(missing).order_by("pk")
+        filled, last_pk = 0, 0
+        while True:
+            # Keyset batches, so rows filled by the previous batch are not skipped.
+            batch = list(
+                rows.filter(pk__gt=last_pk).only(*coordinate_fields)[:batch_size]
+            )
+            if not batch:
+                return filled
+            for instance in batch:
+                set_cells(instance)
+            model.objects.bulk_update(batch, cell_fields)
+            filled += len(batch)
+            last_pk = batch[-1].pk
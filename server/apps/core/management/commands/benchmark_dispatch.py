@@ -0,0 +1,110 @@
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+from apps.core.dispatch import rank_drivers, rank_vehicles
+from apps.core.models import Carrier, Driver, Vehicle, Trip, set_cells
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark dispatch ranking for a carrier whose trucks are spread over "
+        "the continental US. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--trucks", type=int, default=5000, help="Drivers and vehicles to rank"
+        )
+        parser.add_argument(
+            "--radius", type=float, default=250.0, help="Search radius in miles"
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Pickups to time")
+
+    def handle(self, *args, **options):
+        if options["trucks"] < 1 or options["repeat"] < 1:
+            raise CommandError("--trucks and --repeat must be at least 1.")
+
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        runner.setup_test_environment()
+        old_config = runner.setup_databases()
+        try:
+            self.run_benchmark(options["trucks"], options["radius"], options["repeat"])
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+    def run_benchmark(self, count, radius, repeat):
+        rng = random.Random(42)
+        carrier = Carrier.objects.create(
+            name="Benchmark Freight", main_office_address="1 Bench St"
+        )
+        User.objects.bulk_create(
+            User(username=f"bench-{index}", password="!") for index in range(count)
+        )
+        users = User.objects.filter(username__startswith="bench-").order_by("id")
+        Driver.objects.bulk_create(
+            Driver(user=user, license_number=f"BENCH-{user.id}", carrier=carrier)
+            for user in users
+        )
+        Vehicle.objects.bulk_create(
+            Vehicle(
+                vehicle_number=f"BENCH-T{index}",
+                license_plate=f"BENCH{index}",
+                state="CA",
+                carrier=carrier,
+            )
+            for index in range(count)
+        )
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        trips = []
+        for driver_id, vehicle_id in zip(
+            Driver.objects.filter(carrier=carrier)
+            .order_by("id")
+            .values_list("id", flat=True),
+            Vehicle.objects.filter(carrier=carrier)
+            .order_by("id")
+            .values_list("id", flat=True),
+        ):
+            latitude, longitude = rng.uniform(25, 49), rng.uniform(-124, -67)
+            trips.append(
+                Trip(
+                    driver_id=driver_id,
+                    vehicle_id=vehicle_id,
+                    current_longitude=longitude,
+                    current_latitude=latitude,
+                    pickup_longitude=longitude,
+                    pickup_latitude=latitude,
+                    dropoff_longitude=longitude,
+                    dropoff_latitude=latitude,
+                    start_time=start + timedelta(minutes=rng.randrange(10080)),
+                    status="COMPLETED",
+                )
+            )
+        for trip in trips:
+            set_cells(trip)
+        Trip.objects.bulk_create(trips, batch_size=1000)
+
+        pickups = [(rng.uniform(25, 49), rng.uniform(-124, -67)) for _ in range(repeat)]
+        timings, found = [], 0
+        for latitude, longitude in pickups:
+            started = time.perf_counter()
+            drivers = rank_drivers(carrier.id, latitude, longitude, radius)
+            rank_vehicles(carrier.id, latitude, longitude, radius)
+            timings.append(time.perf_counter() - started)
+            found += len(drivers)
+
+        self.stdout.write(f"Trucks: {count}, radius: {radius:g} miles")
+        self.stdout.write(f"Drivers returned per pickup: {found / repeat:.1f}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Median: {statistics.median(timings) * 1000:.1f} ms, "
+                f"max: {max(timings) * 1000:.1f} ms"
+            )
+        )
@@ -0,0 +1,102 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+from rest_framework.test import APIClient
+from apps.core.models import Carrier, Driver, Vehicle, Trip, DutyStatus
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the bulk duty-status upload against one POST per status. "
+        "Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--statuses", type=int, default=500, help="Number of statuses to upload"
+        )
+
+    def handle(self, *args, **options):
+        count = options["statuses"]
+        if count < 1:
+            raise CommandError("--statuses must be at least 1.")
+
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        runner.setup_test_environment()
+        old_config = runner.setup_databases()
+        try:
+            self.run_benchmark(count)
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+    def run_benchmark(self, count):
+        carrier = Carrier.objects.create(
+            name="Benchmark Freight", main_office_address="1 Bench St"
+        )
+        user = User.objects.create_user("bench-driver", password="password123")
+        driver = Driver.objects.create(
+            user=user, license_number="BENCH-1", carrier=carrier
+        )
+        vehicle = Vehicle.objects.create(
+            vehicle_number="BENCH-T1",
+            license_plate="BENCH1",
+            state="CA",
+            carrier=carrier,
+        )
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        trip = Trip.objects.create(
+            driver=driver,
+            vehicle=vehicle,
+            current_longitude=-118.0,
+            current_latitude=34.0,
+            pickup_longitude=-118.0,
+            pickup_latitude=34.0,
+            dropoff_longitude=-74.0,
+            dropoff_latitude=40.0,
+            start_time=start,
+        )
+        statuses = [
+            {
+                "status": "DRIVING" if index % 2 else "ON_DUTY_NOT_DRIVING",
+                "start_time": (start + timedelta(minutes=15 * index)).isoformat(),
+                "end_time": (start + timedelta(minutes=15 * index + 15)).isoformat(),
+                "location": [-118.0 + index * 0.01, 34.0],
+                "location_description": "Benchmark",
+            }
+            for index in range(count)
+        ]
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = f"/api/trips/{trip.id}/duty-status/"
+
+        started = time.perf_counter()
+        for item in statuses:
+            response = client.post(url, item, format="json")
+            if response.status_code != 201:
+                raise CommandError(f"Single POST failed: {response.data}")
+        single_seconds = time.perf_counter() - started
+        DutyStatus.objects.all().delete()
+
+        started = time.perf_counter()
+        response = client.post(f"{url}bulk/", statuses, format="json")
+        bulk_seconds = time.perf_counter() - started
+        if response.status_code != 201:
+            raise CommandError(f"Bulk POST failed: {response.data}")
+
+        self.stdout.write(f"Statuses: {count}")
+        self.stdout.write(
+            f"{count} single POSTs: {single_seconds:.3f}s "
+            f"({count / single_seconds:,.0f} statuses/s)"
+        )
+        self.stdout.write(
+            f"1 bulk POST: {bulk_seconds:.3f}s ({count / bulk_seconds:,.0f} statuses/s)"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Speedup: {single_seconds / bulk_seconds:.1f}x")
+        )
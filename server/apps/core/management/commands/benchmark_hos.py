@@ -0,0 +1,79 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.hos_logic import HOSCalculator
+from apps.core.hos_batch import plan_trips
+
+
+class Command(BaseCommand):
+    help = "Benchmark the closed-form and batch HOS planners against plan_trip"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--trips", type=int, default=2000, help="Number of trips to plan"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed for the random trip corpus"
+        )
+
+    def handle(self, *args, **options):
+        count = options["trips"]
+        if count < 1:
+            raise CommandError("--trips must be at least 1.")
+
+        rng = random.Random(options["seed"])
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        start_times = [
+            base + timedelta(minutes=rng.randrange(60 * 24 * 365)) for _ in range(count)
+        ]
+        # [lon, lat] pairs across the continental US, as Trip.get_*_location() returns.
+        pickups = [
+            [rng.uniform(-124.0, -67.0), rng.uniform(25.0, 49.0)] for _ in range(count)
+        ]
+        dropoffs = [
+            [rng.uniform(-124.0, -67.0), rng.uniform(25.0, 49.0)] for _ in range(count)
+        ]
+
+        started = time.perf_counter()
+        scalar = [
+            HOSCalculator(start_time, 0.0, pickup, dropoff).plan_trip()
+            for start_time, pickup, dropoff in zip(start_times, pickups, dropoffs)
+        ]
+        scalar_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        closed_form = [
+            HOSCalculator(start_time, 0.0, pickup, dropoff).plan_trip_closed_form()
+            for start_time, pickup, dropoff in zip(start_times, pickups, dropoffs)
+        ]
+        closed_form_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batch = plan_trips(start_times, 0.0, pickups, dropoffs)
+        batch_seconds = time.perf_counter() - started
+
+        mismatches = sum(
+            expected["duty_statuses"] != actual["duty_statuses"] or expected != closed
+            for expected, actual, closed in zip(scalar, batch, closed_form)
+        )
+        segments = sum(len(plan["duty_statuses"]) for plan in batch)
+
+        self.stdout.write(f"Trips: {count} | Segments: {segments}")
+        self.stdout.write(
+            f"plan_trip loop: {scalar_seconds:.3f}s "
+            f"({count / scalar_seconds:,.0f} trips/s)"
+        )
+        self.stdout.write(
+            f"plan_trip_closed_form: {closed_form_seconds:.3f}s "
+            f"({count / closed_form_seconds:,.0f} trips/s)"
+        )
+        self.stdout.write(
+            f"plan_trips batch: {batch_seconds:.3f}s "
+            f"({count / batch_seconds:,.0f} trips/s)"
+        )
+        self.stdout.write(f"Batch speedup: {scalar_seconds / batch_seconds:.1f}x")
+        if mismatches:
+            raise CommandError(f"{mismatches} plans differ from plan_trip.")
+        self.stdout.write(self.style.SUCCESS("All planners match plan_trip."))
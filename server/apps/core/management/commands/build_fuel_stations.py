@@ -0,0 +1,45 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.fuel_stations import build_stations, write_stations
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the fuel station index plans place their fueling stops from. "
+        "Reads a CSV of truck stops with latitude, longitude and optionally "
+        "name columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stations", required=True, help="Stations CSV")
+        parser.add_argument("--output", required=True, help="Index file to write")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        names, latitudes, longitudes = [], [], []
+        with open(options["stations"], newline="") as source:
+            reader = csv.DictReader(source)
+            missing = {"latitude", "longitude"} - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(
+                    f"{options['stations']} lacks columns: "
+                    f"{', '.join(sorted(missing))}"
+                )
+            try:
+                for row in reader:
+                    latitudes.append(float(row["latitude"]))
+                    longitudes.append(float(row["longitude"]))
+                    names.append((row.get("name") or "").strip())
+                arrays, meta = build_stations(names, latitudes, longitudes)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+        write_stations(options["output"], arrays, **meta)
+
+        self.stdout.write(f"{len(names)} stations")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['output']} in {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,80 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.routing import build_graph, write_graph
+
+TRUE_VALUES = {"1", "true", "yes", "y"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the road graph file the road_graph routing backend memory-maps. "
+        "Reads a nodes CSV (id, latitude, longitude) and an edges CSV (source, "
+        "target and optionally speed_mph, miles, oneway), e.g. exported from "
+        "OpenStreetMap."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--nodes", required=True, help="Nodes CSV")
+        parser.add_argument("--edges", required=True, help="Edges CSV")
+        parser.add_argument("--output", required=True, help="Graph file to write")
+        parser.add_argument(
+            "--default-speed",
+            type=float,
+            default=50.0,
+            help="Speed in mph of edges without speed_mph",
+        )
+
+    def handle(self, *args, **options):
+        if options["default_speed"] <= 0:
+            raise CommandError("--default-speed must be positive.")
+        started = time.perf_counter()
+        try:
+            node_ids, latitudes, longitudes = [], [], []
+            for row in self.rows(options["nodes"], ("id", "latitude", "longitude")):
+                node_ids.append(int(row["id"]))
+                latitudes.append(float(row["latitude"]))
+                longitudes.append(float(row["longitude"]))
+
+            sources, targets, speeds, miles, oneway = [], [], [], [], []
+            for row in self.rows(options["edges"], ("source", "target")):
+                sources.append(int(row["source"]))
+                targets.append(int(row["target"]))
+                speeds.append(float(row.get("speed_mph") or options["default_speed"]))
+                miles.append(float(row["miles"]) if row.get("miles") else None)
+                oneway.append((row.get("oneway") or "").lower() in TRUE_VALUES)
+
+            arrays, meta = build_graph(
+                node_ids,
+                latitudes,
+                longitudes,
+                sources,
+                targets,
+                speeds,
+                # Miles are measured between the nodes unless every edge has them.
+                miles=None if None in miles else miles,
+                oneway=oneway,
+            )
+        except (KeyError, ValueError) as exc:
+            raise CommandError(str(exc))
+        write_graph(options["output"], arrays, **meta)
+
+        self.stdout.write(
+            f"{len(node_ids)} nodes, {len(arrays['targets'])} directed edges"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['output']} in {time.perf_counter() - started:.1f}s."
+            )
+        )
+
+    def rows(self, path, required):
+        with open(path, newline="") as source:
+            reader = csv.DictReader(source)
+            missing = set(required) - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(
+                    f"{path} lacks columns: {', '.join(sorted(missing))}"
+                )
+            yield from reader
@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from apps.core.models import (
+    CarrierDailyRollup,
+    ELDLog,
+    Trip,
+    rebuild_daily_rollups,
+    rollup_day,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the carrier and driver daily rollups from ELD logs and trips, "
+        "a chunk of days at a time. Without --start/--end the whole history "
+        "is rebuilt."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start", type=date.fromisoformat, help="First day (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--end", type=date.fromisoformat, help="Last day (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--chunk-days",
+            type=int,
+            default=31,
+            help="Days rebuilt per transaction",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_days"] < 1:
+            raise CommandError("--chunk-days must be at least 1.")
+        start, end = self.history_range()
+        start = options["start"] or start
+        end = options["end"] or end
+        if start is None or end is None:
+            self.stdout.write("Nothing to rebuild.")
+            return
+        if start > end:
+            raise CommandError("--start must not be after --end.")
+
+        chunk = timedelta(days=options["chunk_days"])
+        rows = 0
+        while start <= end:
+            chunk_end = min(start + chunk - timedelta(days=1), end)
+            written = rebuild_daily_rollups(start, chunk_end)
+            rows += written
+            self.stdout.write(f"{start} to {chunk_end}: {written} driver days")
+            start = chunk_end + timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} driver days."))
+
+    def history_range(self):
+        """The first and last day with ELD logs, trips or existing rollups."""
+        days = []
+        logs = ELDLog.objects.aggregate(first=Min("date"), last=Max("date"))
+        trips = Trip.objects.aggregate(first=Min("start_time"), last=Max("start_time"))
+        rollups = CarrierDailyRollup.objects.aggregate(
+            first=Min("day"), last=Max("day")
+        )
+        days += [day for day in logs.values() if day is not None]
+        days += [rollup_day(moment) for moment in trips.values() if moment is not None]
+        days += [day for day in rollups.values() if day is not None]
+        if not days:
+            return None, None
+        return min(days), max(days)
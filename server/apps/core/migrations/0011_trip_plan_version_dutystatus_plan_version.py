@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_add_vehicle_last_service_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='plan_version',
+            field=models.PositiveIntegerField(default=0, help_text='Version of the planned duty statuses stored for this trip'),
+        ),
+        migrations.AddField(
+            model_name='dutystatus',
+            name='plan_version',
+            field=models.PositiveIntegerField(blank=True, help_text='Trip plan version this status was materialized from; empty for logged statuses', null=True),
+        ),
+    ]
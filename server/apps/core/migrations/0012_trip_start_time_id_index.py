@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_trip_plan_version_dutystatus_plan_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['start_time', 'id'], name='core_trip_start_t_09503c_idx'),
+        ),
+    ]
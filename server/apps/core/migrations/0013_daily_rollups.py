@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_trip_start_time_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriverDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('total_miles', models.FloatField(default=0.0)),
+                ('fuel_consumed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_engine_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_idle_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('trips_planned', models.IntegerField(default=0)),
+                ('trips_in_progress', models.IntegerField(default=0)),
+                ('trips_completed', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='core.driver')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='core_driver_day_3a73f6_idx')],
+                'unique_together': {('driver', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CarrierDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('total_miles', models.FloatField(default=0.0)),
+                ('fuel_consumed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_engine_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_idle_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('trips_planned', models.IntegerField(default=0)),
+                ('trips_in_progress', models.IntegerField(default=0)),
+                ('trips_completed', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('carrier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='core.carrier')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='core_carrie_day_832ab9_idx')],
+                'unique_together': {('carrier', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriverCycle',
+            fields=[
+                ('driver', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cycle', serialize=False, to='core.driver')),
+                ('last_day', models.DateField()),
+                ('day_minutes', models.JSONField(default=list)),
+                ('total_minutes', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
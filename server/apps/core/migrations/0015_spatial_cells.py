@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_driver_cycle"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dutystatus",
+            name="cell",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="current_cell",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="dropoff_cell",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="pickup_cell",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="dutystatus",
+            index=models.Index(fields=["cell"], name="core_dutyst_cell_8d6bfe_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["current_cell"], name="core_trip_current_a21d64_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["pickup_cell"], name="core_trip_pickup__8a6267_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["dropoff_cell"], name="core_trip_dropoff_84f0c8_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_spatial_cells"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="vehicle",
+            name="last_service_date",
+        ),
+        migrations.AddField(
+            model_name="carrierdailyrollup",
+            name="trip_engine_hours",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name="carrierdailyrollup",
+            name="trip_fuel_used",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name="carrierdailyrollup",
+            name="trip_miles",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="driverdailyrollup",
+            name="trip_engine_hours",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name="driverdailyrollup",
+            name="trip_fuel_used",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name="driverdailyrollup",
+            name="trip_miles",
+            field=models.FloatField(default=0.0),
+        ),
+    ]
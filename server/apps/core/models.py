@@ -1,8 +1,27 @@
-from django.db import models
-from django.db.models import Sum
-from django.db.models.signals import post_save, post_delete
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, Round, TruncDate
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
+from django.utils import timezone
+from .cycle_tracker import (
+    CYCLE_DAYS,
+    CycleWindow,
+    cycle_changes,
+    cycle_summary,
+    on_duty_minutes_by_day,
+)
+from .duty_grid import ON_DUTY_STATUSES, forget_driver_grids
+from .geocell import cell_of
+from .principal import forget_principal
+from .route_cache import route_plan_cache, trip_plan_key
+from .routing import RoutePath
 
 
 class Carrier(models.Model):
@@ -83,6 +102,11 @@ class Trip(models.Model):
     dropoff_longitude = models.FloatField()
     dropoff_latitude = models.FloatField()
     dropoff_location_name = models.CharField(max_length=255, blank=True)
+
+    # Spatial index cells of the coordinates above, see geocell.py
+    current_cell = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    pickup_cell = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    dropoff_cell = models.PositiveIntegerField(null=True, blank=True, editable=False)
     
     # Odometer readings
     initial_odometer = models.FloatField(default=0.0, help_text="Initial odometer reading at trip start")
@@ -109,6 +133,9 @@ class Trip(models.Model):
     fuel_efficiency = models.FloatField(null=True, blank=True, help_text="Miles per gallon")
     
     current_cycle_hours = models.FloatField(default=0.0)
+    plan_version = models.PositiveIntegerField(
+        default=0, help_text="Version of the planned duty statuses stored for this trip"
+    )
     start_time = models.DateTimeField()
     end_time = models.DateTimeField(null=True, blank=True, help_text="Trip end time")
     status = models.CharField(
@@ -123,15 +150,40 @@ class Trip(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    PLANNING_FIELDS = (
+        "start_time",
+        "current_cycle_hours",
+        "pickup_longitude",
+        "pickup_latitude",
+        "dropoff_longitude",
+        "dropoff_latitude",
+    )
+    ROLLUP_FIELDS = ("driver_id", "start_time", "status")
+    TOTAL_FIELDS = ("total_miles", "fuel_used", "total_engine_hours")
+    CELL_FIELDS = {
+        "current_cell": ("current_latitude", "current_longitude"),
+        "pickup_cell": ("pickup_latitude", "pickup_longitude"),
+        "dropoff_cell": ("dropoff_latitude", "dropoff_longitude"),
+    }
+
     class Meta:
         indexes = [
             models.Index(fields=["driver", "start_time"]),
+            # Keyset pagination across drivers, e.g. a manager's carrier.
+            models.Index(fields=["start_time", "id"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["current_cell"]),
+            models.Index(fields=["pickup_cell"]),
+            models.Index(fields=["dropoff_cell"]),
         ]
 
     def __str__(self):
         return f"Trip {self.id} for {self.driver}"
 
+    def save(self, *args, **kwargs):
+        kwargs["update_fields"] = set_cells(self, kwargs.get("update_fields"))
+        super().save(*args, **kwargs)
+
     def get_current_location(self):
         return [self.current_longitude, self.current_latitude]
 
@@ -141,6 +193,126 @@ class Trip(models.Model):
     def get_dropoff_location(self):
         return [self.dropoff_longitude, self.dropoff_latitude]
 
+    def get_rollup_key(self):
+        """The driver, start day and status this trip is counted under in the daily rollups."""
+        return (self.driver_id, rollup_day(self.start_time), self.status)
+
+    def get_trip_totals(self):
+        """This trip's miles, fuel and engine hours as the daily rollups add them up."""
+        return metric_values(self, self.TOTAL_FIELDS)
+
+    def get_cycle_hours(self, planning_inputs=None):
+        """
+        The cycle hours to plan this trip from: the hours entered for it, or
+        the driver's logged on-duty hours in the eight days ending on the
+        trip's start day when those are higher. ``planning_inputs`` from
+        get_planning_inputs(), e.g. the loaded ones, stand in for the trip's
+        current start time and entered hours. A cycle window loaded with the
+        trip, as select_related("driver__cycle") does, saves its query.
+        """
+        start_time, entered, _, _ = planning_inputs or self.get_planning_inputs()
+        day = rollup_day(start_time)
+        if Trip.driver.is_cached(self) and Driver.cycle.is_cached(self.driver):
+            cycle = getattr(self.driver, "cycle", None)
+            tracked = cycle_window_status(self.driver_id, cycle, day)
+        else:
+            tracked = driver_cycle_status(self.driver_id, day)
+        return max(entered, tracked["on_duty_hours"])
+
+    def get_planning_inputs(self):
+        """The HOSCalculator arguments a route plan for this trip depends on."""
+        return (
+            self.start_time,
+            self.current_cycle_hours,
+            self.get_pickup_location(),
+            self.get_dropoff_location(),
+        )
+
+    @transaction.atomic
+    def materialize_plan(self, route_data):
+        """
+        Stores a route plan's duty statuses as DutyStatus rows, replacing any
+        previously materialized plan, and bumps the trip's plan_version.
+        Statuses logged by the driver are left untouched.
+        """
+        locked = Trip.objects.select_for_update().only("plan_version").get(pk=self.pk)
+        version = locked.plan_version + 1
+
+        pickup_longitude, pickup_latitude = self.get_pickup_location()
+        dropoff_longitude, dropoff_latitude = self.get_dropoff_location()
+        segments = [
+            (
+                segment,
+                datetime.fromisoformat(segment["start_time"]),
+                datetime.fromisoformat(segment["end_time"]),
+            )
+            for segment in route_data.get("duty_statuses", [])
+        ]
+        total_driving_hours = sum(
+            (end - start).total_seconds() / 3600
+            for segment, start, end in segments
+            if segment["status"] == "DRIVING"
+        )
+
+        path = RoutePath(route_data["polyline"]) if "polyline" in route_data else None
+
+        statuses = []
+        driven = 0.0
+        for segment, start, end in segments:
+            # Without a known stop location, place the segment along the
+            # route (or the pickup-dropoff line) by the share of driving done
+            # so far.
+            progress = driven / total_driving_hours if total_driving_hours else 0.0
+            if path is not None:
+                longitude, latitude = path.point_at(progress)
+            else:
+                longitude = (
+                    pickup_longitude + (dropoff_longitude - pickup_longitude) * progress
+                )
+                latitude = (
+                    pickup_latitude + (dropoff_latitude - pickup_latitude) * progress
+                )
+            description = segment["location_description"]
+            if "station" in segment:
+                description = f"{description} at {segment['station']}"[:255]
+            statuses.append(
+                DutyStatus(
+                    trip=self,
+                    status=segment["status"],
+                    start_time=start,
+                    end_time=end,
+                    longitude=segment.get("longitude", longitude),
+                    latitude=segment.get("latitude", latitude),
+                    location_description=description,
+                    plan_version=version,
+                )
+            )
+            set_cells(statuses[-1])
+            if segment["status"] == "DRIVING":
+                driven += (end - start).total_seconds() / 3600
+
+        DutyStatus.objects.filter(trip=self, plan_version__isnull=False).delete()
+        statuses = DutyStatus.objects.bulk_create(statuses)
+        Trip.objects.filter(pk=self.pk).update(
+            plan_version=version, updated_at=timezone.now()
+        )
+        self.plan_version = version
+        forget_driver_grids(self.driver_id)
+        return statuses
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded planning inputs so a save that changes them can
+        # evict the plan cached for the old ones.
+        if all(field in instance.__dict__ for field in cls.PLANNING_FIELDS):
+            instance._loaded_planning_inputs = instance.get_planning_inputs()
+        if all(field in instance.__dict__ for field in cls.ROLLUP_FIELDS):
+            instance._loaded_rollup_key = instance.get_rollup_key()
+        if all(field in instance.__dict__ for field in cls.TOTAL_FIELDS):
+            instance._loaded_trip_totals = instance.get_trip_totals()
+        return instance
+
 
 class DutyStatus(models.Model):
     trip = models.ForeignKey(
@@ -161,17 +333,50 @@ class DutyStatus(models.Model):
     latitude = models.FloatField()
     location_description = models.CharField(max_length=255)
     remarks = models.TextField(blank=True)
+    plan_version = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Trip plan version this status was materialized from; empty for logged statuses",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Spatial index cell of the coordinates above, see geocell.py
+    cell = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    CYCLE_FIELDS = ("trip_id", "status", "start_time", "end_time", "plan_version")
+    CELL_FIELDS = {"cell": ("latitude", "longitude")}
+
     class Meta:
         indexes = [
             models.Index(fields=["trip", "start_time"]),
+            models.Index(fields=["cell"]),
         ]
 
+    def save(self, *args, **kwargs):
+        kwargs["update_fields"] = set_cells(self, kwargs.get("update_fields"))
+        super().save(*args, **kwargs)
+
     def get_location(self):
         return [self.longitude, self.latitude]
 
+    def get_cycle_entry(self):
+        """What this status adds to its driver's cycle: nothing for planned statuses."""
+        if self.plan_version is not None:
+            return None
+        return (self.status, self.start_time, self.end_time)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded cycle entry so a save can apply the difference.
+        if all(field in instance.__dict__ for field in cls.CYCLE_FIELDS):
+            instance._loaded_cycle_entry = (
+                instance.trip_id,
+                instance.get_cycle_entry(),
+            )
+        return instance
+
     def __str__(self):
         return f"{self.status} for Trip {self.trip.id}"
 
@@ -215,22 +420,872 @@ class ELDLog(models.Model):
     def __str__(self):
         return f"ELD Log for Trip {self.trip.id} on {self.date}"
 
+    TOTAL_FIELDS = ["total_miles", "fuel_consumed", "total_engine_hours"]
+    ROLLUP_FIELDS = [*TOTAL_FIELDS, "total_idle_hours"]
+
+    def get_trip_totals(self):
+        """The trip id and this log's contribution to the trip totals."""
+        return (self.trip_id, *metric_values(self, self.TOTAL_FIELDS))
+
+    def get_rollup_values(self):
+        """The trip id, the day and this log's contribution to the daily rollups."""
+        day = self._meta.get_field("date").to_python(self.date)
+        return (self.trip_id, day, *metric_values(self, self.ROLLUP_FIELDS))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this row contributes to its trip and day so saves and
+        # deletes can apply a delta instead of re-aggregating.
+        if all(field in instance.__dict__ for field in ["trip_id", *cls.TOTAL_FIELDS]):
+            instance._loaded_trip_totals = instance.get_trip_totals()
+        if all(
+            field in instance.__dict__ for field in ["trip_id", "date", *cls.ROLLUP_FIELDS]
+        ):
+            instance._loaded_rollup_values = instance.get_rollup_values()
+        return instance
+
+
+class DailyRollup(models.Model):
+    """
+    Per-day totals that the analytics endpoints read instead of scanning
+    every trip and ELD log. Miles, fuel, engine and idle hours are what the
+    ELD logs record for the day. The trip totals and counts are those of the
+    trips starting that day: the miles, fuel and engine hours stored on them,
+    whether added up from their ELD logs or read off the odometer when they
+    were completed, and how many there are in each status. Kept in step by
+    the ELDLog and Trip signal handlers below and rebuilt with the
+    ``rebuild_rollups`` command.
+    """
+
+    day = models.DateField()
+    total_miles = models.FloatField(default=0.0)
+    fuel_consumed = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_engine_hours = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0
+    )
+    total_idle_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    trip_miles = models.FloatField(default=0.0)
+    trip_fuel_used = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    trip_engine_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    trips_planned = models.IntegerField(default=0)
+    trips_in_progress = models.IntegerField(default=0)
+    trips_completed = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    LOG_FIELDS = ELDLog.ROLLUP_FIELDS
+    TRIP_TOTAL_FIELDS = {
+        "total_miles": "trip_miles",
+        "fuel_used": "trip_fuel_used",
+        "total_engine_hours": "trip_engine_hours",
+    }
+    TRIP_COUNT_FIELDS = {
+        "PLANNED": "trips_planned",
+        "IN_PROGRESS": "trips_in_progress",
+        "COMPLETED": "trips_completed",
+    }
+    METRIC_FIELDS = [
+        *LOG_FIELDS,
+        *TRIP_TOTAL_FIELDS.values(),
+        *TRIP_COUNT_FIELDS.values(),
+    ]
+    # Float metrics are rounded to this many places whenever they are written,
+    # so adding and taking away the same miles leaves exactly zero behind.
+    FLOAT_PLACES = 6
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def rounded(cls, name, value):
+        """A metric value as it is stored: floats rounded to FLOAT_PLACES."""
+        if isinstance(cls._meta.get_field(name), models.FloatField):
+            return round(value, cls.FLOAT_PLACES)
+        return value
+
+    @classmethod
+    def increment(cls, name, amount):
+        """An expression adding ``amount`` to a stored metric."""
+        if isinstance(cls._meta.get_field(name), models.FloatField):
+            return Round(F(name) + amount, cls.FLOAT_PLACES)
+        return F(name) + amount
+
+
+class CarrierDailyRollup(DailyRollup):
+    carrier = models.ForeignKey(
+        Carrier, on_delete=models.CASCADE, related_name="daily_rollups"
+    )
+
+    class Meta:
+        unique_together = ("carrier", "day")
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self):
+        return f"Rollup for {self.carrier} on {self.day}"
+
+
+class DriverDailyRollup(DailyRollup):
+    driver = models.ForeignKey(
+        Driver, on_delete=models.CASCADE, related_name="daily_rollups"
+    )
+
+    class Meta:
+        unique_together = ("driver", "day")
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self):
+        return f"Rollup for {self.driver} on {self.day}"
+
+
+class DriverCycle(models.Model):
+    """
+    A driver's logged on-duty minutes for the eight days ending on
+    ``last_day``, stored as the ring buffer of a CycleWindow. Kept in step by
+    record_cycle_minutes() as duty statuses are logged, edited and deleted;
+    planned statuses do not count.
+    """
+
+    driver = models.OneToOneField(
+        Driver, on_delete=models.CASCADE, primary_key=True, related_name="cycle"
+    )
+    last_day = models.DateField()
+    day_minutes = models.JSONField(default=list)
+    total_minutes = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def get_window(self):
+        return CycleWindow(self.last_day, self.day_minutes, self.total_minutes)
+
+    def set_window(self, window):
+        self.last_day = window.last_day
+        self.day_minutes = window.minutes
+        self.total_minutes = window.total
+
+    def __str__(self):
+        return f"Cycle for {self.driver} through {self.last_day}"
+
+
+def set_cells(instance, update_fields=None):
+    """
+    Fills a Trip's or DutyStatus's spatial cells from its coordinates, for
+    save() and for bulk writes, which skip it. Returns ``update_fields`` with
+    the cells of any coordinates it names added.
+    """
+    fields = instance.CELL_FIELDS.items()
+    if update_fields is not None:
+        update_fields = set(update_fields)
+        fields = [
+            (cell_field, coordinates)
+            for cell_field, coordinates in fields
+            if update_fields.intersection(coordinates)
+        ]
+        update_fields.update(cell_field for cell_field, coordinates in fields)
+    for cell_field, (latitude, longitude) in fields:
+        setattr(
+            instance,
+            cell_field,
+            cell_of(getattr(instance, latitude), getattr(instance, longitude)),
+        )
+    return update_fields
+
+
+def metric_values(instance, names):
+    """
+    The given metrics of a trip or ELD log normalized the way the database
+    stores them. Empty values count as zero, as they do in SUM().
+    """
+    values = []
+    for name in names:
+        field = instance._meta.get_field(name)
+        value = getattr(instance, name)
+        if isinstance(field, models.DecimalField):
+            value = field.to_python(value) if value is not None else Decimal(0)
+            value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+        else:
+            value = float(value)
+        values.append(value)
+    return values
+
+
+def recalculate_trip_totals(trip_ids):
+    """
+    Recomputes fuel_used, total_miles and total_engine_hours from the ELD logs
+    of the given trips with one grouped aggregate and one bulk update.
+    """
+    trip_ids = set(trip_ids)
+    if not trip_ids:
+        return
+    totals = {
+        row["trip_id"]: row
+        for row in ELDLog.objects.filter(trip_id__in=trip_ids)
+        .values("trip_id")
+        .annotate(
+            total_fuel=Sum("fuel_consumed"),
+            total_miles=Sum("total_miles"),
+            total_engine_hours=Sum("total_engine_hours"),
+        )
+    }
+    now = timezone.now()
+    trips = []
+    for trip_id in trip_ids:
+        row = totals.get(trip_id, {})
+        trips.append(
+            Trip(
+                id=trip_id,
+                fuel_used=row.get("total_fuel") or 0.00,
+                total_miles=row.get("total_miles") or 0.0,
+                total_engine_hours=row.get("total_engine_hours") or 0.00,
+                updated_at=now,
+            )
+        )
+    Trip.objects.bulk_update(
+        trips, ["fuel_used", "total_miles", "total_engine_hours", "updated_at"]
+    )
+
+
+_trip_totals_state = threading.local()
+
+
+@contextmanager
+def suspend_trip_totals():
+    """
+    Defers trip total and daily rollup maintenance for ELD logs saved or
+    deleted inside the block. The affected trips and days are recalculated
+    once when the block exits normally; nested blocks defer to the outermost
+    one.
+    """
+    pending = getattr(_trip_totals_state, "pending", None)
+    if pending is not None:
+        yield pending
+        return
+    _trip_totals_state.pending = pending = set()
+    _trip_totals_state.pending_rollups = pending_rollups = set()
+    try:
+        yield pending
+    finally:
+        _trip_totals_state.pending = None
+        _trip_totals_state.pending_rollups = None
+    recalculate_trip_totals(pending)
+    refresh_log_rollups(pending_rollups)
+
+
+def apply_trip_totals_delta(trip_id, miles, fuel, engine_hours):
+    """Adds the given amounts to a trip's totals in one atomic UPDATE."""
+    if not (miles or fuel or engine_hours):
+        return
+    Trip.objects.filter(pk=trip_id).update(
+        total_miles=F("total_miles") + miles,
+        fuel_used=Coalesce(F("fuel_used"), Value(Decimal(0))) + fuel,
+        total_engine_hours=F("total_engine_hours") + engine_hours,
+        updated_at=timezone.now(),
+    )
+
+
+def rollup_day(moment):
+    """The day a timestamp falls on in the current time zone, as TruncDate() computes it."""
+    return timezone.localtime(moment).date()
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def daily_rollup_rows(logs, trips):
+    """
+    Rollup metrics per (driver_id, carrier_id, day) aggregated from the given
+    ELD logs and trips, with one GROUP BY query each.
+    """
+    rows = {}
+
+    def row_for(key):
+        if key not in rows:
+            rows[key] = dict.fromkeys(DailyRollup.METRIC_FIELDS, 0)
+        return rows[key]
+
+    logged = (
+        logs.values("trip__driver", "trip__driver__carrier", "date")
+        .annotate(**{f"sum_{name}": Sum(name) for name in DailyRollup.LOG_FIELDS})
+        .order_by()
+    )
+    for row in logged:
+        metrics = row_for(
+            (row["trip__driver"], row["trip__driver__carrier"], row["date"])
+        )
+        for name in DailyRollup.LOG_FIELDS:
+            metrics[name] = DailyRollup.rounded(name, row[f"sum_{name}"] or 0)
+
+    started = (
+        trips.annotate(day=TruncDate("start_time"))
+        .values("driver", "driver__carrier", "day", "status")
+        .annotate(
+            trips=Count("id"),
+            **{f"sum_{name}": Sum(name) for name in DailyRollup.TRIP_TOTAL_FIELDS},
+        )
+        .order_by()
+    )
+    for row in started:
+        metrics = row_for((row["driver"], row["driver__carrier"], row["day"]))
+        metrics[DailyRollup.TRIP_COUNT_FIELDS[row["status"]]] = row["trips"]
+        for name, field in DailyRollup.TRIP_TOTAL_FIELDS.items():
+            total = metrics[field] + (row[f"sum_{name}"] or 0)
+            metrics[field] = DailyRollup.rounded(field, total)
+    return rows
+
+
+def carrier_rollup_rows(rows):
+    """Sums rows from daily_rollup_rows() per (carrier_id, day)."""
+    carriers = {}
+    for (_, carrier_id, day), metrics in rows.items():
+        total = carriers.setdefault(
+            (carrier_id, day), dict.fromkeys(DailyRollup.METRIC_FIELDS, 0)
+        )
+        for name, value in metrics.items():
+            total[name] = DailyRollup.rounded(name, total[name] + value)
+    return carriers
+
+
+def save_rollups(model, key_field, rows):
+    """Upserts rollup rows given as {(key_id, day): metrics}."""
+    model.objects.bulk_create(
+        [
+            model(**{f"{key_field}_id": key, "day": day}, **metrics)
+            for (key, day), metrics in rows.items()
+        ],
+        update_conflicts=True,
+        unique_fields=[key_field, "day"],
+        update_fields=[*DailyRollup.METRIC_FIELDS, "updated_at"],
+        batch_size=500,
+    )
+
+
+def refresh_daily_rollups(keys):
+    """
+    Recomputes the rollups of the given (driver_id, day) pairs, and of those
+    drivers' carriers on the same days, from the ELD logs and trips.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    carrier_of = dict(
+        Driver.objects.filter(pk__in={driver_id for driver_id, _ in keys}).values_list(
+            "id", "carrier_id"
+        )
+    )
+    keys = {(driver_id, day) for driver_id, day in keys if driver_id in carrier_of}
+    carrier_keys = {(carrier_of[driver_id], day) for driver_id, day in keys}
+    carriers = {carrier_id for carrier_id, _ in carrier_keys}
+    days = {day for _, day in keys}
+    if not keys:
+        return
+    rows = daily_rollup_rows(
+        ELDLog.objects.filter(trip__driver__carrier__in=carriers, date__in=days),
+        Trip.objects.filter(
+            driver__carrier__in=carriers,
+            start_time__gte=day_start(min(days)),
+            start_time__lt=day_start(max(days) + timedelta(days=1)),
+        ),
+    )
+    empty = dict.fromkeys(DailyRollup.METRIC_FIELDS, 0)
+    save_rollups(
+        DriverDailyRollup,
+        "driver",
+        {
+            (driver_id, day): rows.get((driver_id, carrier_of[driver_id], day), empty)
+            for driver_id, day in keys
+        },
+    )
+    carrier_rows = carrier_rollup_rows(rows)
+    save_rollups(
+        CarrierDailyRollup,
+        "carrier",
+        {key: carrier_rows.get(key, empty) for key in carrier_keys},
+    )
+
+
+def refresh_log_rollups(trip_days):
+    """
+    refresh_daily_rollups() for ELD logs given as (trip_id, day) pairs: the
+    days they record, and the days their trips start on, whose trip totals
+    they feed.
+    """
+    trip_days = set(trip_days)
+    if not trip_days:
+        return
+    owners = {
+        trip_id: (driver_id, rollup_day(start_time))
+        for trip_id, driver_id, start_time in Trip.objects.filter(
+            pk__in={trip_id for trip_id, _ in trip_days}
+        ).values_list("id", "driver_id", "start_time")
+    }
+    keys = set()
+    for trip_id, day in trip_days:
+        if trip_id in owners:
+            driver_id, start_day = owners[trip_id]
+            keys.update([(driver_id, day), (driver_id, start_day)])
+    refresh_daily_rollups(keys)
+
+
+def upsert_eld_logs(logs, update_fields):
+    """
+    Inserts or updates ELD logs on (trip, date) in one statement and refreshes
+    the trip totals and daily rollups they feed. ``logs`` holds at most one
+    log per (trip, date).
+    """
+    logs = list(logs)
+    if not logs:
+        return
+    with transaction.atomic():
+        ELDLog.objects.bulk_create(
+            logs,
+            update_conflicts=True,
+            unique_fields=["trip", "date"],
+            update_fields=[*update_fields, "updated_at"],
+        )
+        recalculate_trip_totals(log.trip_id for log in logs)
+        refresh_log_rollups((log.trip_id, log.date) for log in logs)
+
+
+def rebuild_daily_rollups(start, end):
+    """
+    Replaces every driver and carrier rollup from ``start`` to ``end``
+    inclusive with totals aggregated from the ELD logs and trips. Returns the
+    number of driver rows written.
+    """
+    with transaction.atomic():
+        for model in (DriverDailyRollup, CarrierDailyRollup):
+            model.objects.filter(day__range=(start, end)).delete()
+        rows = daily_rollup_rows(
+            ELDLog.objects.filter(date__range=(start, end)),
+            Trip.objects.filter(
+                start_time__gte=day_start(start),
+                start_time__lt=day_start(end + timedelta(days=1)),
+            ),
+        )
+        save_rollups(
+            DriverDailyRollup,
+            "driver",
+            {(driver_id, day): metrics for (driver_id, _, day), metrics in rows.items()},
+        )
+        save_rollups(CarrierDailyRollup, "carrier", carrier_rollup_rows(rows))
+    return len(rows)
+
+
+def apply_daily_rollup_delta(driver_id, carrier_id, day, **amounts):
+    """
+    Adds the given amounts to the driver's and the carrier's rollup for the
+    day with one atomic UPDATE each. A missing row is computed from scratch
+    instead, unless the amounts only take something away from it.
+    """
+    amounts = {
+        name: DailyRollup.rounded(name, amount) for name, amount in amounts.items()
+    }
+    amounts = {name: amount for name, amount in amounts.items() if amount}
+    if not amounts:
+        return
+    now = timezone.now()
+    for model, key in (
+        (DriverDailyRollup, {"driver_id": driver_id}),
+        (CarrierDailyRollup, {"carrier_id": carrier_id}),
+    ):
+        updated = model.objects.filter(day=day, **key).update(
+            updated_at=now,
+            **{name: model.increment(name, amount) for name, amount in amounts.items()},
+        )
+        if not updated and any(amount > 0 for amount in amounts.values()):
+            refresh_daily_rollups([(driver_id, day)])
+            return
+
+
+def apply_log_rollup_delta(trip_id, day, amounts):
+    """
+    Adds the change in an ELD log's ROLLUP_FIELDS to the rollups: to its own
+    metrics on the day it records, and to the trip totals on the day its
+    trip starts, as update_trip_fuel adds it to the trip.
+    """
+    if not any(amounts):
+        return
+    owner = (
+        Trip.objects.filter(pk=trip_id)
+        .values_list("driver_id", "driver__carrier_id", "start_time")
+        .first()
+    )
+    if owner is None:
+        return
+    driver_id, carrier_id, start_time = owner
+    changes = {day: dict(zip(DailyRollup.LOG_FIELDS, amounts))}
+    # ROLLUP_FIELDS start with the TOTAL_FIELDS, in the order of the trip's.
+    changes.setdefault(rollup_day(start_time), {}).update(
+        zip(DailyRollup.TRIP_TOTAL_FIELDS.values(), amounts)
+    )
+    for day, day_amounts in changes.items():
+        apply_daily_rollup_delta(driver_id, carrier_id, day, **day_amounts)
+
+
+def logged_cycle_minutes(driver_id, last_day):
+    """
+    {day: on-duty minutes} of the driver's logged statuses in the eight days
+    ending on ``last_day``, from one query.
+    """
+    return fleet_logged_cycle_minutes([driver_id], last_day).get(driver_id, {})
+
+
+def fleet_logged_cycle_minutes(driver_ids, last_day):
+    """logged_cycle_minutes() for many drivers as {driver_id: {day: minutes}}."""
+    first_day = last_day - timedelta(days=CYCLE_DAYS - 1)
+    rows = DutyStatus.objects.filter(
+        trip__driver__in=driver_ids,
+        plan_version__isnull=True,
+        status__in=ON_DUTY_STATUSES,
+        start_time__lt=day_start(last_day + timedelta(days=1)),
+        end_time__gt=day_start(first_day),
+    ).values_list("trip__driver", "status", "start_time", "end_time")
+    minutes = {}
+    for driver_id, *row in rows:
+        driver_minutes = minutes.setdefault(driver_id, {})
+        for day, count in on_duty_minutes_by_day(*row).items():
+            if first_day <= day <= last_day:
+                driver_minutes[day] = driver_minutes.get(day, 0) + count
+    return minutes
+
+
+def seed_driver_cycle(driver_id, last_day):
+    """Builds and stores a driver's cycle window ending on ``last_day``."""
+    window = CycleWindow.from_days(last_day, logged_cycle_minutes(driver_id, last_day))
+    cycle = DriverCycle(driver_id=driver_id)
+    cycle.set_window(window)
+    DriverCycle.objects.bulk_create(
+        [cycle],
+        update_conflicts=True,
+        unique_fields=["driver"],
+        update_fields=["last_day", "day_minutes", "total_minutes", "updated_at"],
+    )
+    return window
+
+
+def record_cycle_minutes(driver_id, changes):
+    """
+    Adds {day: minutes} to a driver's cycle window under a row lock. A
+    driver without a window gets one built from their logged statuses,
+    which already include the change being recorded.
+    """
+    changes = {day: minutes for day, minutes in changes.items() if minutes}
+    if not changes:
+        return
+    with transaction.atomic(savepoint=False):
+        cycle = (
+            DriverCycle.objects.select_for_update().filter(driver_id=driver_id).first()
+        )
+        if cycle is None:
+            seed_driver_cycle(driver_id, max(timezone.localdate(), *changes))
+            return
+        window = cycle.get_window()
+        for day in sorted(changes):
+            window.add(day, changes[day])
+        cycle.set_window(window)
+        cycle.save()
+
+
+def forget_driver_cycle(driver_id):
+    """Drops a driver's cycle window; the next logged status rebuilds it."""
+    DriverCycle.objects.filter(driver_id=driver_id).delete()
+
+
+def driver_cycle_status(driver_id, day=None):
+    """
+    The driver's on-duty and available cycle hours as of ``day`` (default
+    today), read from their cycle window. Drivers without one, or days the
+    window has moved past, are counted from their logged statuses instead.
+    """
+    cycle = DriverCycle.objects.filter(driver_id=driver_id).first()
+    return cycle_window_status(driver_id, cycle, day)
+
+
+def cycle_window_status(driver_id, cycle, day=None):
+    """
+    driver_cycle_status() given the driver's DriverCycle, None when they have
+    none.
+    """
+    day = day or timezone.localdate()
+    used = cycle.get_window().used_minutes(day) if cycle else None
+    if used is None:
+        used = sum(logged_cycle_minutes(driver_id, day).values())
+    return cycle_summary(day, used)
+
+
+def fleet_cycle_minutes(driver_ids, day=None):
+    """
+    {driver_id: on-duty minutes used as of ``day``} for many drivers: one
+    query over their cycle windows, plus one over the logged statuses of
+    drivers whose window cannot answer.
+    """
+    day = day or timezone.localdate()
+    driver_ids = list(driver_ids)
+    used = {driver_id: None for driver_id in driver_ids}
+    for cycle in DriverCycle.objects.filter(driver_id__in=driver_ids):
+        used[cycle.driver_id] = cycle.get_window().used_minutes(day)
+    missing = [driver_id for driver_id, minutes in used.items() if minutes is None]
+    if missing:
+        logged = fleet_logged_cycle_minutes(missing, day)
+        for driver_id in missing:
+            used[driver_id] = sum(logged.get(driver_id, {}).values())
+    return used
+
 
 @receiver(post_save, sender=ELDLog)
 @receiver(post_delete, sender=ELDLog)
 def update_trip_fuel(sender, instance, **kwargs):
     """
-    Updates the total fuel_used, total_miles, and total_engine_hours in the Trip model
-    whenever an ELDLog is saved or deleted.
+    Keeps the total fuel_used, total_miles, and total_engine_hours in the Trip
+    model in step whenever an ELDLog is saved or deleted, by applying the
+    difference between the log's previous and current values.
+    """
+    deleted = kwargs["signal"] is post_delete
+    loaded = getattr(instance, "_loaded_trip_totals", None)
+    current = instance.get_trip_totals()
+    instance._loaded_trip_totals = None if deleted else current
+
+    pending = getattr(_trip_totals_state, "pending", None)
+    if pending is not None:
+        pending.add(instance.trip_id)
+        if loaded is not None:
+            pending.add(loaded[0])
+        return
+
+    if deleted:
+        # Deleted rows reach here through the collector, which loads them, so
+        # the loaded values are what the trip totals still include.
+        old, new = loaded or current, None
+    elif kwargs.get("created"):
+        old, new = None, current
+    elif loaded is None:
+        # Saved over an existing row without knowing its previous values.
+        recalculate_trip_totals([instance.trip_id])
+        return
+    else:
+        old, new = loaded, current
+
+    if old is not None and new is not None and old[0] == new[0]:
+        apply_trip_totals_delta(
+            new[0], *(after - before for before, after in zip(old[1:], new[1:]))
+        )
+        return
+    if old is not None:
+        apply_trip_totals_delta(old[0], *(-value for value in old[1:]))
+    if new is not None:
+        apply_trip_totals_delta(*new)
+
+
+@receiver(post_save, sender=ELDLog)
+@receiver(post_delete, sender=ELDLog)
+def update_log_rollups(sender, instance, **kwargs):
+    """
+    Keeps the driver and carrier rollups the log feeds in step, applying
+    the difference between the log's previous and current values the same
+    way update_trip_fuel does for the trip totals.
+    """
+    deleted = kwargs["signal"] is post_delete
+    loaded = getattr(instance, "_loaded_rollup_values", None)
+    current = instance.get_rollup_values()
+    instance._loaded_rollup_values = None if deleted else current
+
+    pending = getattr(_trip_totals_state, "pending_rollups", None)
+    if pending is not None:
+        pending.add(current[:2])
+        if loaded is not None:
+            pending.add(loaded[:2])
+        return
+
+    if deleted:
+        old, new = loaded or current, None
+    elif kwargs.get("created"):
+        old, new = None, current
+    elif loaded is None:
+        refresh_log_rollups([current[:2]])
+        return
+    else:
+        old, new = loaded, current
+
+    if old is not None and new is not None and old[:2] == new[:2]:
+        apply_log_rollup_delta(
+            *new[:2], [after - before for before, after in zip(old[2:], new[2:])]
+        )
+        return
+    if old is not None:
+        apply_log_rollup_delta(*old[:2], [-value for value in old[2:]])
+    if new is not None:
+        apply_log_rollup_delta(*new[:2], new[2:])
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_delete, sender=Trip)
+def forget_trip_duty_history(sender, instance, **kwargs):
+    """
+    Drops the cached duty grids and the cycle window a deleted trip counted
+    towards, or both drivers' when a trip moves to another driver. Runs
+    before update_trip_rollups resets the loaded rollup key.
+    """
+    loaded = getattr(instance, "_loaded_rollup_key", None)
+    if kwargs["signal"] is post_delete:
+        driver_ids = [instance.driver_id]
+    elif loaded is not None and loaded[0] != instance.driver_id:
+        driver_ids = [loaded[0], instance.driver_id]
+    else:
+        return
+    for driver_id in driver_ids:
+        forget_driver_grids(driver_id)
+        forget_driver_cycle(driver_id)
+
+
+@receiver(pre_delete, sender=Trip)
+def remember_deleted_trip_totals(sender, instance, **kwargs):
+    """
+    Reads what a trip being deleted still adds to the rollup trip totals by
+    the time update_trip_rollups runs: the totals stored on it, less what
+    its ELD logs take out of them as they are deleted first.
+    """
+    stored = (
+        Trip.objects.filter(pk=instance.pk)
+        .values(*Trip.TOTAL_FIELDS)
+        .annotate(
+            **{
+                f"logged_{name}": Sum(f"eld_logs__{name}")
+                for name in ELDLog.TOTAL_FIELDS
+            }
+        )
+        .order_by("pk")
+        .first()
+    )
+    if stored is None:
+        return
+    # Deferred ELD logs leave the trip totals alone until the block exits.
+    deferred = getattr(_trip_totals_state, "pending", None) is not None
+    remaining = Trip(
+        **{
+            name: (stored[name] or 0)
+            - (0 if deferred else stored[f"logged_{log_name}"] or 0)
+            for name, log_name in zip(Trip.TOTAL_FIELDS, ELDLog.TOTAL_FIELDS)
+        }
+    )
+    instance._deleted_trip_totals = remaining.get_trip_totals()
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_delete, sender=Trip)
+def update_trip_rollups(sender, instance, **kwargs):
+    """
+    Keeps the rollup trip counts and totals in step when a trip is created,
+    deleted, or saved with a different driver, start day, status, miles,
+    fuel or engine hours, by applying the difference between its loaded and
+    current values.
     """
-    trip = instance.trip
-    aggregates = ELDLog.objects.filter(trip=trip).aggregate(
-        total_fuel=Sum("fuel_consumed"),
-        total_miles=Sum("total_miles"),
-        total_engine_hours=Sum("total_engine_hours"),
+    deleted = kwargs["signal"] is post_delete
+    loaded_key = getattr(instance, "_loaded_rollup_key", None)
+    loaded_totals = getattr(instance, "_loaded_trip_totals", None)
+    current = (instance.get_rollup_key(), instance.get_trip_totals())
+    instance._loaded_rollup_key = None if deleted else current[0]
+    # apply_trip_totals_delta() changes the totals of saved trips without
+    # going through their instances, so only totals just read from the
+    # database are trusted to be what the rollups hold.
+    instance._loaded_trip_totals = None
+
+    if deleted:
+        totals = getattr(instance, "_deleted_trip_totals", None) or current[1]
+        old, new = (loaded_key or current[0], totals), None
+    elif kwargs.get("created"):
+        old, new = None, current
+    elif loaded_key is None or loaded_totals is None:
+        refresh_daily_rollups(
+            {key[:2] for key in (loaded_key, current[0]) if key is not None}
+        )
+        return
+    else:
+        old, new = (loaded_key, loaded_totals), current
+    if old == new:
+        return
+
+    changes = {}
+    for values, step in ((old, -1), (new, 1)):
+        if values is None:
+            continue
+        (driver_id, day, status), totals = values
+        amounts = changes.setdefault((driver_id, day), {})
+        field = DailyRollup.TRIP_COUNT_FIELDS[status]
+        amounts[field] = amounts.get(field, 0) + step
+        for field, total in zip(DailyRollup.TRIP_TOTAL_FIELDS.values(), totals):
+            amounts[field] = amounts.get(field, 0) + step * total
+    carrier_of = dict(
+        Driver.objects.filter(pk__in={driver_id for driver_id, _ in changes}).values_list(
+            "id", "carrier_id"
+        )
     )
+    for (driver_id, day), amounts in changes.items():
+        if driver_id in carrier_of:
+            apply_daily_rollup_delta(driver_id, carrier_of[driver_id], day, **amounts)
+
+
+@receiver(post_save, sender=Trip)
+def invalidate_route_plan(sender, instance, created, **kwargs):
+    """
+    Evicts the cached route plan for a trip's previous planning inputs when a
+    save changes them.
+    """
+    loaded = getattr(instance, "_loaded_planning_inputs", None)
+    current = instance.get_planning_inputs()
+    if loaded is not None and loaded != current:
+        route_plan_cache.invalidate(trip_plan_key(instance, loaded))
+    instance._loaded_planning_inputs = current
+
+
+@receiver(pre_delete, sender=Trip)
+def evict_route_plan(sender, instance, **kwargs):
+    # Before the trip's statuses go, while its key still counts their hours.
+    route_plan_cache.invalidate(trip_plan_key(instance))
+
+
+@receiver(post_save, sender=DutyStatus)
+def forget_duty_status_grids(sender, instance, **kwargs):
+    """
+    Drops the driver's cached duty grids when a status is saved. Deletes and
+    bulk writes call forget_driver_grids() themselves: a post_delete receiver
+    would make every queryset delete fetch its rows first.
+    """
+    forget_driver_grids(instance.trip.driver_id)
+
+
+@receiver(post_save, sender=DutyStatus)
+def update_driver_cycle(sender, instance, created, **kwargs):
+    """
+    Applies the difference a saved status makes to its driver's cycle
+    window. A status whose previous values are unknown, or that moved to
+    another trip, has the affected windows rebuilt instead.
+    """
+    loaded = getattr(instance, "_loaded_cycle_entry", None)
+    current = (instance.trip_id, instance.get_cycle_entry())
+    instance._loaded_cycle_entry = current
+    driver_id = instance.trip.driver_id
+    if created:
+        record_cycle_minutes(driver_id, cycle_changes(None, current[1]))
+    elif loaded is None or loaded[0] != instance.trip_id:
+        if loaded is not None:
+            DriverCycle.objects.filter(
+                driver__in=Trip.objects.filter(pk=loaded[0]).values("driver")
+            ).delete()
+        forget_driver_cycle(driver_id)
+    else:
+        record_cycle_minutes(driver_id, cycle_changes(loaded[1], current[1]))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_principal(sender, instance, **kwargs):
+    forget_principal(instance.pk)
+
 
-    trip.fuel_used = aggregates["total_fuel"] or 0.00
-    trip.total_miles = aggregates["total_miles"] or 0.0
-    trip.total_engine_hours = aggregates["total_engine_hours"] or 0.00
-    trip.save(update_fields=["fuel_used", "total_miles", "total_engine_hours"])
+@receiver(post_save, sender=Driver)
+@receiver(post_delete, sender=Driver)
+def forget_driver_principal(sender, instance, **kwargs):
+    forget_principal(instance.user_id)
@@ -0,0 +1,151 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on the full ordering key, e.g. ``(start_time, id)``.
+
+    DRF's cursor only filters on the first ordering field and falls back to
+    OFFSET within ties; here the cursor holds every ordering value and pages
+    are fetched with a lexicographic filter on them, so every page costs the same as the
+    first one. Views set ``cursor_ordering`` to a unique, non-null ordering
+    that matches one of their indexes.
+
+    Requests without ``cursor`` or ``limit`` get an unwrapped list as before,
+    but of at most ``unpaginated_limit`` rows. A list cut short carries a
+    ``Link: <...>; rel="next"`` header to the following rows, served as a
+    cursor page of the same size. ``count=true`` adds the total number of
+    rows to cursor pages, which costs a COUNT(*).
+    """
+
+    page_size = 100
+    max_page_size = 1000
+    unpaginated_limit = 1000
+    page_size_query_param = "limit"
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.wrapped = self.is_requested(request)
+        self.base_url = request.build_absolute_uri()
+        if self.wrapped:
+            self.page_size = self.get_page_size(request)
+        else:
+            self.page_size = self.unpaginated_limit
+            self.base_url = replace_query_param(
+                self.base_url, self.page_size_query_param, self.page_size
+            )
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.count = None
+        counted = request.query_params.get(self.count_query_param) in ("1", "true")
+        if self.wrapped and counted:
+            self.count = queryset.count()
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            _, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = queryset.filter(
+                self.after_position(json.loads(current_position), reverse)
+            )
+
+        # Fetch one extra row to learn whether another page follows.
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_following = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = (
+                current_position is not None,
+                has_following,
+            )
+        else:
+            self.has_next, self.has_previous = (
+                has_following,
+                current_position is not None,
+            )
+        self.boundary_position = current_position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def after_position(self, values, reverse):
+        """Rows that sort strictly after ``values`` in the requested direction."""
+        conditions, equal = [], {}
+        for order, value in zip(self.ordering, values):
+            name = order.lstrip("-")
+            lookup = "lt" if order.startswith("-") != reverse else "gt"
+            conditions.append(Q(**equal, **{f"{name}__{lookup}": value}))
+            equal[name] = value
+        return reduce(or_, conditions)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self.boundary_position
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self.boundary_position
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            name = order.lstrip("-")
+            if isinstance(instance, dict):
+                values.append(str(instance[name]))
+            else:
+                values.append(str(getattr(instance, name)))
+        return json.dumps(values)
+
+    def is_requested(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "cursor_ordering", self.ordering)
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def get_paginated_response(self, data):
+        if not self.wrapped:
+            next_link = self.get_next_link()
+            headers = {"Link": f'<{next_link}>; rel="next"'} if next_link else None
+            return Response(data, headers=headers)
+        payload = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"] = {
+            "type": "integer",
+            "example": 123,
+        }
+        return response_schema
@@ -1,21 +1,23 @@
 from rest_framework import permissions
 
+from .principal import get_principal
+
 
 class IsManagerOrAdmin(permissions.BasePermission):
     """
     Permission that allows managers or admins.
     """
     def has_permission(self, request, view):
-        user = request.user
-        if not user.is_authenticated:
+        principal = get_principal(request)
+        if not principal.is_authenticated:
             return False
         
         # Admins always have access
-        if user.is_staff or user.is_superuser:
+        if principal.is_admin:
             return True
         
         # Managers have access
-        if hasattr(user, 'driver') and user.driver.role == 'MANAGER':
+        if principal.is_manager:
             return True
         
         return False
@@ -26,40 +28,40 @@ class IsCarrierManagerOrAdmin(permissions.BasePermission):
     Permission that allows carrier managers to access only their carrier's resources.
     """
     def has_permission(self, request, view):
-        user = request.user
-        if not user.is_authenticated:
+        principal = get_principal(request)
+        if not principal.is_authenticated:
             return False
         
         # Admins always have access
-        if user.is_staff or user.is_superuser:
+        if principal.is_admin:
             return True
         
         # Managers have access for their carrier
-        if hasattr(user, 'driver') and user.driver.role == 'MANAGER':
+        if principal.is_manager:
             return True
         
         return False
     
     def has_object_permission(self, request, view, obj):
-        user = request.user
+        principal = get_principal(request)
         
         # Admins always have access
-        if user.is_staff or user.is_superuser:
+        if principal.is_admin:
             return True
         
         # Check if object belongs to manager's carrier
-        if hasattr(user, 'driver') and user.driver.role == 'MANAGER':
+        if principal.is_manager:
             # Check for carrier attribute on the object
             if hasattr(obj, 'carrier'):
-                return obj.carrier_id == user.driver.carrier_id
+                return obj.carrier_id == principal.carrier_id
             elif hasattr(obj, 'carrier_id'):
-                return obj.carrier_id == user.driver.carrier_id
+                return obj.carrier_id == principal.carrier_id
             # For Trip objects, check vehicle's carrier  
             elif hasattr(obj, 'vehicle') and hasattr(obj.vehicle, 'carrier'):
-                return obj.vehicle.carrier_id == user.driver.carrier_id
+                return obj.vehicle.carrier_id == principal.carrier_id
             # For Driver objects
             elif hasattr(obj, 'carrier_id'):
-                return obj.carrier_id == user.driver.carrier_id
+                return obj.carrier_id == principal.carrier_id
         
         return False
 
@@ -69,43 +71,43 @@ class IsAdminOrDriverForRead(permissions.BasePermission):
     Permission for admins (full access), managers (carrier access), or drivers (read-only own data).
     """
     def has_permission(self, request, view):
-        user = request.user
-        if not user.is_authenticated:
+        principal = get_principal(request)
+        if not principal.is_authenticated:
             return False
         
         # Admin has full access
-        if user.is_staff or user.is_superuser:
+        if principal.is_admin:
             return True
         
         # Manager has access to their carrier
-        if hasattr(user, 'driver') and user.driver.role == 'MANAGER':
+        if principal.is_manager:
             return True
         
         # Driver has read access
         if request.method in permissions.SAFE_METHODS:
             return True
         
-        return hasattr(user, 'driver')
+        return principal.is_driver
     
     def has_object_permission(self, request, view, obj):
-        user = request.user
+        principal = get_principal(request)
         
         # Admin has full access
-        if user.is_staff or user.is_superuser:
+        if principal.is_admin:
             return True
         
         # Manager has access to their carrier's objects
-        if hasattr(user, 'driver') and user.driver.role == 'MANAGER':
+        if principal.is_manager:
             if hasattr(obj, 'carrier_id'):
-                return obj.carrier_id == user.driver.carrier_id
+                return obj.carrier_id == principal.carrier_id
             elif hasattr(obj, 'vehicle') and hasattr(obj.vehicle, 'carrier_id'):
-                return obj.vehicle.carrier_id == user.driver.carrier_id
+                return obj.vehicle.carrier_id == principal.carrier_id
         
         # Driver has access to their own objects
-        if hasattr(user, 'driver'):
+        if principal.is_driver:
             if hasattr(obj, 'driver_id'):
-                return obj.driver_id == user.driver.id
+                return obj.driver_id == principal.driver_id
             if hasattr(obj, 'driver'):
-                return obj.driver.id == user.driver.id
+                return obj.driver.id == principal.driver_id
         
         return False
@@ -0,0 +1,107 @@
+"""
+A bounded process pool for the HOS planner.
+
+Planning is pure CPU work, so the async route and ELD views hand it to worker
+processes and keep their event loop free for cheap reads. At most
+``max_pending`` plans are queued or running at once; callers past that get
+PlannerBusy straight away instead of queueing, which the views report as 429
+Too Many Requests. When the workers die the pool raises PlannerUnavailable
+(503) and is replaced on the next call.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .fuel_stations import get_fuel_stations
+from .hos_logic import HOSCalculator
+from .routing import get_router
+
+
+class PlannerBusy(Exception):
+    """Every slot of the planning pool is taken."""
+
+
+class PlannerUnavailable(Exception):
+    """The planning pool cannot run plans right now."""
+
+
+def make_calculator(planning_inputs):
+    """An HOSCalculator with the configured router, stations and fuel rule."""
+    return HOSCalculator(
+        *planning_inputs,
+        router=get_router(),
+        fuel_stations=get_fuel_stations(),
+        fuel_stops=getattr(settings, "PLAN_FUEL_STOPS", False),
+    )
+
+
+def compute_plan(planning_inputs):
+    """
+    Runs in a worker process; the inputs and the plan cross by pickle. Each
+    worker opens the configured road graph and station index once, on its
+    first plan.
+    """
+    return make_calculator(planning_inputs).plan_trip_closed_form()
+
+
+class PlanningPool:
+    """
+    Counts plans from submission until their worker finishes, so a client
+    that disconnects does not free its slot while its plan is still running.
+    """
+
+    def __init__(self, workers=2, max_pending=16):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    async def plan(self, planning_inputs):
+        """The route plan for Trip.get_planning_inputs(), computed off the event loop."""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise PlannerBusy()
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            executor = self._executor
+            self.pending += 1
+        try:
+            future = executor.submit(compute_plan, planning_inputs)
+        except (BrokenProcessPool, RuntimeError) as exc:
+            self._release()
+            self._discard(executor)
+            raise PlannerUnavailable() from exc
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool as exc:
+            self._discard(executor)
+            raise PlannerUnavailable() from exc
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_options = getattr(settings, "PLANNING_POOL", {})
+planning_pool = PlanningPool(
+    workers=_options.get("WORKERS", 2),
+    max_pending=_options.get("MAX_PENDING", 16),
+)
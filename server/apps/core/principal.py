@@ -0,0 +1,113 @@
+"""
+The resolved identity of a request's user.
+
+Permissions and querysets need the user's staff flags and, for drivers and
+managers, their driver id, role and carrier. Reading those through
+``request.user.driver`` costs a query per access path, so they are resolved
+once into a Principal and kept on the request for its lifetime.
+
+With settings.PRINCIPAL_CACHE_TIMEOUT set, principals are also kept in
+Django's cache between requests, and saving or deleting a user or driver
+drops the cached entry. The drop only reaches workers that share the cache,
+so the timeout defaults to 0 (no caching between requests) unless REDIS_URL
+configures a shared one. Changes made without the model signals, such as
+queryset updates, are still served stale for up to the timeout.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: Optional[int]
+    is_staff: bool = False
+    is_superuser: bool = False
+    driver_id: Optional[int] = None
+    role: Optional[str] = None
+    carrier_id: Optional[int] = None
+
+    @property
+    def is_authenticated(self):
+        return self.user_id is not None
+
+    @property
+    def is_admin(self):
+        return self.is_staff or self.is_superuser
+
+    @property
+    def is_driver(self):
+        """Whether the user has a driver profile, managers included."""
+        return self.driver_id is not None
+
+    @property
+    def is_manager(self):
+        return self.is_driver and self.role == "MANAGER"
+
+
+ANONYMOUS = Principal(user_id=None)
+
+
+def principal_cache_key(user_id):
+    return f"principal:{user_id}"
+
+
+def principal_for_user(user):
+    """Builds a principal from a user, reading ``user.driver`` if it is not loaded."""
+    if not user or not user.is_authenticated:
+        return ANONYMOUS
+    try:
+        driver = user.driver
+    except ObjectDoesNotExist:
+        driver = None
+    return Principal(
+        user_id=user.pk,
+        is_staff=user.is_staff,
+        is_superuser=user.is_superuser,
+        driver_id=driver.pk if driver else None,
+        role=driver.role if driver else None,
+        carrier_id=driver.carrier_id if driver else None,
+    )
+
+
+def load_principal(user):
+    """The user's principal from Django's cache, building and caching it on a miss."""
+    if not user or not user.is_authenticated:
+        return ANONYMOUS
+    timeout = getattr(settings, "PRINCIPAL_CACHE_TIMEOUT", 0)
+    if not timeout:
+        return principal_for_user(user)
+    key = principal_cache_key(user.pk)
+    principal = cache.get(key)
+    if principal is None:
+        principal = principal_for_user(user)
+        cache.set(key, principal, timeout)
+    return principal
+
+
+def remember_principal(request, principal):
+    """Makes ``principal`` the one get_principal() returns for this request."""
+    getattr(request, "_request", request).principal = principal
+
+
+def get_principal(request):
+    """
+    The principal of a DRF or Django request, resolved at most once per
+    request. It is stored on the underlying HttpRequest so every wrapper of
+    the same request shares it.
+    """
+    http_request = getattr(request, "_request", request)
+    user = request.user
+    principal = getattr(http_request, "principal", None)
+    if principal is None or principal.user_id != getattr(user, "pk", None):
+        principal = load_principal(user)
+        http_request.principal = principal
+    return principal
+
+
+def forget_principal(user_id):
+    cache.delete(principal_cache_key(user_id))
@@ -0,0 +1,169 @@
+"""
+Two-tier cache for HOS route plans.
+
+A plan depends only on a trip's pickup/dropoff coordinates, start time and
+cycle hours, and on the routing backend, fuel station index and fueling rule,
+so plans are keyed on those inputs rather than on the trip. The cycle hours
+are the trip's entered hours or its driver's logged hours, whichever is
+higher, so logging duty statuses can change the key. Every key for a trip is
+built by trip_plan_key(), lookups and evictions alike.
+
+Resolving the logged hours reads the driver's cycle window. The planning
+views load it along with the trip, so a cache hit costs no query; trips
+loaded without it cost one (two when the window cannot answer, e.g. for a
+trip that started before the driver's last logged day). The first tier is a size-bounded LRU inside the
+process; the second is Django's cache framework, shared by every worker
+pointed at the same backend.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from .fuel_stations import get_fuel_stations
+from .planning_pool import make_calculator, planning_pool
+from .routing import get_router
+
+# Bump whenever the planner's output changes so stale shared entries are ignored.
+PLANNER_VERSION = 3
+
+
+def plan_key(start_time, current_cycle_hours, pickup_location, dropoff_location):
+    """Cache key for a plan with the given inputs and the configured planner."""
+    parts = [
+        start_time.isoformat(),
+        repr(float(current_cycle_hours)),
+        ",".join(repr(float(value)) for value in pickup_location),
+        ",".join(repr(float(value)) for value in dropoff_location),
+    ]
+    for source in (get_router(), get_fuel_stations()):
+        if source is not None:
+            parts.append(source.cache_key)
+    if getattr(settings, "PLAN_FUEL_STOPS", False):
+        parts.append("fuel-stops")
+    raw = "|".join(parts)
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f"route-plan:v{PLANNER_VERSION}:{digest}"
+
+
+def trip_planning_inputs(trip, planning_inputs=None):
+    """
+    The planner's arguments for a trip: its get_planning_inputs(), or the
+    given ones, with the cycle hours trip.get_cycle_hours() resolves for them.
+    """
+    planning_inputs = planning_inputs or trip.get_planning_inputs()
+    start_time, _, pickup_location, dropoff_location = planning_inputs
+    cycle_hours = trip.get_cycle_hours(planning_inputs)
+    return start_time, cycle_hours, pickup_location, dropoff_location
+
+
+def trip_plan_key(trip, planning_inputs=None):
+    """Cache key of the trip's plan, or of its plan for other planning inputs."""
+    return plan_key(*trip_planning_inputs(trip, planning_inputs))
+
+
+class LRUCache:
+    """A thread-safe mapping that evicts the least recently used entry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return None
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RoutePlanCache:
+    """
+    Looks plans up in the local LRU, then the shared cache, and only runs the
+    planner on a miss in both. Returned plans are shared between callers and
+    must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=1024, cache_alias="default", timeout=None):
+        self.local = LRUCache(max_entries)
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def get_plan(self, trip):
+        inputs = trip_planning_inputs(trip)
+        key = plan_key(*inputs)
+        plan = self.local.get(key)
+        if plan is not None:
+            return plan
+        plan = self.shared.get(key)
+        if plan is None:
+            plan = make_calculator(inputs).plan_trip_closed_form()
+            self.shared.set(key, plan, self.timeout)
+        self.local.set(key, plan)
+        return plan
+
+    async def aget_plan(self, trip):
+        """get_plan() for async views; misses are planned in the planning pool."""
+        inputs = await sync_to_async(trip_planning_inputs)(trip)
+        key = plan_key(*inputs)
+        plan = self.local.get(key)
+        if plan is not None:
+            return plan
+        plan = await self.shared.aget(key)
+        if plan is None:
+            plan = await planning_pool.plan(inputs)
+            await self.shared.aset(key, plan, self.timeout)
+        self.local.set(key, plan)
+        return plan
+
+    def invalidate(self, key):
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+
+
+_options = getattr(settings, "ROUTE_PLAN_CACHE", {})
+route_plan_cache = RoutePlanCache(
+    max_entries=_options.get("MAX_ENTRIES", 1024),
+    cache_alias=_options.get("CACHE_ALIAS", "default"),
+    timeout=_options.get("TIMEOUT"),
+)
+
+
+def get_route_plan(trip):
+    """The HOS plan for a trip, served from the route-plan cache when possible."""
+    return route_plan_cache.get_plan(trip)
+
+
+async def aget_route_plan(trip):
+    return await route_plan_cache.aget_plan(trip)
@@ -0,0 +1,376 @@
+"""
+Pluggable routing for the HOS planner.
+
+By default (ROUTING["BACKEND"] = "great_circle") HOSCalculator keeps its
+straight-line estimate at AVERAGE_SPEED_MPH. The "road_graph" backend routes
+over a road network built offline by ``manage.py build_road_graph`` into one
+file at ROUTING["GRAPH_PATH"].
+
+The file is a short JSON header followed by flat arrays: node coordinates,
+their geocell cells, and the edges in compressed sparse row form (``offsets``
+into ``targets``, ``miles`` and ``hours``). It is memory-mapped, not read, so
+opening it costs the same for a county or a continent, and every worker
+process shares the operating system's copy of the pages it touches. Nodes are
+numbered in cell order, which turns finding the nodes near a point into a
+binary search per row of cells. Queries snap both ends to their nearest
+node and run A* on driving time, guided by the straight-line time at the
+graph's top speed.
+"""
+
+import heapq
+import json
+import math
+import struct
+import uuid
+from functools import lru_cache
+
+import numpy as np
+import polyline
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .geocell import bounding_box, cells_of, indices_in_box
+from .hos_batch import calculate_distances
+from .hos_logic import HOSCalculator, Route
+
+MAGIC = b"ROADGRPH"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+# How far from the nearest road node a location may be, tried in order.
+SNAP_RADII_MILES = (2.0, 10.0, 50.0)
+
+
+class NoRoute(ValueError):
+    """No road route joins the two locations."""
+
+
+def aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_arrays(path, magic, arrays, **meta):
+    """
+    Writes named arrays and JSON-serializable ``meta`` to a file that
+    read_arrays() memory-maps, behind the 8-byte ``magic``.
+    """
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = aligned(offset + array.nbytes)
+    header = json.dumps({"version": FORMAT_VERSION, **meta, "arrays": layout}).encode()
+    data_start = aligned(len(magic) + 8 + len(header))
+    with open(path, "wb") as output:
+        output.write(magic + struct.pack("<Q", len(header)) + header)
+        for name, array in arrays.items():
+            output.seek(data_start + layout[name]["offset"])
+            output.write(np.ascontiguousarray(array).tobytes())
+        output.truncate(data_start + offset)
+
+
+def read_arrays(path, magic):
+    """(header, {name: read-only array}) of a file write_arrays() wrote."""
+    with open(path, "rb") as source:
+        if source.read(len(magic)) != magic:
+            raise ValueError(f"{path} is not a {magic.decode().lower()} file.")
+        (length,) = struct.unpack("<Q", source.read(8))
+        header = json.loads(source.read(length))
+    if header["version"] != FORMAT_VERSION:
+        raise ValueError(f"{path} has unsupported version {header['version']}.")
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    data_start = aligned(len(magic) + 8 + length)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        start = data_start + spec["offset"]
+        count = math.prod(spec["shape"])
+        arrays[name] = (
+            data[start : start + count * dtype.itemsize]
+            .view(dtype)
+            .reshape(spec["shape"])
+        )
+    return header, arrays
+
+
+def write_graph(path, arrays, **meta):
+    """Writes the arrays and header values build_graph() returns."""
+    write_arrays(path, MAGIC, arrays, **meta)
+
+
+class RoadGraph:
+    """
+    A graph file opened read-only. ``latitudes``, ``longitudes`` and
+    ``cells`` hold one value per node, ``offsets`` one more; the edges
+    leaving node n are ``offsets[n]:offsets[n + 1]`` of ``targets``,
+    ``miles`` and ``hours``.
+    """
+
+    def __init__(self, path):
+        header, arrays = read_arrays(path, MAGIC)
+        self.path = path
+        self.build_id = header["build_id"]
+        self.max_speed_mph = header["max_speed_mph"]
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+    def nearest_node(self, latitude, longitude):
+        """(node, miles away) of the node nearest a coordinate."""
+        for radius in SNAP_RADII_MILES:
+            candidates = indices_in_box(
+                self.cells, bounding_box(latitude, longitude, radius)
+            )
+            if not len(candidates):
+                continue
+            distances = calculate_distances(
+                np.column_stack(
+                    (self.latitudes[candidates], self.longitudes[candidates])
+                ),
+                [latitude, longitude],
+            )
+            best = np.argmin(distances)
+            if distances[best] <= radius:
+                return int(candidates[best]), float(distances[best])
+        raise NoRoute(f"No road within {SNAP_RADII_MILES[-1]:g} miles of the location.")
+
+    def shortest_path(self, source, target):
+        """
+        The edges of the fastest path from ``source`` to ``target`` by A*,
+        or None when there is none.
+        """
+        goal = [float(self.latitudes[target]), float(self.longitudes[target])]
+        max_speed = self.max_speed_mph
+
+        def estimates(nodes):
+            coordinates = np.column_stack(
+                (self.latitudes[nodes], self.longitudes[nodes])
+            )
+            return calculate_distances(coordinates, goal) / max_speed
+
+        best = {source: 0.0}
+        via = {source: None}
+        queue = [(float(estimates([source])[0]), 0.0, source)]
+        while queue:
+            _, hours, node = heapq.heappop(queue)
+            if node == target:
+                break
+            if hours > best[node]:
+                continue
+            first, last = int(self.offsets[node]), int(self.offsets[node + 1])
+            if first == last:
+                continue
+            neighbours = self.targets[first:last]
+            totals = hours + self.hours[first:last]
+            for edge, neighbour, total, estimate in zip(
+                range(first, last),
+                neighbours.tolist(),
+                totals.tolist(),
+                estimates(neighbours).tolist(),
+            ):
+                if total < best.get(neighbour, math.inf):
+                    best[neighbour] = total
+                    via[neighbour] = (edge, node)
+                    heapq.heappush(queue, (total + estimate, total, neighbour))
+        else:
+            return None
+        edges = []
+        while via[node] is not None:
+            edge, node = via[node]
+            edges.append(edge)
+        return edges[::-1]
+
+
+class RoadGraphRouter:
+    """
+    HOSCalculator's router over a RoadGraph. The legs between each end and
+    its nearest node are driven in a straight line at AVERAGE_SPEED_MPH.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.cache_key = f"road-graph:{graph.build_id}"
+        self._last = None
+
+    def route(self, origin, destination):
+        """The Route between two [lon, lat] locations, as trips store them."""
+        key = (tuple(origin), tuple(destination))
+        last = self._last
+        if last is not None and last[0] == key:
+            return last[1]
+        graph = self.graph
+        source, source_miles = graph.nearest_node(origin[1], origin[0])
+        target, target_miles = graph.nearest_node(destination[1], destination[0])
+        edges = graph.shortest_path(source, target)
+        if edges is None:
+            raise NoRoute("No road route joins the pickup and the dropoff.")
+        edges = np.array(edges, dtype=np.int64)
+        nodes = np.concatenate(([source], graph.targets[edges])).astype(np.int64)
+
+        leg_miles = source_miles + target_miles
+        miles = float(graph.miles[edges].sum()) + leg_miles
+        hours = (
+            float(graph.hours[edges].sum())
+            + leg_miles / HOSCalculator.AVERAGE_SPEED_MPH
+        )
+        points = [(origin[1], origin[0])]
+        points += zip(graph.latitudes[nodes].tolist(), graph.longitudes[nodes].tolist())
+        points.append((destination[1], destination[0]))
+        route = Route(
+            miles,
+            hours,
+            miles / hours if hours else HOSCalculator.AVERAGE_SPEED_MPH,
+            polyline.encode(points, 5),
+        )
+        self._last = (key, route)
+        return route
+
+
+class RoutePath:
+    """
+    A route's line, for finding the points a share of the way along it.
+    Built from an encoded polyline or from (lat, lon) ``points``.
+    """
+
+    def __init__(self, encoded=None, points=None):
+        if points is None:
+            points = polyline.decode(encoded, 5)
+        points = np.array(points, dtype=float).reshape(-1, 2)
+        self.points = points
+        lengths = calculate_distances(points[:-1], points[1:])
+        self.lengths = lengths
+        self.distances = np.concatenate(([0.0], np.cumsum(lengths)))
+
+    def coordinates_at(self, fractions):
+        """(latitudes, longitudes) ``fractions`` of the way along by distance."""
+        fractions = np.asarray(fractions, dtype=float)
+        if not len(self.lengths):
+            latitude, longitude = self.points[0]
+            return (
+                np.full(fractions.shape, latitude),
+                np.full(fractions.shape, longitude),
+            )
+        targets = np.clip(fractions, 0.0, 1.0) * self.distances[-1]
+        index = np.searchsorted(self.distances, targets, side="right") - 1
+        index = np.clip(index, 0, len(self.lengths) - 1)
+        lengths = self.lengths[index]
+        shares = np.divide(
+            targets - self.distances[index],
+            lengths,
+            out=np.zeros_like(targets),
+            where=lengths > 0,
+        )
+        start, end = self.points[index], self.points[index + 1]
+        coordinates = start + shares[..., np.newaxis] * (end - start)
+        return coordinates[..., 0], coordinates[..., 1]
+
+    def point_at(self, fraction):
+        """[lon, lat] ``fraction`` of the way along the route by distance."""
+        latitude, longitude = self.coordinates_at(fraction)
+        return [float(longitude), float(latitude)]
+
+
+def build_graph(
+    node_ids,
+    latitudes,
+    longitudes,
+    sources,
+    targets,
+    speeds_mph,
+    miles=None,
+    oneway=None,
+):
+    """
+    The arrays and header values of a graph file. Edges join ``sources`` to
+    ``targets`` (node ids) at ``speeds_mph``, both ways unless ``oneway``;
+    their ``miles`` default to the great-circle distance between the ends.
+    """
+    node_ids = np.asarray(node_ids)
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    by_id = np.argsort(node_ids, kind="stable")
+    sorted_ids = node_ids[by_id]
+    if len(sorted_ids) and np.any(sorted_ids[1:] == sorted_ids[:-1]):
+        raise ValueError("Node ids must be unique.")
+
+    def node_index(ids):
+        ids = np.asarray(ids, dtype=node_ids.dtype)
+        positions = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        unknown = sorted_ids[positions] != ids
+        if np.any(unknown):
+            raise ValueError(f"Edges refer to unknown node {ids[unknown][0]}.")
+        return by_id[positions]
+
+    if not len(node_ids) or not len(sources):
+        raise ValueError("A road graph needs nodes and edges.")
+    speeds = np.asarray(speeds_mph, dtype=np.float64)
+    if np.any(speeds <= 0):
+        raise ValueError("Edge speeds must be positive.")
+
+    # Number the nodes in cell order.
+    cells = cells_of(latitudes, longitudes)
+    by_cell = np.argsort(cells, kind="stable")
+    renumber = np.empty_like(by_cell)
+    renumber[by_cell] = np.arange(len(by_cell))
+    latitudes, longitudes, cells = (
+        latitudes[by_cell],
+        longitudes[by_cell],
+        cells[by_cell],
+    )
+    heads = renumber[node_index(sources)]
+    tails = renumber[node_index(targets)]
+
+    if miles is None:
+        miles = calculate_distances(
+            np.column_stack((latitudes[heads], longitudes[heads])),
+            np.column_stack((latitudes[tails], longitudes[tails])),
+        )
+    miles = np.asarray(miles, dtype=np.float64)
+    hours = miles / speeds
+    both_ways = (
+        np.ones(len(heads), dtype=bool)
+        if oneway is None
+        else ~np.asarray(oneway, dtype=bool)
+    )
+    heads, tails = (
+        np.concatenate((heads, tails[both_ways])),
+        np.concatenate((tails, heads[both_ways])),
+    )
+    miles = np.concatenate((miles, miles[both_ways]))
+    hours = np.concatenate((hours, hours[both_ways]))
+
+    order = np.lexsort((tails, heads))
+    offsets = np.zeros(len(latitudes) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(heads, minlength=len(latitudes)))
+    arrays = {
+        "latitudes": latitudes,
+        "longitudes": longitudes,
+        "cells": cells,
+        "offsets": offsets,
+        "targets": tails[order].astype(np.int64),
+        "miles": miles[order],
+        "hours": hours[order],
+    }
+    meta = {"build_id": uuid.uuid4().hex, "max_speed_mph": float(speeds.max())}
+    return arrays, meta
+
+
+@lru_cache(maxsize=None)
+def load_router(backend, graph_path):
+    """The router of a backend, None for "great_circle"; loaded once per process."""
+    if backend == "great_circle":
+        return None
+    if backend == "road_graph":
+        if not graph_path:
+            raise ImproperlyConfigured("ROUTING_GRAPH_PATH is required for road_graph.")
+        return RoadGraphRouter(RoadGraph(graph_path))
+    raise ImproperlyConfigured(f"Unknown routing backend {backend!r}.")
+
+
+def get_router():
+    """The router configured in settings.ROUTING."""
+    options = getattr(settings, "ROUTING", {})
+    return load_router(
+        options.get("BACKEND", "great_circle"), options.get("GRAPH_PATH", "")
+    )
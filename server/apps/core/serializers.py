@@ -1,5 +1,170 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import serializers
+from .geocell import bounding_box, wrap_longitude
 from .models import Trip, Vehicle, Carrier, Driver, DutyStatus, ELDLog
+from .principal import get_principal
+
+
+def query_plan(serializer):
+    """
+    The select_related, prefetch_related and .only() paths for the fields a
+    serializer instance emits.
+
+    Relations walked by dotted field sources (``driver.user.username``) are
+    found from the model. Serializers declare anything else they read
+    themselves: extra relations in Meta.select_related /
+    Meta.prefetch_related, and the columns behind method fields in
+    Meta.field_sources. Relations of nested serializers are included under
+    the nesting field's source. The .only() paths are None when some field
+    reads something the plan cannot see.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    meta = getattr(serializer, "Meta", None)
+    model = getattr(meta, "model", None)
+    field_sources = getattr(meta, "field_sources", {})
+    select = list(getattr(meta, "select_related", []))
+    prefetch = list(getattr(meta, "prefetch_related", []))
+    only = [] if model is not None else None
+    whole_rows = set()
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        many = isinstance(field, serializers.ListSerializer)
+        nested = field.child if many else field
+        if isinstance(nested, serializers.BaseSerializer):
+            prefix = field.source.replace(".", "__")
+            nested_select, nested_prefetch, nested_only = query_plan(nested)
+            paths = [prefix] + [f"{prefix}__{path}" for path in nested_select]
+            if many:
+                prefetch += paths
+            else:
+                select += paths
+                if only is not None:
+                    only.append(prefix)
+                    if nested_only is None:
+                        whole_rows.add(prefix)
+                    else:
+                        only += [f"{prefix}__{path}" for path in nested_only]
+            prefetch += [f"{prefix}__{path}" for path in nested_prefetch]
+            continue
+        if name in field_sources:
+            columns = [
+                column_path(model, path.split("__")) for path in field_sources[name]
+            ]
+        else:
+            columns = [column_path(model, field.source_attrs) if model else None]
+        for column in columns:
+            if column is None:
+                only = None
+                continue
+            path, joins = column
+            if joins:
+                select.append(joins)
+            if path == joins:
+                whole_rows.add(path)
+            if only is not None:
+                only.append(path)
+    select = tuple(dict.fromkeys(select))
+    if only is not None:
+        # Relations joined by select_related must not be deferred, and naming
+        # single columns of a row that is read whole would defer the rest.
+        only += [
+            path
+            for path in select
+            if not any(column.startswith(f"{path}__") for column in only)
+        ]
+        only = tuple(
+            path
+            for path in dict.fromkeys(only)
+            if not any(path.startswith(f"{row}__") for row in whole_rows)
+        )
+    return select, tuple(dict.fromkeys(prefetch)), only
+
+
+def column_path(model, attrs):
+    """
+    The .only() path that loads a field source such as ``driver.user.username``
+    and the relation it joins through, e.g. ``("driver__user__username",
+    "driver__user")``.
+
+    A source ending in something other than a field (a method or property of a
+    related object) loads that whole related row. Returns None when the
+    source is not backed by the model at all.
+    """
+    parts = []
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            if not parts:
+                return None
+            path = "__".join(parts)
+            return path, path
+        if field.many_to_many or field.one_to_many:
+            return None
+        parts.append(attr)
+        if not field.is_relation:
+            break
+        model = field.related_model
+    return "__".join(parts), "__".join(parts[:-1])
+
+
+@lru_cache(maxsize=None)
+def required_relations(serializer_class):
+    """The select_related and prefetch_related paths a serializer reads."""
+    select, prefetch, _ = query_plan(serializer_class())
+    return select, prefetch
+
+
+def with_query_plan(queryset, serializer, defer=True, extra_columns=()):
+    """
+    Loads the relations a serializer instance reads and, with ``defer``, only
+    the columns it emits plus ``extra_columns`` (e.g. an ordering key).
+    """
+    select, prefetch, only = query_plan(serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if defer and only is not None:
+        queryset = queryset.only(*only, *extra_columns)
+    return queryset
+
+
+class SparseFieldsMixin:
+    """
+    Trims the root serializer of a request to the fields named in
+    ``?fields=a,b``. Nested objects kept that way render as their primary key
+    unless they are also named in ``?expand=``; without ``?fields=`` the
+    representation is unchanged.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None:
+            return
+        requested = parse_field_list(request.query_params.get("fields"))
+        if not requested:
+            return
+        expand = parse_field_list(request.query_params.get("expand"))
+        for name, field in list(self.fields.items()):
+            if field.write_only:
+                continue
+            if name not in requested:
+                self.fields.pop(name)
+            elif name not in expand and isinstance(field, serializers.Serializer):
+                options = {"source": field.source} if field.source != name else {}
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True, **options
+                )
+
+
+def parse_field_list(value):
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
 
 
 # Custom field to correctly serialize a GeoDjango PointField to a list
@@ -14,12 +179,19 @@ class PointField(serializers.Field):
         return [value.x, value.y]
 
 
-class VehicleSerializer(serializers.ModelSerializer):
+class VehicleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     assigned_driver_name = serializers.SerializerMethodField()
     
     class Meta:
         model = Vehicle
         fields = "__all__"
+        field_sources = {
+            "assigned_driver_name": [
+                "assigned_driver__user__first_name",
+                "assigned_driver__user__last_name",
+                "assigned_driver__user__username",
+            ],
+        }
     
     def get_assigned_driver_name(self, obj):
         if obj.assigned_driver:
@@ -27,13 +199,13 @@ class VehicleSerializer(serializers.ModelSerializer):
         return None
 
 
-class CarrierSerializer(serializers.ModelSerializer):
+class CarrierSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Carrier
         fields = "__all__"
 
 
-class DriverSerializer(serializers.ModelSerializer):
+class DriverSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField(source="user.get_full_name")
     username = serializers.ReadOnlyField(source="user.username")
     email = serializers.ReadOnlyField(source="user.email")
@@ -54,7 +226,7 @@ class DriverSerializer(serializers.ModelSerializer):
         ]
 
 
-class TripSerializer(serializers.ModelSerializer):
+class TripSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # --- Read-only fields for displaying data ---
     driver = DriverSerializer(read_only=True)
     vehicle = VehicleSerializer(read_only=True)
@@ -103,25 +275,34 @@ class TripSerializer(serializers.ModelSerializer):
             "total_engine_hours",
             "fuel_efficiency",
             "current_cycle_hours",
+            "plan_version",
             "start_time",
             "end_time",
             "status",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ("driver", "total_miles", "fuel_efficiency", "total_engine_hours")
+        read_only_fields = ("driver", "total_miles", "fuel_efficiency", "total_engine_hours", "plan_version")
+        field_sources = {
+            "current_location": ["current_longitude", "current_latitude"],
+            "pickup_location": ["pickup_longitude", "pickup_latitude"],
+            "dropoff_location": ["dropoff_longitude", "dropoff_latitude"],
+        }
 
     def create(self, validated_data):
         """
         Correctly creates a Trip instance, handling the driver and vehicle relationships.
         """
         driver_instance = validated_data.pop("driver", None)
+        driver_id = validated_data.pop("driver_id", None)
         vehicle_instance = validated_data.pop("vehicle")
 
-        if not driver_instance:
-            user = self.context["request"].user
-            if hasattr(user, "driver"):
-                driver_instance = user.driver
+        if driver_instance:
+            driver_id = driver_instance.pk
+        if driver_id is None:
+            principal = get_principal(self.context["request"])
+            if principal.is_driver:
+                driver_id = principal.driver_id
             else:
                 raise serializers.ValidationError(
                     "A driver could not be associated with this trip."
@@ -131,7 +312,7 @@ class TripSerializer(serializers.ModelSerializer):
         dropoff_coords = validated_data.pop("dropoff_location_input")
 
         trip = Trip.objects.create(
-            driver=driver_instance,
+            driver_id=driver_id,
             vehicle=vehicle_instance,
             current_longitude=current_coords[0],
             current_latitude=current_coords[1],
@@ -169,7 +350,51 @@ class TripSerializer(serializers.ModelSerializer):
         return instance
 
 
-class DutyStatusSerializer(serializers.ModelSerializer):
+class DriverReferenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Driver
+        fields = ["id"]
+
+
+class VehicleReferenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Vehicle
+        fields = ["id", "vehicle_number", "license_plate", "carrier"]
+
+
+class TripSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Compact trip representation for dashboard lists (``?view=summary``): the
+    totals and display fields, with the driver and vehicle reduced to the
+    few attributes the lists read.
+    """
+
+    driver = DriverReferenceSerializer(read_only=True)
+    vehicle = VehicleReferenceSerializer(read_only=True)
+    driver_name = serializers.ReadOnlyField(source="driver.user.get_full_name")
+
+    class Meta:
+        model = Trip
+        fields = [
+            "id",
+            "status",
+            "driver",
+            "driver_name",
+            "vehicle",
+            "pickup_location_name",
+            "dropoff_location_name",
+            "start_time",
+            "end_time",
+            "total_miles",
+            "fuel_used",
+            "total_engine_hours",
+        ]
+        field_sources = {
+            "driver_name": ["driver__user__first_name", "driver__user__last_name"],
+        }
+
+
+class DutyStatusSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     location = serializers.ListField(
         child=serializers.FloatField(), write_only=True, required=False
     )
@@ -186,6 +411,7 @@ class DutyStatusSerializer(serializers.ModelSerializer):
             "longitude",
             "location_description",
             "remarks",
+            "plan_version",
             "created_at",
             "updated_at",
             "location",
@@ -193,6 +419,7 @@ class DutyStatusSerializer(serializers.ModelSerializer):
         read_only_fields = [
             "id",
             "trip",
+            "plan_version",
             "created_at",
             "updated_at",
             "latitude",
@@ -200,15 +427,134 @@ class DutyStatusSerializer(serializers.ModelSerializer):
         ]
 
     def create(self, validated_data):
+        return super().create(self.apply_location(validated_data))
+
+    @staticmethod
+    def apply_location(validated_data):
+        """Moves the write-only [lon, lat] location onto the model's columns."""
         location_data = validated_data.pop("location", [0.0, 0.0])
         if location_data and len(location_data) == 2:
             validated_data["longitude"] = location_data[0]
             validated_data["latitude"] = location_data[1]
-
-        return super().create(validated_data)
+        return validated_data
 
 
-class ELDLogSerializer(serializers.ModelSerializer):
+class ELDLogSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ELDLog
         fields = "__all__"
+
+
+class ELDLogIngestSerializer(serializers.Serializer):
+    """
+    Validates one row of a streamed ELD upload. The trip stays a plain id so
+    a whole chunk of rows can be checked against the database in one query.
+    """
+
+    trip = serializers.IntegerField(min_value=1)
+    date = serializers.DateField()
+    total_miles = serializers.FloatField()
+    fuel_consumed = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, allow_null=True
+    )
+    total_engine_hours = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, allow_null=True
+    )
+    total_idle_hours = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, allow_null=True
+    )
+
+
+class AnalyticsQuerySerializer(serializers.Serializer):
+    """Query parameters shared by the analytics endpoints; both dates are inclusive."""
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    by = serializers.ChoiceField(choices=["carrier"], required=False)
+
+    def validate(self, attrs):
+        if "start" in attrs and "end" in attrs and attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError("start must not be after end.")
+        return attrs
+
+
+class DispatchQuerySerializer(serializers.Serializer):
+    """Query parameters of /api/dispatch/: the pickup and what the load needs."""
+
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    radius_miles = serializers.FloatField(
+        required=False, default=250.0, min_value=1, max_value=3000
+    )
+    hours_needed = serializers.FloatField(required=False, default=0.0, min_value=0)
+    limit = serializers.IntegerField(
+        required=False, default=20, min_value=1, max_value=100
+    )
+    carrier = serializers.IntegerField(required=False)
+
+
+class MapQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of the /api/map/ endpoints: either ``bbox`` as Leaflet's
+    ``LatLngBounds.toBBoxString()`` gives it ("west,south,east,north"), or a
+    ``latitude``/``longitude`` center and ``radius_miles``. Validated data
+    carries the region as ``box`` (see geocell.bounding_box) and, for radius
+    queries, ``center``.
+    """
+
+    bbox = serializers.CharField(required=False)
+    latitude = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(required=False, min_value=-180, max_value=180)
+    radius_miles = serializers.FloatField(required=False, min_value=0, max_value=500)
+    limit = serializers.IntegerField(
+        required=False, default=500, min_value=1, max_value=5000
+    )
+
+    def validate_bbox(self, value):
+        try:
+            west, south, east, north = (float(part) for part in value.split(","))
+        except ValueError:
+            raise serializers.ValidationError(
+                "Expected four numbers: west,south,east,north."
+            )
+        if not -90 <= south <= north <= 90:
+            raise serializers.ValidationError(
+                "South and north must be latitudes with south <= north."
+            )
+        if east - west >= 360:
+            return (south, north, None, None)
+        # Leaflet reports longitudes past +-180 once the map is panned round.
+        return (south, north, wrap_longitude(west), wrap_longitude(east))
+
+    def validate(self, attrs):
+        center = [attrs.get(name) for name in ("latitude", "longitude", "radius_miles")]
+        if "bbox" in attrs:
+            if any(value is not None for value in center):
+                raise serializers.ValidationError(
+                    "Give either bbox or latitude, longitude and radius_miles."
+                )
+            attrs["box"] = attrs.pop("bbox")
+        elif all(value is not None for value in center):
+            attrs["center"] = tuple(center)
+            attrs["box"] = bounding_box(*center)
+        else:
+            raise serializers.ValidationError(
+                "Give either bbox or latitude, longitude and radius_miles."
+            )
+        return attrs
+
+
+class TripMapQuerySerializer(MapQuerySerializer):
+    point = serializers.ChoiceField(
+        choices=["pickup", "dropoff", "current"], required=False, default="pickup"
+    )
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """One sub-request of a /api/batch/ call, e.g. ``{"path": "/api/trips/?limit=20"}``."""
+
+    method = serializers.CharField(required=False, default="GET")
+    path = serializers.CharField()
+
+    def validate_method(self, value):
+        return value.upper()
@@ -0,0 +1,162 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.factories import create_carrier, create_driver, create_trip, create_user
+from apps.core.models import Vehicle, Trip, ELDLog
+from apps.core.principal import load_principal
+
+User = get_user_model()
+
+
+class AnalyticsAPITestCase(APITestCase):
+    def setUp(self):
+        self.carrier = create_carrier()
+        other_carrier = create_carrier("Slow Freight", main_office_address="9 Slow Rd")
+        self.manager = create_user("manager")
+        create_driver(self.carrier, self.manager, license_number="M1", role="MANAGER")
+        self.drivers = [
+            create_driver(
+                carrier,
+                create_user(f"driver{index}", first_name=f"Dana{index}"),
+                license_number=f"D{index}",
+            )
+            for index, carrier in enumerate([self.carrier, self.carrier, other_carrier])
+        ]
+        self.start = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+        for index in range(9):
+            driver = self.drivers[index % 3]
+            vehicle, _ = Vehicle.objects.get_or_create(
+                vehicle_number=f"V{driver.id}",
+                defaults={
+                    "license_plate": f"LP{driver.id}",
+                    "state": "CA",
+                    "carrier": driver.carrier,
+                },
+            )
+            trip = create_trip(
+                driver,
+                vehicle,
+                status="COMPLETED" if index % 2 else "PLANNED",
+                start_time=self.start + timedelta(days=index),
+            )
+            for offset in range(2):
+                ELDLog.objects.create(
+                    trip=trip,
+                    date=date(2024, 3, 1) + timedelta(days=index + offset),
+                    total_miles=100.0 * (index + 1),
+                    fuel_consumed=Decimal("10.50"),
+                    total_engine_hours=Decimal("8.00"),
+                    total_idle_hours=Decimal("0.25"),
+                )
+        self.client.force_authenticate(user=self.manager)
+
+    def visible_trips(self):
+        return Trip.objects.filter(driver__carrier=self.carrier)
+
+    def test_summary_is_scoped_like_trip_list(self):
+        response = self.client.get("/api/analytics/summary/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        trips = list(self.visible_trips())
+        self.assertEqual(response.data["trips"], len(trips))
+        self.assertEqual(
+            response.data["total_miles"], sum(trip.total_miles for trip in trips)
+        )
+        self.assertEqual(
+            response.data["fuel_used"], float(sum(trip.fuel_used for trip in trips))
+        )
+        self.assertEqual(
+            response.data["status_counts"],
+            {
+                "PLANNED": sum(trip.status == "PLANNED" for trip in trips),
+                "IN_PROGRESS": 0,
+                "COMPLETED": sum(trip.status == "COMPLETED" for trip in trips),
+            },
+        )
+
+    def test_carrier_and_driver_totals(self):
+        response = self.client.get("/api/analytics/carriers/")
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["carrier_name"], "Rapid Logistics")
+        self.assertEqual(response.data[0]["trips"], 6)
+
+        response = self.client.get("/api/analytics/drivers/")
+        by_driver = {row["driver"]: row for row in response.data}
+        self.assertEqual(set(by_driver), {self.drivers[0].id, self.drivers[1].id})
+        for driver in self.drivers[:2]:
+            trips = Trip.objects.filter(driver=driver)
+            row = by_driver[driver.id]
+            self.assertEqual(row["driver_name"], driver.user.first_name)
+            self.assertEqual(row["trips"], trips.count())
+            self.assertEqual(
+                row["total_engine_hours"],
+                float(sum(trip.total_engine_hours for trip in trips)),
+            )
+        miles = [row["total_miles"] for row in response.data]
+        self.assertEqual(miles, sorted(miles, reverse=True))
+
+    def test_date_range_and_daily_rows(self):
+        response = self.client.get(
+            "/api/analytics/daily/", {"start": "2024-03-02", "end": "2024-03-04"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["date"] for row in response.data],
+            [date(2024, 3, 2), date(2024, 3, 3), date(2024, 3, 4)],
+        )
+        logs = ELDLog.objects.filter(
+            trip__driver__carrier=self.carrier, date=date(2024, 3, 2)
+        )
+        march_2 = response.data[0]
+        self.assertEqual(march_2["trips_started"], 1)
+        self.assertEqual(march_2["total_miles"], sum(log.total_miles for log in logs))
+        self.assertEqual(march_2["total_idle_hours"], 0.25 * logs.count())
+
+        response = self.client.get(
+            "/api/analytics/summary/", {"start": "2024-03-02", "end": "2024-03-04"}
+        )
+        self.assertEqual(response.data["trips"], 2)
+
+    def test_daily_by_carrier_for_staff(self):
+        admin = User.objects.create_user("admin", password="pass", is_staff=True)
+        self.client.force_authenticate(user=admin)
+        load_principal(admin)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/analytics/daily/?by=carrier")
+        carriers = {row["carrier"] for row in response.data}
+        self.assertEqual(len(carriers), 2)
+        self.assertEqual(sum(row["trips_started"] for row in response.data), 9)
+
+    def test_completed_trip_totals_reach_the_summary(self):
+        trip = create_trip(
+            self.drivers[0],
+            Vehicle.objects.get(vehicle_number=f"V{self.drivers[0].id}"),
+            status="IN_PROGRESS",
+            start_time=datetime(2024, 4, 1, 8, 0, tzinfo=timezone.utc),
+        )
+        response = self.client.patch(
+            f"/api/trips/{trip.id}/",
+            {
+                "status": "COMPLETED",
+                "initial_odometer": 100,
+                "final_odometer": 600,
+                "fuel_used": "50.00",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(
+            "/api/analytics/summary/", {"start": "2024-04-01", "end": "2024-04-01"}
+        )
+        self.assertEqual(response.data["total_miles"], 500.0)
+        self.assertEqual(response.data["fuel_used"], 50.0)
+        self.assertEqual(response.data["fuel_efficiency"], 10.0)
+        self.assertEqual(response.data["status_counts"]["COMPLETED"], 1)
+
+    def test_rejects_inverted_range(self):
+        response = self.client.get(
+            "/api/analytics/summary/", {"start": "2024-03-05", "end": "2024-03-01"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,5 +1,4 @@
 from django.contrib.auth import get_user_model
-from django.contrib.gis.geos import Point
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from apps.core.models import Carrier, Driver, Vehicle, Trip
@@ -0,0 +1,100 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.authentication.tokens import access_token_for
+from apps.core.factories import (
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_user,
+    create_vehicle,
+)
+
+
+class BatchTestCase(APITestCase):
+    def setUp(self):
+        carrier = create_carrier()
+        driver = create_driver(carrier)
+        self.user = driver.user
+        other_driver = create_driver(
+            carrier, create_user("driver2"), license_number="D2"
+        )
+        vehicle = create_vehicle(carrier)
+        self.trip = create_trip(driver, vehicle)
+        self.other_trip = create_trip(other_driver, vehicle)
+        access = access_token_for(RefreshToken.for_user(self.user), self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def batch(self, items):
+        return self.client.post("/api/batch/", items, format="json")
+
+    def test_results_match_separate_requests(self):
+        paths = [
+            "/api/trips/?view=summary",
+            "/api/vehicles/",
+            "/api/user-info/",
+            f"/api/trips/{self.trip.id}/duty-status/",
+        ]
+        response = self.batch([{"path": path} for path in paths])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["path"] for item in response.data], paths)
+        for item in response.data:
+            with self.subTest(path=item["path"]):
+                separate = self.client.get(item["path"])
+                self.assertEqual(item["status"], separate.status_code)
+                self.assertEqual(item["body"], separate.json())
+
+    def test_async_views_are_awaited(self):
+        paths = [
+            f"/api/trips/{self.trip.id}/route/",
+            f"/api/trips/{self.trip.id}/eld-logs/generate/",
+        ]
+        response = self.batch([{"path": path} for path in paths])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for item in response.data:
+            with self.subTest(path=item["path"]):
+                separate = self.client.get(item["path"])
+                self.assertEqual(item["status"], status.HTTP_405_METHOD_NOT_ALLOWED)
+                self.assertEqual(item["status"], separate.status_code)
+                self.assertEqual(item["body"], separate.json())
+
+    def test_per_item_status_codes(self):
+        response = self.batch(
+            [
+                {"path": f"/api/trips/{self.other_trip.id}/"},
+                {"path": "/api/nowhere/"},
+                {"path": "/api/trips/", "method": "delete"},
+                {"path": "/admin/"},
+                {"path": "/api/batch/"},
+                {"path": "/api/carriers/"},
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.data], [404, 404, 405, 400, 400, 403]
+        )
+
+    def test_one_user_lookup_for_the_batch(self):
+        paths = ["/api/trips/", "/api/vehicles/", "/api/user-info/"]
+        with CaptureQueriesContext(connection) as queries:
+            self.batch([{"path": path} for path in paths])
+        user_queries = [q for q in queries if 'FROM "auth_user"' in q["sql"]]
+        self.assertEqual(len(user_queries), 1)
+
+    def test_rejects_malformed_batches(self):
+        self.assertEqual(
+            self.batch({"path": "/api/trips/"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.batch([{"path": "/api/trips/"}] * 21).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(self.batch([{}]).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+        response = self.batch([{"path": "/api/trips/"}])
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,132 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.factories import (
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.models import ELDLog
+from apps.core.principal import load_principal
+
+User = get_user_model()
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        self.carrier = create_carrier()
+        self.driver = create_driver(self.carrier)
+        self.user = self.driver.user
+        self.vehicle = create_vehicle(self.carrier)
+        self.trip = self.create_trip()
+        self.client.force_authenticate(user=self.user)
+        load_principal(self.user)
+
+    def create_trip(self):
+        return create_trip(self.driver, self.vehicle)
+
+    def assertRevalidates(self, url):
+        """Returns the ETag after checking that it answers 304."""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        etag = response["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+        return etag
+
+    def test_list_and_detail_answer_not_modified(self):
+        for url in ("/api/trips/", f"/api/trips/{self.trip.id}/", "/api/vehicles/"):
+            with self.subTest(url=url):
+                self.assertRevalidates(url)
+
+    def test_not_modified_skips_serialization(self):
+        etag = self.assertRevalidates("/api/trips/")
+        # Only the aggregate behind the ETag.
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/trips/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_last_modified(self):
+        response = self.client.get(f"/api/trips/{self.trip.id}/")
+        response = self.client.get(
+            f"/api/trips/{self.trip.id}/",
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_lists_are_not_revalidated_by_date(self):
+        log = ELDLog.objects.create(
+            trip=self.trip, date=date(2024, 1, 1), total_miles=50.0
+        )
+        other = self.create_trip()
+        for url, row in (
+            (f"/api/trips/{self.trip.id}/eld-logs/", log),
+            ("/api/trips/", other),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotIn("Last-Modified", response)
+                # A date from after every write still misses a deletion.
+                since = http_date(row.updated_at.timestamp() + 60)
+                row.delete()
+                response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_edits_and_deletes_change_the_etag(self):
+        etag = self.assertRevalidates("/api/trips/")
+        self.client.patch(
+            f"/api/trips/{self.trip.id}/", {"status": "IN_PROGRESS"}, format="json"
+        )
+        response = self.client.get("/api/trips/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        other = self.create_trip()
+        etag = self.assertRevalidates("/api/trips/")
+        other.delete()
+        response = self.client.get("/api/trips/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_nested_rows_change_the_etag(self):
+        url = f"/api/trips/{self.trip.id}/"
+        etag = self.assertRevalidates(url)
+        self.carrier.name = "Rapid Freight"
+        self.carrier.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["driver"]["carrier_name"], "Rapid Freight")
+
+    def test_query_params_and_users_get_their_own_etag(self):
+        etag = self.assertRevalidates("/api/trips/")
+        response = self.client.get("/api/trips/?view=summary", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        admin = User.objects.create_user("admin", password="pass", is_staff=True)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get("/api/trips/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_eld_log_list(self):
+        url = f"/api/trips/{self.trip.id}/eld-logs/"
+        etag = self.assertRevalidates(url)
+        ELDLog.objects.create(trip=self.trip, date=date(2024, 1, 1), total_miles=50.0)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_writes_are_not_conditional(self):
+        response = self.client.patch(
+            f"/api/trips/{self.trip.id}/",
+            {"status": "IN_PROGRESS"},
+            format="json",
+            HTTP_IF_NONE_MATCH="*",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", response)
@@ -0,0 +1,202 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.cycle_tracker import CycleWindow, on_duty_minutes_by_day
+from apps.core.factories import (
+    at,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.models import Driver, DriverCycle, Trip, DutyStatus, driver_cycle_status
+from apps.core.route_cache import get_route_plan, route_plan_cache, trip_plan_key
+
+User = get_user_model()
+
+
+class CycleWindowTestCase(SimpleTestCase):
+    def test_minutes_are_cut_at_midnight(self):
+        self.assertEqual(
+            on_duty_minutes_by_day("DRIVING", at(1, 22), at(2, 1, 30)),
+            {date(2024, 1, 1): 120, date(2024, 1, 2): 90},
+        )
+        self.assertEqual(on_duty_minutes_by_day("OFF_DUTY", at(1, 22), at(2, 1)), {})
+
+    def test_days_roll_off_the_window(self):
+        window = CycleWindow(date(2024, 1, 1))
+        for day in range(1, 9):
+            window.add(date(2024, 1, day), 600)
+        self.assertEqual(window.used_minutes(date(2024, 1, 8)), 4800)
+        self.assertEqual(window.used_minutes(date(2024, 1, 9)), 4200)
+        self.assertEqual(window.used_minutes(date(2024, 1, 20)), 0)
+        self.assertIsNone(window.used_minutes(date(2024, 1, 7)))
+
+        window.add(date(2024, 1, 10), 60)
+        self.assertEqual(window.total, 3660)
+        self.assertEqual(window.used_minutes(date(2024, 1, 10)), 3660)
+        # Days that already left the window are ignored.
+        window.add(date(2024, 1, 1), 600)
+        self.assertEqual(window.total, 3660)
+
+        window.add(date(2024, 2, 1), 30)
+        self.assertEqual((window.total, sum(window.minutes)), (30, 30))
+
+
+@mock.patch("django.utils.timezone.localdate", return_value=date(2024, 1, 8))
+class DriverCycleTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        route_plan_cache.clear()
+        carrier = create_carrier()
+        self.driver = create_driver(carrier)
+        self.user = self.driver.user
+        self.trip = create_trip(
+            self.driver,
+            create_vehicle(carrier),
+            current_cycle_hours=5,
+            start_time=at(8, 20),
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def log(self, status, start, end, **fields):
+        return DutyStatus.objects.create(
+            trip=self.trip,
+            status=status,
+            start_time=start,
+            end_time=end,
+            longitude=-100.0,
+            latitude=35.0,
+            location_description="I-40",
+            **fields,
+        )
+
+    def log_week(self):
+        # Nine on-duty hours a day for the first eight days of January.
+        for day in range(1, 9):
+            self.log("DRIVING", at(day, 8), at(day, 16))
+            self.log("ON_DUTY_NOT_DRIVING", at(day, 16), at(day, 17))
+
+    def used_hours(self):
+        return driver_cycle_status(self.driver.pk, date(2024, 1, 8))["on_duty_hours"]
+
+    def test_logged_statuses_update_the_window(self, localdate):
+        self.log_week()
+        cycle = DriverCycle.objects.get(driver=self.driver)
+        self.assertEqual(cycle.last_day, date(2024, 1, 8))
+        self.assertEqual(cycle.total_minutes, 72 * 60)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                driver_cycle_status(self.driver.pk, date(2024, 1, 8)),
+                {
+                    "date": date(2024, 1, 8),
+                    "on_duty_hours": 72.0,
+                    "available_hours": 0.0,
+                },
+            )
+        self.assertEqual(
+            driver_cycle_status(self.driver.pk, date(2024, 1, 9))["available_hours"],
+            7.0,
+        )
+
+    def test_edits_and_deletes_apply_differences(self, localdate):
+        self.log_week()
+        duty_status = DutyStatus.objects.get(
+            trip=self.trip, status="DRIVING", start_time=at(8, 8)
+        )
+        duty_status.end_time = at(8, 12)
+        duty_status.save()
+        self.assertEqual(self.used_hours(), 68.0)
+
+        duty_status.status = "OFF_DUTY"
+        duty_status.save()
+        self.assertEqual(self.used_hours(), 64.0)
+
+        on_duty = DutyStatus.objects.get(
+            trip=self.trip, status="ON_DUTY_NOT_DRIVING", start_time=at(8, 16)
+        )
+        response = self.client.delete(
+            f"/api/trips/{self.trip.id}/duty-status/{on_duty.id}/"
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.used_hours(), 63.0)
+
+        response = self.client.post(
+            f"/api/trips/{self.trip.id}/duty-status/bulk/",
+            [
+                {
+                    "status": "ON_DUTY_NOT_DRIVING",
+                    "start_time": "2024-01-08T18:00:00Z",
+                    "end_time": "2024-01-08T20:00:00Z",
+                    "location": [-100.0, 35.0],
+                    "location_description": "Inspection",
+                }
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.used_hours(), 65.0)
+
+    def test_planned_statuses_do_not_count(self, localdate):
+        self.log("DRIVING", at(8, 8), at(8, 16), plan_version=1)
+        self.assertEqual(self.used_hours(), 0.0)
+
+    def test_trip_deletes_rebuild_the_window(self, localdate):
+        self.log_week()
+        self.trip.delete()
+        self.assertFalse(DriverCycle.objects.exists())
+        self.assertEqual(self.used_hours(), 0.0)
+
+    def test_planner_restarts_when_logged_hours_use_up_the_cycle(self, localdate):
+        plan = get_route_plan(self.trip)
+        self.assertEqual(plan["duty_statuses"][0]["location_description"], "Pickup")
+
+        self.log_week()
+        plan = get_route_plan(self.trip)
+        descriptions = [duty["location_description"] for duty in plan["duty_statuses"]]
+        self.assertEqual(descriptions[:2], ["34-hour Restart", "Pickup"])
+
+    def test_saves_evict_plans_keyed_on_logged_hours(self, localdate):
+        self.trip.current_cycle_hours = 0
+        self.trip.save()
+        self.log_week()
+        trip = Trip.objects.get(id=self.trip.id)
+        get_route_plan(trip)
+        old_key = trip_plan_key(trip)
+        self.assertIsNotNone(route_plan_cache.local.get(old_key))
+        self.assertIsNotNone(cache.get(old_key))
+
+        trip.start_time = at(8, 21)
+        trip.save()
+        self.assertIsNone(route_plan_cache.local.get(old_key))
+        self.assertIsNone(cache.get(old_key))
+
+        get_route_plan(trip)
+        trip.delete()
+        self.assertEqual(len(route_plan_cache.local), 0)
+
+    def test_cycle_endpoint(self, localdate):
+        self.log_week()
+        response = self.client.get(f"/api/drivers/{self.driver.id}/cycle/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {"date": "2024-01-08", "on_duty_hours": 72.0, "available_hours": 0.0},
+        )
+        response = self.client.get(
+            f"/api/drivers/{self.driver.id}/cycle/", {"date": "2024-01-12"}
+        )
+        self.assertEqual(response.data["available_hours"], 34.0)
+
+        other_user = User.objects.create_user("driver2", "d2@example.com", "pass")
+        Driver.objects.create(
+            user=other_user, license_number="D2", carrier=self.driver.carrier
+        )
+        self.client.force_authenticate(user=other_user)
+        response = self.client.get(f"/api/drivers/{self.driver.id}/cycle/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,166 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.dispatch import rank_drivers, rank_vehicles
+from apps.core.factories import (
+    at,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_user,
+    create_vehicle,
+)
+from apps.core.models import Carrier, Trip, DutyStatus
+
+User = get_user_model()
+
+PICKUP = (34.0, -118.0)
+
+
+@mock.patch("django.utils.timezone.localdate", return_value=date(2024, 1, 8))
+class DispatchTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.carrier = create_carrier()
+        self.manager = self.make_driver("manager", role="MANAGER")
+        self.client.force_authenticate(user=self.manager.user)
+
+    def make_driver(self, username, carrier=None, **fields):
+        return create_driver(
+            carrier or self.carrier,
+            create_user(username, f"{username}@example.com"),
+            license_number=username.upper(),
+            **fields,
+        )
+
+    def park(self, name, latitude, longitude, carrier=None, **fields):
+        """A driver and a vehicle whose latest trip ended at the coordinate."""
+        carrier = carrier or self.carrier
+        driver = self.make_driver(name, carrier)
+        vehicle = create_vehicle(carrier, f"V-{name}", license_plate=f"LP-{name}")
+        trip = create_trip(
+            driver,
+            vehicle,
+            current_longitude=longitude,
+            current_latitude=latitude,
+            pickup_longitude=longitude,
+            pickup_latitude=latitude,
+            dropoff_longitude=longitude,
+            dropoff_latitude=latitude,
+            start_time=at(7, 8),
+            **fields,
+        )
+        return driver, vehicle, trip
+
+    def test_drivers_rank_by_time_to_pickup(self, localdate):
+        near, _, _ = self.park("near", 34.1, -118.1)
+        far, _, _ = self.park("far", 34.5, -118.5)
+        self.park("away", 40.0, -74.0)
+
+        drivers = rank_drivers(self.carrier.id, *PICKUP, 100)
+        self.assertEqual([row["id"] for row in drivers], [near.id, far.id])
+        self.assertLess(drivers[0]["distance_miles"], drivers[1]["distance_miles"])
+        self.assertEqual(drivers[0]["location"], [-118.1, 34.1])
+        self.assertEqual(drivers[0]["available_hours"], 70.0)
+
+    def test_drivers_without_hours_are_left_out(self, localdate):
+        tired, _, trip = self.park("tired", 34.1, -118.1)
+        rested, _, _ = self.park("rested", 34.5, -118.5)
+        for day in range(1, 8):
+            DutyStatus.objects.create(
+                trip=trip,
+                status="DRIVING",
+                start_time=at(day, 6),
+                end_time=at(day, 16),
+                longitude=-118.1,
+                latitude=34.1,
+                location_description="I-5",
+            )
+
+        drivers = rank_drivers(self.carrier.id, *PICKUP, 100)
+        self.assertEqual([row["id"] for row in drivers], [rested.id])
+
+        drivers = rank_drivers(self.carrier.id, *PICKUP, 100, hours_needed=1)
+        self.assertNotIn(tired.id, [row["id"] for row in drivers])
+
+    def test_only_the_latest_trip_counts(self, localdate):
+        driver, vehicle, _ = self.park("mover", 40.0, -74.0)
+        Trip.objects.create(
+            driver=driver,
+            vehicle=vehicle,
+            current_longitude=-118.05,
+            current_latitude=34.05,
+            pickup_longitude=-74.0,
+            pickup_latitude=40.0,
+            dropoff_longitude=-118.05,
+            dropoff_latitude=34.05,
+            start_time=at(7, 12),
+        )
+        self.assertEqual(
+            [row["id"] for row in rank_drivers(self.carrier.id, *PICKUP, 50)],
+            [driver.id],
+        )
+
+        busy, _, _ = self.park("busy", 34.1, -118.1, status="IN_PROGRESS")
+        vehicles = rank_vehicles(self.carrier.id, *PICKUP, 50)
+        self.assertEqual([row["vehicle_number"] for row in vehicles], ["V-mover"])
+        self.assertNotIn(
+            busy.id, [row["id"] for row in rank_drivers(self.carrier.id, *PICKUP, 50)]
+        )
+
+    def test_corners_of_the_box_are_outside_the_radius(self, localdate):
+        # Inside the bounding box of a 69-mile radius, but ~97 miles away.
+        self.park("corner", 34.99, -119.19)
+        self.assertEqual(rank_drivers(self.carrier.id, *PICKUP, 69), [])
+        self.assertEqual(len(rank_drivers(self.carrier.id, *PICKUP, 120)), 1)
+
+    def test_ranking_query_count_does_not_grow_with_the_fleet(self, localdate):
+        for index in range(10):
+            self.park(f"driver{index}", 34.0 + index / 100, -118.0)
+        # Positions, cycle windows, fallback counts and names.
+        with self.assertNumQueries(4):
+            self.assertEqual(len(rank_drivers(self.carrier.id, *PICKUP, 100)), 10)
+        with self.assertNumQueries(2):
+            self.assertEqual(len(rank_vehicles(self.carrier.id, *PICKUP, 100)), 10)
+
+    def test_endpoint(self, localdate):
+        near, vehicle, _ = self.park("near", 34.1, -118.1)
+        other = Carrier.objects.create(name="Other", main_office_address="1 Other St")
+        self.park("rival", 34.05, -118.05, carrier=other)
+
+        response = self.client.get(
+            "/api/dispatch/",
+            {"latitude": 34.0, "longitude": -118.0, "radius_miles": 50},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(body["pickup"], [-118.0, 34.0])
+        self.assertEqual([row["id"] for row in body["drivers"]], [near.id])
+        self.assertEqual([row["id"] for row in body["vehicles"]], [vehicle.id])
+
+        response = self.client.get("/api/dispatch/", {"latitude": 95, "longitude": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_endpoint_permissions(self, localdate):
+        near, _, _ = self.park("near", 34.1, -118.1)
+        query = {"latitude": 34.0, "longitude": -118.0}
+
+        self.client.force_authenticate(user=near.user)
+        response = self.client.get("/api/dispatch/", query)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_user("admin", "admin@example.com", "pass")
+        admin.is_staff = True
+        admin.save()
+        self.client.force_authenticate(user=admin)
+        response = self.client.get("/api/dispatch/", query)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(
+            "/api/dispatch/", {**query, "carrier": self.carrier.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in response.data["drivers"]], [near.id])
@@ -0,0 +1,182 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.duty_grid import DayGrid, cycle_recap, driver_day_grids
+from apps.core.factories import (
+    at,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.models import Driver, DutyStatus
+
+User = get_user_model()
+
+
+class DayGridTestCase(SimpleTestCase):
+    def test_totals_gaps_and_overlaps(self):
+        grid = DayGrid.from_statuses(
+            date(2024, 1, 2),
+            [
+                ("OFF_DUTY", at(1, 20), at(2, 6)),
+                ("DRIVING", at(2, 6), at(2, 11)),
+                ("ON_DUTY_NOT_DRIVING", at(2, 10, 30), at(2, 12)),
+                ("SLEEPER_BERTH", at(2, 22), at(3, 8)),
+            ],
+        )
+        self.assertEqual(
+            grid.totals(),
+            {
+                "OFF_DUTY": 6.0,
+                "SLEEPER_BERTH": 2.0,
+                "DRIVING": 4.5,
+                "ON_DUTY_NOT_DRIVING": 1.5,
+            },
+        )
+        self.assertEqual(grid.on_duty_hours(), 6.0)
+        self.assertEqual(grid.gaps(), [(720, 1320)])
+        self.assertEqual(grid.overlap_ranges(), [(630, 660)])
+        self.assertEqual(
+            [segment["status"] for segment in grid.segments()],
+            ["OFF_DUTY", "DRIVING", "ON_DUTY_NOT_DRIVING", None, "SLEEPER_BERTH"],
+        )
+
+    def test_round_trips_through_bytes(self):
+        grid = DayGrid.from_statuses(
+            date(2024, 1, 2),
+            [("DRIVING", at(2, 1), at(2, 3)), ("OFF_DUTY", at(2, 2), at(2, 4))],
+        )
+        copy = DayGrid.from_bytes(grid.day, grid.to_bytes())
+        self.assertEqual(copy.as_dict(), grid.as_dict())
+
+
+class DriverDutyGridTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        carrier = create_carrier()
+        self.driver = create_driver(carrier)
+        self.user = self.driver.user
+        self.trip = create_trip(self.driver, create_vehicle(carrier))
+        # Ten on-duty hours a day for the first eight days of January.
+        for day in range(1, 9):
+            self.log("DRIVING", at(day, 8), at(day, 17))
+            self.log("ON_DUTY_NOT_DRIVING", at(day, 17), at(day, 18))
+        self.client.force_authenticate(user=self.user)
+
+    def log(self, status, start, end):
+        return DutyStatus.objects.create(
+            trip=self.trip,
+            status=status,
+            start_time=start,
+            end_time=end,
+            longitude=-100.0,
+            latitude=35.0,
+            location_description="I-40",
+        )
+
+    def test_recap(self):
+        recap = cycle_recap(self.driver.pk, date(2024, 1, 8))
+        self.assertEqual(recap["on_duty_hours"], 80.0)
+        self.assertEqual(recap["available_hours"], 0.0)
+        self.assertEqual(recap["available_tomorrow"], 0.0)
+
+        recap = cycle_recap(self.driver.pk, date(2024, 1, 10))
+        self.assertEqual(recap["on_duty_hours"], 60.0)
+        self.assertEqual(recap["available_hours"], 10.0)
+        self.assertEqual(recap["available_tomorrow"], 20.0)
+
+    def test_cached_grids_skip_the_database(self):
+        days = [date(2024, 1, day) for day in range(1, 9)]
+        driver_day_grids(self.driver.pk, days)
+        with self.assertNumQueries(0):
+            grids = driver_day_grids(self.driver.pk, days)
+        self.assertEqual(grids[date(2024, 1, 3)].on_duty_hours(), 10.0)
+
+    def test_writes_invalidate_cached_grids(self):
+        day = date(2024, 1, 3)
+        driver_day_grids(self.driver.pk, [day])
+        duty_status = self.log("OFF_DUTY", at(3, 18), at(3, 23))
+        grid = driver_day_grids(self.driver.pk, [day])[day]
+        self.assertEqual(grid.totals()["OFF_DUTY"], 5.0)
+
+        response = self.client.delete(
+            f"/api/trips/{self.trip.id}/duty-status/{duty_status.id}/"
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        grid = driver_day_grids(self.driver.pk, [day])[day]
+        self.assertEqual(grid.totals()["OFF_DUTY"], 0.0)
+
+        response = self.client.post(
+            f"/api/trips/{self.trip.id}/duty-status/bulk/",
+            [
+                {
+                    "status": "SLEEPER_BERTH",
+                    "start_time": "2024-01-03T19:00:00Z",
+                    "end_time": "2024-01-03T21:00:00Z",
+                    "location": [-100.0, 35.0],
+                    "location_description": "Rest area",
+                }
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        grid = driver_day_grids(self.driver.pk, [day])[day]
+        self.assertEqual(grid.totals()["SLEEPER_BERTH"], 2.0)
+
+    def test_endpoints(self):
+        response = self.client.get(
+            f"/api/drivers/{self.driver.id}/duty-grid/",
+            {"date": "2024-01-02", "days": 2},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [day["date"] for day in response.json()], ["2024-01-01", "2024-01-02"]
+        )
+        self.assertEqual(
+            response.data[1]["segments"][1],
+            {"status": "DRIVING", "start_minute": 480, "end_minute": 1020},
+        )
+
+        response = self.client.get(
+            f"/api/drivers/{self.driver.id}/recap/", {"date": "2024-01-09"}
+        )
+        self.assertEqual(response.data["on_duty_hours"], 70.0)
+        self.assertEqual(len(response.data["days"]), 8)
+
+        response = self.client.get(
+            f"/api/drivers/{self.driver.id}/duty-grid/", {"days": 40}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(
+            f"/api/drivers/{self.driver.id}/recap/", {"date": "yesterday"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_persisted_plans_are_left_out(self):
+        response = self.client.post(
+            f"/api/trips/{self.trip.id}/route/", {"persist": True}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(DutyStatus.objects.filter(plan_version=1).exists())
+
+        params = {"date": "2024-01-09"}
+        recap = self.client.get(f"/api/drivers/{self.driver.id}/recap/", params)
+        cycle = self.client.get(f"/api/drivers/{self.driver.id}/cycle/", params)
+        self.assertEqual(recap.data["on_duty_hours"], 70.0)
+        self.assertEqual(cycle.data["on_duty_hours"], 70.0)
+        grids = driver_day_grids(self.driver.pk, [date(2024, 1, day) for day in (1, 2)])
+        self.assertEqual([grid.overlap_ranges() for grid in grids.values()], [[], []])
+
+    def test_other_drivers_grids_are_not_found(self):
+        other_user = User.objects.create_user("driver2", "d2@example.com", "pass")
+        Driver.objects.create(
+            user=other_user, license_number="D2", carrier=self.driver.carrier
+        )
+        self.client.force_authenticate(user=other_user)
+        response = self.client.get(f"/api/drivers/{self.driver.id}/recap/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
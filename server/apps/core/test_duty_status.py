@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.factories import (
+    at,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.models import Driver, DutyStatus
+from apps.core.route_cache import route_plan_cache
+
+User = get_user_model()
+
+
+class DutyStatusAPITestCase(APITestCase):
+    def setUp(self):
+        route_plan_cache.clear()
+        carrier = create_carrier()
+        driver = create_driver(carrier)
+        self.user = driver.user
+        self.trip = create_trip(driver, create_vehicle(carrier), current_cycle_hours=10)
+        self.client.force_authenticate(user=self.user)
+
+    def test_route_without_persist_stores_nothing(self):
+        response = self.client.post(f"/api/trips/{self.trip.id}/route/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(DutyStatus.objects.exists())
+        self.assertNotIn("plan_version", response.data)
+
+    def test_persisted_plan_replaces_previous_plan(self):
+        logged = DutyStatus.objects.create(
+            trip=self.trip,
+            status="OFF_DUTY",
+            start_time=at(1, 0),
+            end_time=at(1, 8),
+            longitude=-118.0,
+            latitude=34.0,
+            location_description="Home",
+        )
+        url = f"/api/trips/{self.trip.id}/route/"
+        first = self.client.post(url, {"persist": True}, format="json")
+        second = self.client.post(url, {"persist": True}, format="json")
+        self.assertEqual(first.data["plan_version"], 1)
+        self.assertEqual(second.data["plan_version"], 2)
+
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.plan_version, 2)
+        planned = DutyStatus.objects.filter(trip=self.trip, plan_version=2)
+        self.assertEqual(planned.count(), len(second.data["duty_statuses"]))
+        self.assertFalse(DutyStatus.objects.filter(plan_version=1).exists())
+        self.assertTrue(DutyStatus.objects.filter(id=logged.id).exists())
+
+        dropoff = planned.order_by("-start_time").first()
+        self.assertEqual(dropoff.location_description, "Dropoff")
+        self.assertAlmostEqual(dropoff.longitude, -74.0)
+        self.assertAlmostEqual(dropoff.latitude, 40.0)
+
+    def test_duty_status_list_reads_materialized_plan(self):
+        self.client.post(
+            f"/api/trips/{self.trip.id}/route/", {"persist": True}, format="json"
+        )
+        # The ETag aggregate and the listing.
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/trips/{self.trip.id}/duty-status/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        start_times = [item["start_time"] for item in response.data]
+        self.assertEqual(start_times, sorted(start_times))
+        self.assertEqual(response.data[0]["location_description"], "Pickup")
+
+    def test_bulk_upload_reports_invalid_items(self):
+        items = [
+            {
+                "status": "DRIVING",
+                "start_time": f"2024-01-01T{hour:02d}:00:00Z",
+                "end_time": f"2024-01-01T{hour:02d}:45:00Z",
+                "location": [-118.0 + hour, 34.0],
+                "location_description": "Interstate",
+            }
+            for hour in range(10)
+        ]
+        items[3]["status"] = "NAPPING"
+        del items[7]["start_time"]
+
+        # The driver's cycle window is built on this first upload.
+        with self.assertNumQueries(7):
+            response = self.client.post(
+                f"/api/trips/{self.trip.id}/duty-status/bulk/", items, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["created"], 8)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [3, 7])
+        stored = DutyStatus.objects.filter(trip=self.trip).order_by("start_time")
+        self.assertEqual(stored.count(), 8)
+        self.assertEqual(stored[1].longitude, -117.0)
+
+    def test_bulk_upload_requires_visible_trip(self):
+        other_user = User.objects.create_user("driver2", "d2@example.com", "pass")
+        Driver.objects.create(
+            user=other_user, license_number="D2", carrier=self.trip.driver.carrier
+        )
+        self.client.force_authenticate(user=other_user)
+        response = self.client.post(
+            f"/api/trips/{self.trip.id}/duty-status/bulk/", [], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_upload_rejects_non_list(self):
+        response = self.client.post(
+            f"/api/trips/{self.trip.id}/duty-status/bulk/",
+            {"status": "DRIVING"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
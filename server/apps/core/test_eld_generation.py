@@ -0,0 +1,176 @@
+from datetime import date, timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.eld_generation import daily_miles, duty_hours_by_day
+from apps.core.factories import (
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.models import ELDLog, DriverDailyRollup
+from apps.core.route_cache import get_route_plan, route_plan_cache
+
+
+def duty(status, start, end):
+    return {"status": status, "start_time": start, "end_time": end}
+
+
+class DutyHoursByDayTestCase(SimpleTestCase):
+    def test_statuses_are_cut_at_local_midnight(self):
+        statuses = [
+            duty("DRIVING", "2024-01-01T20:00:00+00:00", "2024-01-02T04:00:00+00:00"),
+            duty("OFF_DUTY", "2024-01-02T04:00:00+00:00", "2024-01-02T14:00:00+00:00"),
+            duty(
+                "ON_DUTY_NOT_DRIVING",
+                "2024-01-02T14:00:00+00:00",
+                "2024-01-02T15:00:00+00:00",
+            ),
+        ]
+        self.assertEqual(
+            duty_hours_by_day(statuses, timezone.utc),
+            {
+                date(2024, 1, 1): {"driving_hours": 4.0, "on_duty_hours": 4.0},
+                date(2024, 1, 2): {"driving_hours": 4.0, "on_duty_hours": 5.0},
+            },
+        )
+        # Chicago's midnight is 06:00 UTC in January.
+        self.assertEqual(
+            duty_hours_by_day(statuses, ZoneInfo("America/Chicago")),
+            {
+                date(2024, 1, 1): {"driving_hours": 8.0, "on_duty_hours": 8.0},
+                date(2024, 1, 2): {"driving_hours": 0.0, "on_duty_hours": 1.0},
+            },
+        )
+
+    def test_daylight_saving_days_keep_real_durations(self):
+        # The night clocks go forward in Chicago has only 23 hours.
+        statuses = [
+            duty("DRIVING", "2024-03-10T00:00:00-06:00", "2024-03-11T00:00:00-05:00")
+        ]
+        self.assertEqual(
+            duty_hours_by_day(statuses, ZoneInfo("America/Chicago")),
+            {date(2024, 3, 10): {"driving_hours": 23.0, "on_duty_hours": 23.0}},
+        )
+
+    def test_miles_without_driving_go_to_the_dropoff_day(self):
+        days = {
+            date(2024, 1, 1): {"driving_hours": 0.0, "on_duty_hours": 0.5},
+            date(2024, 1, 2): {"driving_hours": 0.0, "on_duty_hours": 1.5},
+        }
+        self.assertEqual(
+            daily_miles(days, 20.0), {date(2024, 1, 1): 0.0, date(2024, 1, 2): 20.0}
+        )
+        days[date(2024, 1, 1)]["driving_hours"] = 1.0
+        days[date(2024, 1, 2)]["driving_hours"] = 3.0
+        self.assertEqual(
+            daily_miles(days, 20.0), {date(2024, 1, 1): 5.0, date(2024, 1, 2): 15.0}
+        )
+        self.assertEqual(daily_miles({}, 20.0), {})
+
+
+class AllDaysGenerationTestCase(APITestCase):
+    def setUp(self):
+        route_plan_cache.clear()
+        cache.clear()
+        carrier = create_carrier()
+        self.driver = create_driver(carrier)
+        self.user = self.driver.user
+        self.vehicle = create_vehicle(carrier)
+        self.trip = self.create_trip(dropoff=(-74.0, 40.0))
+        self.client.force_authenticate(user=self.user)
+
+    def create_trip(self, dropoff):
+        return create_trip(
+            self.driver,
+            self.vehicle,
+            dropoff_longitude=dropoff[0],
+            dropoff_latitude=dropoff[1],
+        )
+
+    def generate(self, trip, **data):
+        return self.client.post(
+            f"/api/trips/{trip.id}/eld-logs/generate/",
+            {"all_days": True, **data},
+            format="json",
+        )
+
+    def test_one_log_per_plan_day(self):
+        response = self.generate(self.trip, timezone="America/Los_Angeles")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        plan = get_route_plan(self.trip)
+        logs = list(ELDLog.objects.filter(trip=self.trip).order_by("date"))
+        self.assertGreater(len(logs), 3)
+        self.assertEqual(
+            [log["date"] for log in response.data["logs"]],
+            [log.date.isoformat() for log in logs],
+        )
+        self.assertAlmostEqual(
+            sum(log.total_miles for log in logs), plan["total_miles"], places=6
+        )
+        driving_hours = plan["total_miles"] / 50.0
+        self.assertAlmostEqual(
+            float(sum(log.total_engine_hours for log in logs)),
+            driving_hours,
+            delta=0.01 * len(logs),
+        )
+        for day in response.data["days"]:
+            self.assertGreaterEqual(day["on_duty_hours"], day["driving_hours"])
+
+        self.trip.refresh_from_db()
+        self.assertAlmostEqual(self.trip.total_miles, plan["total_miles"], places=6)
+        rollup_miles = sum(
+            rollup.total_miles
+            for rollup in DriverDailyRollup.objects.filter(driver=self.driver)
+        )
+        self.assertAlmostEqual(rollup_miles, plan["total_miles"], places=6)
+
+    def test_short_trip_logs_its_miles(self):
+        trip = self.create_trip(dropoff=(-117.8, 34.0))
+        plan = get_route_plan(trip)
+        self.assertNotIn("DRIVING", [duty["status"] for duty in plan["duty_statuses"]])
+        response = self.generate(trip, timezone="UTC")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        log = ELDLog.objects.filter(trip=trip).latest("date")
+        self.assertGreater(log.total_miles, 0)
+        self.assertAlmostEqual(log.total_miles, plan["total_miles"], places=6)
+
+    def test_regenerating_updates_in_place(self):
+        self.generate(self.trip)
+        log = ELDLog.objects.filter(trip=self.trip).earliest("date")
+        log.fuel_consumed = Decimal("42.00")
+        log.total_miles = 1.0
+        log.save()
+        count = ELDLog.objects.filter(trip=self.trip).count()
+
+        self.generate(self.trip)
+        log.refresh_from_db()
+        self.assertEqual(ELDLog.objects.filter(trip=self.trip).count(), count)
+        self.assertEqual(log.fuel_consumed, Decimal("42.00"))
+        self.assertGreater(log.total_miles, 1.0)
+
+    def test_queries_do_not_grow_with_trip_length(self):
+        short_trip = self.create_trip(dropoff=(-112.0, 33.5))
+        counts = []
+        for trip in (short_trip, self.trip):
+            get_route_plan(trip)
+            with CaptureQueriesContext(connection) as queries:
+                self.generate(trip)
+            counts.append(len(queries))
+        self.assertLess(
+            ELDLog.objects.filter(trip=short_trip).count(),
+            ELDLog.objects.filter(trip=self.trip).count(),
+        )
+        self.assertEqual(counts[0], counts[1])
+
+    def test_unknown_timezone(self):
+        response = self.generate(self.trip, timezone="Mars/Olympus_Mons")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ELDLog.objects.exists())
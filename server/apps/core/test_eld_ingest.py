@@ -0,0 +1,94 @@
+import json
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.factories import (
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_user,
+    create_vehicle,
+)
+from apps.core.models import ELDLog
+from apps.core.views import ELDLogIngestView
+
+
+class ELDLogIngestTestCase(APITestCase):
+    def setUp(self):
+        carrier = create_carrier()
+        driver = create_driver(carrier)
+        self.user = driver.user
+        other_driver = create_driver(
+            carrier, create_user("driver2"), license_number="D2"
+        )
+        vehicle = create_vehicle(carrier)
+        self.trip = create_trip(driver, vehicle)
+        self.other_trip = create_trip(other_driver, vehicle)
+        self.client.force_authenticate(user=self.user)
+
+    def ingest(self, rows):
+        body = "\n".join(
+            row if isinstance(row, str) else json.dumps(row) for row in rows
+        )
+        return self.client.post(
+            "/api/eld-logs/ingest/", body, content_type="application/x-ndjson"
+        )
+
+    def row(self, day, miles, trip=None):
+        return {
+            "trip": (trip or self.trip).id,
+            "date": f"2024-01-{day:02d}",
+            "total_miles": miles,
+            "fuel_consumed": "10.50",
+            "total_engine_hours": "8.00",
+        }
+
+    def test_upserts_rows_and_refreshes_trip_totals(self):
+        ELDLog.objects.create(trip=self.trip, date=date(2024, 1, 1), total_miles=5.0)
+        response = self.ingest(
+            [self.row(1, 100.0), self.row(2, 200.0), "", self.row(3, 300.0)]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rows"], 3)
+        self.assertEqual(response.data["upserted"], 3)
+        self.assertEqual(ELDLog.objects.filter(trip=self.trip).count(), 3)
+        self.assertEqual(
+            ELDLog.objects.get(trip=self.trip, date=date(2024, 1, 1)).total_miles,
+            100.0,
+        )
+
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.total_miles, 600.0)
+        self.assertEqual(self.trip.fuel_used, Decimal("31.50"))
+        self.assertEqual(self.trip.total_engine_hours, Decimal("24.00"))
+
+    def test_reports_bad_lines_without_failing_the_upload(self):
+        response = self.ingest(
+            [
+                self.row(1, 100.0),
+                "{not json",
+                {"trip": self.trip.id, "date": "someday", "total_miles": 1},
+                self.row(2, 50.0, trip=self.other_trip),
+                self.row(3, 75.0),
+            ]
+        )
+        self.assertEqual(response.data["upserted"], 2)
+        self.assertEqual(response.data["error_count"], 3)
+        self.assertEqual(
+            [error["line"] for error in response.data["errors"]], [2, 3, 4]
+        )
+        self.assertFalse(ELDLog.objects.filter(trip=self.other_trip).exists())
+
+    def test_queries_are_per_chunk_not_per_row(self):
+        rows = [self.row(day, float(day)) for day in range(1, 29)]
+        with mock.patch.object(ELDLogIngestView, "chunk_size", 10):
+            # Per chunk: visibility check, savepoint, upsert, aggregate,
+            # trip update, six for the daily rollups, release.
+            with self.assertNumQueries(3 * 12):
+                response = self.ingest(rows)
+        self.assertEqual(response.data["upserted"], 28)
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.total_miles, sum(range(1, 29)))
@@ -0,0 +1,164 @@
+import io
+import os
+import tempfile
+from datetime import datetime
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from apps.core.factories import (
+    START,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.fuel_stations import (
+    StationIndex,
+    build_stations,
+    get_fuel_stations,
+    load_fuel_stations,
+    write_stations,
+)
+from apps.core.hos_logic import HOSCalculator
+from apps.core.route_cache import plan_key
+from apps.core.routing import RoutePath
+
+# Los Angeles to New York, [lon, lat] as trips store them.
+PICKUP = [-118.24, 34.05]
+DROPOFF = [-74.0, 40.7]
+
+
+def fuel_stop_shares(plan):
+    """The share of the plan's driving done before each fueling stop."""
+    hours = []
+    for duty in plan["duty_statuses"]:
+        start = datetime.fromisoformat(duty["start_time"])
+        end = datetime.fromisoformat(duty["end_time"])
+        hours.append((duty, (end - start).total_seconds() / 3600))
+    total = sum(h for duty, h in hours if duty["status"] == "DRIVING")
+    shares, driven = [], 0.0
+    for duty, h in hours:
+        if duty["status"] == "DRIVING":
+            driven += h
+        elif duty["location_description"] == "Fueling Stop":
+            shares.append(driven / total)
+    return shares
+
+
+class FuelStationTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.addCleanup(load_fuel_stations.cache_clear)
+
+        self.plan = HOSCalculator(
+            START, 0.0, PICKUP, DROPOFF, fuel_stops=True
+        ).plan_trip_closed_form()
+        self.miles = self.plan["total_miles"]
+        self.path = RoutePath(points=[(PICKUP[1], PICKUP[0]), (DROPOFF[1], DROPOFF[0])])
+        first_stop = fuel_stop_shares(self.plan)[0]
+
+        def near_route(miles_before, miles_off):
+            longitude, latitude = self.path.point_at(
+                first_stop - miles_before / self.miles
+            )
+            return latitude + miles_off / 69.0, longitude
+
+        stations = {
+            # 60 miles back and 3 miles off the route.
+            "Chosen": near_route(60, 3),
+            # Right at the stop, but too far off the route.
+            "Off route": near_route(0, 20),
+            # On the route, but long before the fuel-range window.
+            "Too early": near_route(400, 0),
+        }
+        arrays, meta = build_stations(
+            list(stations),
+            [latitude for latitude, _ in stations.values()],
+            [longitude for _, longitude in stations.values()],
+        )
+        self.index_path = os.path.join(self.directory, "stations.idx")
+        write_stations(self.index_path, arrays, **meta)
+        self.stations = stations
+
+    def test_stops_go_to_the_station_nearest_the_route_in_the_window(self):
+        index = StationIndex(self.index_path)
+        plan = HOSCalculator(
+            START, 0.0, PICKUP, DROPOFF, fuel_stations=index
+        ).plan_trip_closed_form()
+        stops = [
+            duty
+            for duty in plan["duty_statuses"]
+            if duty["location_description"] == "Fueling Stop"
+        ]
+        latitude, longitude = self.stations["Chosen"]
+        self.assertEqual(stops[0]["station"], "Chosen")
+        self.assertAlmostEqual(stops[0]["latitude"], latitude)
+        self.assertAlmostEqual(stops[0]["longitude"], longitude)
+        # No station lies along the stretch before the second stop.
+        self.assertNotIn("station", stops[1])
+
+        # Only locations change, so both planners still agree.
+        loop_plan = HOSCalculator(
+            START, 0.0, PICKUP, DROPOFF, fuel_stations=index
+        ).plan_trip()
+        self.assertEqual(loop_plan, plan)
+        without_locations = [
+            {key: duty[key] for key in self.plan["duty_statuses"][0]}
+            for duty in plan["duty_statuses"]
+        ]
+        self.assertEqual(without_locations, self.plan["duty_statuses"])
+
+    def test_configured_index_is_keyed_and_materialized(self):
+        inputs = (START, 0.0, PICKUP, DROPOFF)
+        self.assertIsNone(get_fuel_stations())
+        default_key = plan_key(*inputs)
+        with override_settings(FUEL_STATIONS_PATH=self.index_path):
+            self.assertIsInstance(get_fuel_stations(), StationIndex)
+            self.assertNotEqual(plan_key(*inputs), default_key)
+            plan = HOSCalculator(
+                *inputs, fuel_stations=get_fuel_stations()
+            ).plan_trip_closed_form()
+
+        carrier = create_carrier()
+        trip = create_trip(
+            create_driver(carrier),
+            create_vehicle(carrier),
+            current_longitude=PICKUP[0],
+            current_latitude=PICKUP[1],
+            pickup_longitude=PICKUP[0],
+            pickup_latitude=PICKUP[1],
+            dropoff_longitude=DROPOFF[0],
+            dropoff_latitude=DROPOFF[1],
+        )
+        stop = next(
+            duty_status
+            for duty_status in trip.materialize_plan(plan)
+            if duty_status.location_description.startswith("Fueling Stop")
+        )
+        self.assertEqual(stop.location_description, "Fueling Stop at Chosen")
+        self.assertAlmostEqual(stop.latitude, self.stations["Chosen"][0])
+
+    def test_build_command(self):
+        source = os.path.join(self.directory, "stations.csv")
+        output = os.path.join(self.directory, "built.idx")
+        with open(source, "w") as csv_file:
+            csv_file.write("name,latitude,longitude\nA,35.0,-100.0\n,36.0,-101.0\n")
+        call_command(
+            "build_fuel_stations", stations=source, output=output, stdout=io.StringIO()
+        )
+        index = StationIndex(output)
+        self.assertEqual(sorted(index.names.tolist()), ["", "A"])
+        self.assertEqual(index.nearest_to_path([35.05], [-100.0])[0], 0)
+        self.assertIsNone(index.nearest_to_path([30.0], [-90.0]))
+
+        with open(source, "w") as csv_file:
+            csv_file.write("name,lat,lon\nA,35.0,-100.0\n")
+        with self.assertRaises(CommandError):
+            call_command(
+                "build_fuel_stations",
+                stations=source,
+                output=output,
+                stdout=io.StringIO(),
+            )
@@ -0,0 +1,236 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.factories import (
+    at,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.geocell import (
+    COLUMNS,
+    bounding_box,
+    cell_of,
+    cell_ranges,
+    within_radius,
+)
+from apps.core.models import Driver, Trip, DutyStatus
+
+User = get_user_model()
+
+
+class GeocellTestCase(SimpleTestCase):
+    def test_cells_are_numbered_row_by_row(self):
+        self.assertEqual(cell_of(-90.0, -180.0), 0)
+        self.assertEqual(cell_of(-90.0, -179.75), 1)
+        self.assertEqual(cell_of(-89.75, -180.0), COLUMNS)
+        self.assertEqual(cell_of(90.0, 180.0), cell_of(89.9, -180.0))
+        self.assertIsNone(cell_of(None, -118.0))
+
+    def test_box_covers_the_radius(self):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(34.0, -118.0, 69.0)
+        self.assertAlmostEqual(min_lat, 33.0)
+        self.assertAlmostEqual(max_lat, 35.0)
+        # A degree of longitude is shorter than a degree of latitude up here.
+        self.assertLess(min_lon, -119.2)
+        self.assertGreater(max_lon, -116.8)
+
+    def test_boxes_wrap_at_the_antimeridian_and_open_at_poles(self):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(0.0, 179.5, 100.0)
+        self.assertGreater(min_lon, max_lon)
+        self.assertEqual(bounding_box(89.5, 0.0, 100.0)[2:], (None, None))
+
+    def test_ranges_cover_every_cell_in_the_box(self):
+        box = (33.9, 34.6, -118.3, -117.2)
+        ranges = cell_ranges(box)
+        self.assertEqual(len(ranges), 4)
+        for latitude in (33.9, 34.2, 34.6):
+            for longitude in (-118.3, -117.8, -117.2):
+                cell = cell_of(latitude, longitude)
+                self.assertTrue(any(first <= cell <= last for first, last in ranges))
+
+        # Across the antimeridian each row needs two ranges.
+        self.assertEqual(len(cell_ranges((0.1, 0.2, 179.0, -179.0))), 2)
+        # Very tall boxes fall back to one range of whole rows.
+        self.assertEqual(
+            cell_ranges((-60.0, 60.0, 10.0, 20.0)),
+            [(cell_of(-60.0, -180.0), cell_of(60.0, 179.9))],
+        )
+
+    def test_within_radius_sorts_and_cuts(self):
+        rows = [("far", 35.0, -118.0), ("near", 34.1, -118.0), ("out", 40.0, -74.0)]
+        self.assertEqual(
+            [row[0] for row, distance in within_radius(rows, 34.0, -118.0, 100)],
+            ["near", "far"],
+        )
+
+
+class SpatialQueryTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.carrier = create_carrier()
+        self.driver = create_driver(self.carrier)
+        self.user = self.driver.user
+        self.vehicle = create_vehicle(self.carrier)
+        self.trip = self.make_trip(self.driver, (34.0, -118.0), (40.0, -74.0))
+        self.client.force_authenticate(user=self.user)
+
+    def make_trip(self, driver, pickup, dropoff, current=None, day=1):
+        current = current or pickup
+        return create_trip(
+            driver,
+            self.vehicle,
+            current_latitude=current[0],
+            current_longitude=current[1],
+            pickup_latitude=pickup[0],
+            pickup_longitude=pickup[1],
+            dropoff_latitude=dropoff[0],
+            dropoff_longitude=dropoff[1],
+            start_time=at(day, 8),
+        )
+
+    def log(self, latitude, longitude, hour):
+        return DutyStatus.objects.create(
+            trip=self.trip,
+            status="ON_DUTY_NOT_DRIVING",
+            start_time=at(1, hour),
+            end_time=at(1, hour + 1),
+            latitude=latitude,
+            longitude=longitude,
+            location_description="Stop",
+        )
+
+    def test_saves_fill_cells(self):
+        self.assertEqual(self.trip.pickup_cell, cell_of(34.0, -118.0))
+        self.assertEqual(self.trip.dropoff_cell, cell_of(40.0, -74.0))
+
+        self.trip.current_latitude, self.trip.current_longitude = 36.1, -115.1
+        self.trip.save(update_fields=["current_latitude", "current_longitude"])
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.current_cell, cell_of(36.1, -115.1))
+
+        self.assertEqual(self.log(35.0, -100.0, 9).cell, cell_of(35.0, -100.0))
+
+    def test_bulk_writes_fill_cells(self):
+        response = self.client.post(
+            f"/api/trips/{self.trip.id}/duty-status/bulk/",
+            [
+                {
+                    "status": "OFF_DUTY",
+                    "start_time": "2024-01-01T18:00:00Z",
+                    "end_time": "2024-01-01T20:00:00Z",
+                    "location": [-100.0, 35.0],
+                    "location_description": "Rest area",
+                }
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.trip.materialize_plan(
+            {
+                "duty_statuses": [
+                    {
+                        "status": "DRIVING",
+                        "start_time": "2024-01-01T08:00:00+00:00",
+                        "end_time": "2024-01-01T12:00:00+00:00",
+                        "location_description": "Driving",
+                    }
+                ]
+            }
+        )
+        self.assertFalse(DutyStatus.objects.filter(cell__isnull=True).exists())
+
+    def test_backfill_command(self):
+        self.log(35.0, -100.0, 9)
+        Trip.objects.update(current_cell=None, pickup_cell=None)
+        DutyStatus.objects.update(cell=None)
+        call_command("backfill_cells", batch_size=1, stdout=StringIO())
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.pickup_cell, cell_of(34.0, -118.0))
+        self.assertEqual(DutyStatus.objects.get().cell, cell_of(35.0, -100.0))
+
+    def test_trips_in_a_bbox(self):
+        self.make_trip(self.driver, (40.7, -74.0), (34.0, -118.0), day=2)
+        response = self.client.get("/api/map/trips/", {"bbox": "-119,33.5,-117,34.5"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(body["type"], "FeatureCollection")
+        self.assertFalse(body["truncated"])
+        self.assertEqual(
+            [feature["id"] for feature in body["features"]], [self.trip.id]
+        )
+        self.assertEqual(
+            body["features"][0]["geometry"],
+            {"type": "Point", "coordinates": [-118.0, 34.0]},
+        )
+
+        response = self.client.get(
+            "/api/map/trips/", {"bbox": "-119,33.5,-117,34.5", "point": "dropoff"}
+        )
+        self.assertEqual(len(response.data["features"]), 1)
+        self.assertNotEqual(response.data["features"][0]["id"], self.trip.id)
+
+    def test_bbox_across_the_antimeridian(self):
+        trip = self.make_trip(self.driver, (21.3, -157.8), (13.4, 144.8))
+        # Leaflet reports east past 180 once the map is panned across.
+        response = self.client.get(
+            "/api/map/trips/", {"bbox": "140,10,210,25", "point": "dropoff"}
+        )
+        self.assertEqual([f["id"] for f in response.data["features"]], [trip.id])
+        response = self.client.get("/api/map/trips/", {"bbox": "140,10,210,25"})
+        self.assertEqual([f["id"] for f in response.data["features"]], [trip.id])
+
+    def test_duty_statuses_in_a_radius_nearest_first(self):
+        far = self.log(35.5, -100.0, 9)
+        near = self.log(35.1, -100.0, 10)
+        self.log(40.0, -90.0, 11)
+        response = self.client.get(
+            "/api/map/duty-statuses/",
+            {"latitude": 35.0, "longitude": -100.0, "radius_miles": 50},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        features = response.data["features"]
+        self.assertEqual([feature["id"] for feature in features], [near.id, far.id])
+        self.assertEqual(features[0]["properties"]["trip_id"], self.trip.id)
+        self.assertEqual(features[0]["properties"]["distance_miles"], 6.9)
+
+        response = self.client.get(
+            "/api/map/duty-statuses/",
+            {"latitude": 35.0, "longitude": -100.0, "radius_miles": 50, "limit": 1},
+        )
+        self.assertEqual(len(response.data["features"]), 1)
+        self.assertTrue(response.data["truncated"])
+
+    def test_positions_are_latest_trips_of_visible_drivers(self):
+        latest = self.make_trip(self.driver, (36.0, -115.0), (34.0, -118.0), day=2)
+        other_user = User.objects.create_user("driver2", "d2@example.com", "pass")
+        other = Driver.objects.create(
+            user=other_user, license_number="D2", carrier=self.carrier
+        )
+        self.make_trip(other, (35.0, -117.0), (34.0, -118.0))
+        query = {"bbox": "-125,30,-110,40"}
+
+        response = self.client.get("/api/map/positions/", query)
+        self.assertEqual([f["id"] for f in response.data["features"]], [latest.id])
+
+        self.driver.role = "MANAGER"
+        self.driver.save()
+        response = self.client.get("/api/map/positions/", query)
+        self.assertEqual(len(response.data["features"]), 2)
+
+    def test_region_is_required(self):
+        for query in (
+            {},
+            {"latitude": 35.0, "longitude": -100.0},
+            {"bbox": "1,2,3"},
+            {"bbox": "-119,35,-117,34"},
+            {"bbox": "-119,33,-117,34", "latitude": 35.0},
+        ):
+            response = self.client.get("/api/map/trips/", query)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
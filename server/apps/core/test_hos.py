@@ -0,0 +1,243 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+from hypothesis import given, settings, strategies as st
+from apps.core.hos_logic import HOSCalculator
+from apps.core.hos_batch import calculate_distances, hours_to_microseconds, plan_trips
+
+
+def scalar_plan(start_time, pickup, dropoff, cycle_hours=10.0, fuel_stops=False):
+    """Run the reference planner."""
+    return HOSCalculator(
+        start_time, cycle_hours, pickup, dropoff, fuel_stops=fuel_stops
+    ).plan_trip()
+
+
+coordinates = st.lists(
+    st.floats(min_value=-180, max_value=180, allow_nan=False), min_size=2, max_size=2
+)
+start_times = st.datetimes(
+    min_value=datetime(2000, 1, 1), max_value=datetime(2100, 1, 1)
+).map(lambda value: value.replace(tzinfo=timezone.utc))
+
+
+class ClosedFormPlannerTestCase(SimpleTestCase):
+    @settings(max_examples=500, deadline=None)
+    @given(
+        start_time=start_times,
+        pickup=coordinates,
+        dropoff=coordinates,
+        fuel_stops=st.booleans(),
+    )
+    def test_matches_iterative_planner(self, start_time, pickup, dropoff, fuel_stops):
+        expected = scalar_plan(start_time, pickup, dropoff, fuel_stops=fuel_stops)
+        actual = HOSCalculator(
+            start_time, 10.0, pickup, dropoff, fuel_stops=fuel_stops
+        ).plan_trip_closed_form()
+        self.assertEqual(actual, expected)
+
+    @settings(max_examples=200, deadline=None)
+    @given(
+        start_time=start_times,
+        driving_hours=st.one_of(
+            st.floats(min_value=0, max_value=400, allow_nan=False),
+            st.integers(min_value=0, max_value=40).map(lambda n: n * 11.0),
+            st.integers(min_value=0, max_value=40).map(lambda n: n * 11.0 + 8.0),
+        ),
+    )
+    def test_matches_on_shift_boundaries(self, start_time, driving_hours):
+        # Pin the distance so trips land exactly on break and reset boundaries.
+        miles = driving_hours * HOSCalculator.AVERAGE_SPEED_MPH
+        expected_calculator = HOSCalculator(start_time, 10.0, None, None)
+        expected_calculator.calculate_distance = lambda *args: miles
+        expected = expected_calculator.plan_trip()
+        calculator = HOSCalculator(start_time, 10.0, None, None)
+        calculator.calculate_distance = lambda *args: miles
+        self.assertEqual(calculator.plan_trip_closed_form(), expected)
+
+    @settings(max_examples=300, deadline=None)
+    @given(
+        start_time=start_times,
+        pickup=coordinates,
+        dropoff=coordinates,
+        cycle_hours=st.floats(min_value=0, max_value=80, allow_nan=False),
+        fuel_stops=st.booleans(),
+    )
+    def test_matches_iterative_planner_across_cycles(
+        self, start_time, pickup, dropoff, cycle_hours, fuel_stops
+    ):
+        expected = scalar_plan(start_time, pickup, dropoff, cycle_hours, fuel_stops)
+        actual = HOSCalculator(
+            start_time, cycle_hours, pickup, dropoff, fuel_stops=fuel_stops
+        ).plan_trip_closed_form()
+        self.assertEqual(actual, expected)
+
+    def cross_country_plan(self, **options):
+        return HOSCalculator(
+            datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc),
+            10.0,
+            (34.0522, -118.2437),  # Los Angeles
+            (40.7128, -74.0060),  # New York
+            **options,
+        ).plan_trip_closed_form()
+
+    def test_fuel_stops_are_opt_in(self):
+        descriptions = {
+            duty["location_description"]
+            for duty in self.cross_country_plan()["duty_statuses"]
+        }
+        self.assertNotIn("Fueling Stop", descriptions)
+
+    def test_fuel_stops_follow_thousand_mile_rule(self):
+        plan = self.cross_country_plan(fuel_stops=True)
+        # The rule is checked before each stretch of driving, so a stop comes
+        # at the first stretch that starts with 1000 or more miles driven
+        # since the last one.
+        expected, miles = [], 0.0
+        for duty in plan["duty_statuses"]:
+            if duty["status"] != "DRIVING":
+                continue
+            if miles >= HOSCalculator.FUEL_INTERVAL_MILES:
+                expected.append(duty["start_time"])
+                miles = 0.0
+            hours = datetime.fromisoformat(duty["end_time"]) - datetime.fromisoformat(
+                duty["start_time"]
+            )
+            miles += hours.total_seconds() / 3600 * HOSCalculator.AVERAGE_SPEED_MPH
+        fuel_stops = [
+            duty["end_time"]
+            for duty in plan["duty_statuses"]
+            if duty["location_description"] == "Fueling Stop"
+        ]
+        self.assertEqual(len(expected), 2)
+        self.assertEqual(fuel_stops, expected)
+
+    def test_tight_on_duty_window_falls_back(self):
+        calculator = HOSCalculator(
+            datetime(2024, 1, 1, 8, 0), 10.0, (34.0, -118.0), (40.0, -74.0)
+        )
+        calculator.MAX_ON_DUTY_HOURS = 12.0
+        self.assertIsNone(calculator._shift_driving_chunks())
+        expected_calculator = HOSCalculator(
+            datetime(2024, 1, 1, 8, 0), 10.0, (34.0, -118.0), (40.0, -74.0)
+        )
+        expected_calculator.MAX_ON_DUTY_HOURS = 12.0
+        self.assertEqual(
+            calculator.plan_trip_closed_form(), expected_calculator.plan_trip()
+        )
+
+
+class CycleLimitTestCase(SimpleTestCase):
+    start = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+
+    def on_duty_between_restarts(self, plan):
+        stretches = [0.0]
+        for duty in plan["duty_statuses"]:
+            if duty["location_description"] == "34-hour Restart":
+                stretches.append(0.0)
+            elif duty["status"] in ("DRIVING", "ON_DUTY_NOT_DRIVING"):
+                hours = datetime.fromisoformat(
+                    duty["end_time"]
+                ) - datetime.fromisoformat(duty["start_time"])
+                stretches[-1] += hours.total_seconds() / 3600
+        return stretches
+
+    def test_restart_keeps_cycle_within_limit(self):
+        plan = scalar_plan(self.start, (34.0, -118.0), (40.7, -74.0), 60.0)
+        stretches = self.on_duty_between_restarts(plan)
+        self.assertEqual(len(stretches), 2)
+        self.assertLessEqual(60.0 + stretches[0], 70.0 + 1e-9)
+        self.assertLessEqual(stretches[1], 70.0)
+        restart = next(
+            duty
+            for duty in plan["duty_statuses"]
+            if duty["location_description"] == "34-hour Restart"
+        )
+        self.assertEqual(restart["status"], "OFF_DUTY")
+
+    def test_exhausted_cycle_restarts_before_pickup(self):
+        plan = scalar_plan(self.start, (34.0, -118.0), (34.5, -118.0), 69.5)
+        self.assertEqual(
+            [duty["location_description"] for duty in plan["duty_statuses"]][:2],
+            ["34-hour Restart", "Pickup"],
+        )
+        self.assertEqual(
+            plan["duty_statuses"][1]["start_time"],
+            (self.start + timedelta(hours=34)).isoformat(),
+        )
+
+    def test_batch_planner_matches_scalar(self):
+        rng = random.Random(7)
+        count = 300
+        start_times = [self.start] * count
+        cycle_hours = [rng.uniform(0, 75) for _ in range(count)]
+        pickups = [[rng.uniform(-124, -67), rng.uniform(25, 49)] for _ in range(count)]
+        dropoffs = [[rng.uniform(-124, -67), rng.uniform(25, 49)] for _ in range(count)]
+        for fuel_stops in (False, True):
+            batch = plan_trips(
+                start_times, cycle_hours, pickups, dropoffs, fuel_stops=fuel_stops
+            )
+            for hours, pickup, dropoff, plan in zip(
+                cycle_hours, pickups, dropoffs, batch
+            ):
+                expected = scalar_plan(self.start, pickup, dropoff, hours, fuel_stops)
+                self.assertEqual(plan["duty_statuses"], expected["duty_statuses"])
+
+
+class BatchPlannerTestCase(SimpleTestCase):
+    start = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+
+    def assertMatchesScalar(self, start_times, pickups, dropoffs, fuel_stops=False):
+        batch = plan_trips(start_times, 10.0, pickups, dropoffs, fuel_stops=fuel_stops)
+        self.assertEqual(len(batch), len(start_times))
+        for start_time, pickup, dropoff, plan in zip(
+            start_times, pickups, dropoffs, batch
+        ):
+            expected = scalar_plan(start_time, pickup, dropoff, fuel_stops=fuel_stops)
+            self.assertEqual(plan["duty_statuses"], expected["duty_statuses"])
+            self.assertAlmostEqual(plan["total_miles"], expected["total_miles"])
+
+    def test_short_medium_and_cross_country_trips(self):
+        self.assertMatchesScalar(
+            [self.start] * 3,
+            [[-118.2437, 34.0522]] * 3,
+            [
+                [-118.2437, 34.1522],  # a few miles
+                [-121.4944, 38.5816],  # Sacramento
+                [-74.0060, 40.7128],  # New York
+            ],
+        )
+
+    def test_random_corpus(self):
+        rng = random.Random(42)
+        count = 500
+        start_times = [
+            self.start + timedelta(minutes=rng.randrange(100000)) for _ in range(count)
+        ]
+        pickups = [[rng.uniform(-124, -67), rng.uniform(25, 49)] for _ in range(count)]
+        dropoffs = [[rng.uniform(-124, -67), rng.uniform(25, 49)] for _ in range(count)]
+        self.assertMatchesScalar(start_times, pickups, dropoffs)
+        self.assertMatchesScalar(start_times, pickups, dropoffs, fuel_stops=True)
+
+    def test_naive_start_times(self):
+        self.assertMatchesScalar(
+            [datetime(2024, 6, 1, 5, 30)], [[-87.6, 41.9]], [[-80.2, 25.8]]
+        )
+
+    def test_empty_batch(self):
+        self.assertEqual(plan_trips([], 0.0, [], []), [])
+
+    def test_distances_match_scalar_formula(self):
+        calculator = HOSCalculator(self.start, 0, None, None)
+        pairs = [((34.05, -118.24), (40.71, -74.0)), ((0.0, 0.0), (0.0, 0.0))]
+        distances = calculate_distances([p for p, _ in pairs], [d for _, d in pairs])
+        for (pickup, dropoff), distance in zip(pairs, distances):
+            self.assertAlmostEqual(
+                distance, calculator.calculate_distance(pickup, dropoff)
+            )
+
+    def test_hours_round_like_timedelta(self):
+        hours = [0.5, 1 / 3, 2.0000001, 7.123456789, 10.999999999]
+        expected = [timedelta(hours=h) // timedelta(microseconds=1) for h in hours]
+        self.assertEqual(hours_to_microseconds(hours).tolist(), expected)
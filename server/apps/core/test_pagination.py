@@ -0,0 +1,165 @@
+import re
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.factories import (
+    START,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_user,
+    create_vehicle,
+)
+from apps.core.models import DutyStatus, ELDLog
+from apps.core.pagination import KeysetPagination
+
+
+class KeysetPaginationTestCase(APITestCase):
+    def setUp(self):
+        carrier = create_carrier()
+        self.manager = create_user("manager", "m@example.com")
+        create_driver(carrier, self.manager, license_number="M1", role="MANAGER")
+        drivers = [
+            create_driver(
+                carrier, create_user(f"driver{index}"), license_number=f"D{index}"
+            )
+            for index in range(3)
+        ]
+        vehicle = create_vehicle(carrier)
+        self.trips = [
+            create_trip(
+                drivers[index % 3],
+                vehicle,
+                # Every other trip shares a start time with its neighbour.
+                start_time=START + timedelta(hours=index // 2),
+            )
+            for index in range(25)
+        ]
+        self.client.force_authenticate(user=self.manager)
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+            pages += 1
+        return ids, pages
+
+    def test_unpaginated_without_cursor_or_limit(self):
+        response = self.client.get("/api/trips/")
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 25)
+
+    def test_unpaginated_lists_are_capped(self):
+        with mock.patch.object(KeysetPagination, "unpaginated_limit", 10):
+            response = self.client.get("/api/trips/")
+            self.assertIsInstance(response.data, list)
+            self.assertEqual(len(response.data), 10)
+            next_url = re.fullmatch(r'<(.+)>; rel="next"', response["Link"])[1]
+            self.assertIn("limit=10", next_url)
+            ids, pages = self.walk(next_url)
+        self.assertEqual(pages, 2)
+        self.assertEqual(
+            [item["id"] for item in response.data] + ids,
+            [
+                trip.id
+                for trip in sorted(
+                    self.trips,
+                    key=lambda trip: (trip.start_time, trip.id),
+                    reverse=True,
+                )
+            ],
+        )
+        response = self.client.get("/api/trips/")
+        self.assertNotIn("Link", response)
+
+    def test_trip_pages_follow_start_time_then_id(self):
+        ids, pages = self.walk("/api/trips/?limit=10")
+        expected = [
+            trip.id
+            for trip in sorted(
+                self.trips, key=lambda trip: (trip.start_time, trip.id), reverse=True
+            )
+        ]
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_count_is_opt_in(self):
+        response = self.client.get("/api/trips/?limit=5")
+        self.assertNotIn("count", response.data)
+        response = self.client.get("/api/trips/?limit=5&count=true")
+        self.assertEqual(response.data["count"], 25)
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_deep_page_uses_same_queries_as_first_page(self):
+        first = self.client.get("/api/trips/?limit=4")
+        url = first.data["next"]
+        for _ in range(4):
+            url = self.client.get(url).data["next"]
+        with CaptureQueriesContext(connection) as first_page:
+            self.client.get("/api/trips/?limit=4")
+        with CaptureQueriesContext(connection) as deep_page:
+            self.client.get(url)
+        self.assertEqual(len(deep_page), len(first_page))
+        page_query = next(
+            query["sql"]
+            for query in deep_page.captured_queries
+            if "ORDER BY" in query["sql"]
+        )
+        self.assertNotIn("OFFSET", page_query)
+
+    def test_previous_links_walk_back(self):
+        url = "/api/trips/?limit=7"
+        for _ in range(3):
+            response = self.client.get(url)
+            url = response.data["next"]
+        ids = [item["id"] for item in response.data["results"]]
+        while response.data["previous"]:
+            response = self.client.get(response.data["previous"])
+            ids = [item["id"] for item in response.data["results"]] + ids
+        self.assertEqual(ids[:21], self.walk("/api/trips/?limit=7")[0][:21])
+        self.assertEqual(len(ids), 21)
+
+    def test_duty_status_and_eld_log_pages(self):
+        trip = self.trips[0]
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        DutyStatus.objects.bulk_create(
+            DutyStatus(
+                trip=trip,
+                status="DRIVING",
+                start_time=start + timedelta(minutes=30 * index),
+                end_time=start + timedelta(minutes=30 * index + 30),
+                longitude=-118.0,
+                latitude=34.0,
+                location_description="Interstate",
+            )
+            for index in range(7)
+        )
+        ELDLog.objects.bulk_create(
+            ELDLog(trip=trip, date=date(2024, 1, day), total_miles=10.0)
+            for day in range(1, 8)
+        )
+
+        ids, pages = self.walk(f"/api/trips/{trip.id}/duty-status/?limit=3")
+        expected = list(
+            DutyStatus.objects.filter(trip=trip)
+            .order_by("start_time")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual((ids, pages), (expected, 3))
+
+        expected = list(
+            ELDLog.objects.filter(trip=trip)
+            .order_by("date")
+            .values_list("id", flat=True)
+        )
+        self.client.force_authenticate(user=trip.driver.user)
+        self.assertEqual(
+            self.walk(f"/api/trips/{trip.id}/eld-logs/?limit=3"), (expected, 3)
+        )
@@ -0,0 +1,136 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+from apps.core.factories import (
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.hos_logic import HOSCalculator
+from apps.core.models import Driver, ELDLog
+from apps.core.planning_pool import PlanningPool, PlannerUnavailable, planning_pool
+from apps.core.route_cache import route_plan_cache
+from apps.core.routing import NoRoute
+from apps.core.views import RouteCalculationAPIView
+
+User = get_user_model()
+
+
+class PlanningPoolTestCase(APITestCase):
+    def setUp(self):
+        route_plan_cache.clear()
+        cache.clear()
+        carrier = create_carrier()
+        driver = create_driver(carrier)
+        self.user = driver.user
+        self.trip = create_trip(driver, create_vehicle(carrier), current_cycle_hours=10)
+        self.client.force_authenticate(user=self.user)
+        self.route_url = f"/api/trips/{self.trip.id}/route/"
+        self.generate_url = f"/api/trips/{self.trip.id}/eld-logs/generate/"
+
+    def test_pool_plans_match_in_process_plans(self):
+        pool = PlanningPool(workers=1, max_pending=2)
+        self.addCleanup(pool.shutdown)
+        inputs = self.trip.get_planning_inputs()
+        plan = asyncio.run(pool.plan(inputs))
+        self.assertEqual(plan, HOSCalculator(*inputs).plan_trip_closed_form())
+        self.assertEqual(pool.pending, 0)
+
+    def test_async_route_matches_sync_view(self):
+        response = self.client.post(self.route_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        route_plan_cache.clear()
+        cache.clear()
+
+        request = APIRequestFactory().post(self.route_url)
+        force_authenticate(request, user=self.user)
+        sync_response = RouteCalculationAPIView.as_view()(request, trip_id=self.trip.id)
+        self.assertEqual(response.json(), json.loads(sync_response.render().content))
+
+        response = self.client.post(self.route_url, {"persist": True}, format="json")
+        self.assertEqual(response.data["plan_version"], 1)
+        self.assertEqual(
+            self.trip.duty_statuses.count(), len(response.data["duty_statuses"])
+        )
+
+    def test_full_pool_answers_429(self):
+        with mock.patch.object(planning_pool, "max_pending", 0):
+            response = self.client.post(self.route_url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_broken_pool_answers_503(self):
+        with mock.patch.object(
+            PlanningPool, "plan", autospec=True, side_effect=PlannerUnavailable
+        ):
+            response = self.client.post(self.route_url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_unroutable_trips_answer_422(self):
+        requests = [
+            (self.route_url, {}),
+            (self.generate_url, {"all_days": True}),
+            (self.generate_url, {"date": "2024-01-02"}),
+        ]
+        with mock.patch.object(
+            PlanningPool,
+            "plan",
+            autospec=True,
+            side_effect=NoRoute("No road route joins the pickup and the dropoff."),
+        ):
+            for url, data in requests:
+                response = self.client.post(url, data, format="json")
+                self.assertEqual(
+                    response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+                self.assertEqual(
+                    response.json(),
+                    {"error": "No road route joins the pickup and the dropoff."},
+                )
+
+    def test_cached_plans_skip_the_pool(self):
+        self.client.post(self.route_url)
+        with mock.patch.object(planning_pool, "max_pending", 0):
+            response = self.client.post(self.route_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_generate_eld_log(self):
+        response = self.client.post(
+            self.generate_url, {"date": "2024-01-02"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        log = ELDLog.objects.get(trip=self.trip)
+        self.assertGreater(log.total_miles, 2000)
+
+        response = self.client.post(
+            self.generate_url,
+            {"date": "2024-01-02", "total_miles": 12.5},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_miles"], 12.5)
+
+        response = self.client.post(self.generate_url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"error": "Date is required"})
+
+    def test_trips_of_other_drivers_are_not_found(self):
+        other_user = User.objects.create_user("driver2", "d2@example.com", "pass")
+        Driver.objects.create(
+            user=other_user, license_number="D2", carrier=self.trip.driver.carrier
+        )
+        self.client.force_authenticate(user=other_user)
+        response = self.client.post(self.route_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.generate_url, {"date": "2024-01-02"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.core.factories import (
+    create_carrier,
+    create_driver,
+    create_user,
+    create_vehicle,
+)
+from apps.core.models import Driver
+from apps.core.principal import ANONYMOUS, Principal, load_principal
+
+User = get_user_model()
+
+
+class PrincipalTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.carrier = create_carrier()
+        self.user = create_user("manager")
+        self.driver = create_driver(
+            self.carrier, self.user, license_number="M1", role="MANAGER"
+        )
+        create_vehicle(self.carrier)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [query["sql"] for query in queries]
+
+    def test_principal_fields(self):
+        self.assertEqual(
+            load_principal(self.user),
+            Principal(
+                user_id=self.user.id,
+                driver_id=self.driver.id,
+                role="MANAGER",
+                carrier_id=self.carrier.id,
+            ),
+        )
+        staff = User.objects.create_user("admin", password="pass", is_staff=True)
+        principal = load_principal(User.objects.get(id=staff.id))
+        self.assertTrue(principal.is_admin)
+        self.assertFalse(principal.is_driver)
+        self.assertFalse(ANONYMOUS.is_authenticated)
+
+    def test_jwt_request_resolves_principal_with_the_user(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response, queries = self.get("/api/vehicles/")
+        self.assertEqual(len(response.data), 1)
+        # One query loads the user and driver; the others validate and list
+        # vehicles.
+        self.assertEqual(len(queries), 3)
+        self.assertIn('"core_driver"', queries[0])
+
+    @override_settings(PRINCIPAL_CACHE_TIMEOUT=300)
+    def test_cached_principal_needs_no_query(self):
+        self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+        _, queries = self.get("/api/vehicles/")
+        self.assertEqual(len(queries), 3)
+        self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+        _, queries = self.get("/api/vehicles/")
+        self.assertEqual(len(queries), 2)
+
+    @override_settings(PRINCIPAL_CACHE_TIMEOUT=300)
+    def test_driver_changes_refresh_the_principal(self):
+        self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+        self.get("/api/drivers/")
+        self.driver.role = "DRIVER"
+        self.driver.save()
+        self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+        response = self.client.post(
+            "/api/vehicles/",
+            {"vehicle_number": "V2", "license_plate": "V2LP", "state": "CA"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_principal_is_request_scoped_without_a_cache_timeout(self):
+        create = {"vehicle_number": "V2", "license_plate": "V2LP", "state": "CA"}
+        self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+        _, queries = self.get("/api/vehicles/")
+        self.assertEqual(len(queries), 3)
+        # An update no signal sees, as another worker's cache would miss one.
+        Driver.objects.filter(id=self.driver.id).update(role="DRIVER")
+        self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+        response = self.client.post("/api/vehicles/", create)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        with override_settings(PRINCIPAL_CACHE_TIMEOUT=300):
+            self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+            self.get("/api/vehicles/")
+            Driver.objects.filter(id=self.driver.id).update(role="MANAGER")
+            self.client.force_authenticate(user=User.objects.get(id=self.user.id))
+            # Served from the cache until the timeout runs out.
+            response = self.client.post("/api/vehicles/", create)
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,90 @@
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.factories import (
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_user,
+    create_vehicle,
+)
+from apps.core.models import Driver
+from apps.core.principal import load_principal
+from apps.core.serializers import (
+    DriverSerializer,
+    TripSerializer,
+    VehicleSerializer,
+    required_relations,
+)
+
+
+class RequiredRelationsTestCase(SimpleTestCase):
+    def test_nested_serializers_contribute_their_relations(self):
+        select, prefetch = required_relations(TripSerializer)
+        self.assertEqual(
+            select,
+            (
+                "driver",
+                "driver__user",
+                "driver__carrier",
+                "vehicle",
+                "vehicle__assigned_driver__user",
+            ),
+        )
+        self.assertEqual(prefetch, ())
+        self.assertEqual(
+            required_relations(VehicleSerializer), (("assigned_driver__user",), ())
+        )
+        self.assertEqual(
+            required_relations(DriverSerializer), (("user", "carrier"), ())
+        )
+
+
+class ListQueryCountTestCase(APITestCase):
+    def setUp(self):
+        self.carrier = create_carrier()
+        self.admin = create_user("admin", "admin@example.com", is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+        # Count the listing's queries, not the first principal lookup.
+        load_principal(self.admin)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            index = Driver.objects.count()
+            driver = create_driver(
+                self.carrier,
+                create_user(f"driver{index}"),
+                license_number=f"D{index}",
+            )
+            vehicle = create_vehicle(
+                self.carrier,
+                f"V{index}",
+                license_plate=f"LP{index}",
+                assigned_driver=driver,
+            )
+            create_trip(driver, vehicle)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), len(response.data)
+
+    def assertConstantQueries(self, url, expected):
+        self.add_rows(2)
+        small = self.count_queries(url)
+        self.add_rows(10)
+        large = self.count_queries(url)
+        self.assertEqual((small, large), ((expected, 2), (expected, 12)))
+
+    # Trip and vehicle lists add the aggregate behind their ETag.
+    def test_trip_list(self):
+        self.assertConstantQueries("/api/trips/", 2)
+
+    def test_vehicle_list(self):
+        self.assertConstantQueries("/api/vehicles/", 2)
+
+    def test_driver_list(self):
+        self.assertConstantQueries("/api/drivers/", 1)
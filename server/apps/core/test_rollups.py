@@ -0,0 +1,212 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from apps.core.factories import (
+    START,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_user,
+    create_vehicle,
+)
+from apps.core.models import (
+    Trip,
+    ELDLog,
+    CarrierDailyRollup,
+    DailyRollup,
+    DriverDailyRollup,
+    rebuild_daily_rollups,
+    suspend_trip_totals,
+)
+
+
+class DailyRollupTestCase(TestCase):
+    def setUp(self):
+        carriers = [create_carrier(), create_carrier("Slow Freight")]
+        self.drivers = [
+            create_driver(
+                carriers[index % 2],
+                create_user(f"driver{index}"),
+                license_number=f"D{index}",
+            )
+            for index in range(3)
+        ]
+        self.vehicle = create_vehicle(carriers[0])
+        self.start = START
+        self.trips = [self.create_trip(driver) for driver in self.drivers * 2]
+
+    def create_trip(self, driver, day=0, status="PLANNED"):
+        return create_trip(
+            driver,
+            self.vehicle,
+            status=status,
+            start_time=self.start + timedelta(days=day),
+        )
+
+    def rollups(self):
+        """Every rollup row with activity, as {(model, key, day): metrics}."""
+        rows = {}
+        for model, key in (
+            (CarrierDailyRollup, "carrier_id"),
+            (DriverDailyRollup, "driver_id"),
+        ):
+            for rollup in model.objects.all():
+                metrics = tuple(
+                    getattr(rollup, name) for name in DailyRollup.METRIC_FIELDS
+                )
+                if any(metrics):
+                    rows[model.__name__, getattr(rollup, key), rollup.day] = metrics
+        return rows
+
+    def assertRollupsReconcile(self):
+        incremental = self.rollups()
+        rebuild_daily_rollups(date(2023, 12, 1), date(2024, 3, 1))
+        expected = self.rollups()
+        self.assertEqual(set(incremental), set(expected))
+        self.assertEqual(incremental, expected)
+
+    def test_incremental_rollups_match_rebuild(self):
+        rng = random.Random(12)
+        first_day = date(2024, 1, 1)
+        for step in range(200):
+            action = rng.random()
+            trip = rng.choice(self.trips)
+            if action < 0.5:
+                ELDLog.objects.update_or_create(
+                    trip=trip,
+                    date=first_day + timedelta(days=rng.randrange(8)),
+                    defaults={
+                        "total_miles": round(rng.uniform(0, 600), 1),
+                        "fuel_consumed": rng.choice([None, Decimal("12.25")]),
+                        "total_engine_hours": Decimal(rng.randint(0, 1400)) / 100,
+                        "total_idle_hours": rng.choice([None, Decimal("0.75")]),
+                    },
+                )
+            elif action < 0.6:
+                log = ELDLog.objects.filter(trip=trip).order_by("?").first()
+                if log is not None:
+                    log.date = first_day + timedelta(days=rng.randrange(8))
+                    if not ELDLog.objects.filter(trip=trip, date=log.date).exists():
+                        log.save()
+            elif action < 0.7:
+                ELDLog.objects.filter(
+                    id__in=ELDLog.objects.order_by("?").values("id")[:1]
+                ).delete()
+            elif action < 0.85:
+                trip.status = rng.choice(list(DailyRollup.TRIP_COUNT_FIELDS))
+                trip.start_time = self.start + timedelta(days=rng.randrange(8))
+                trip.save()
+            elif action < 0.95:
+                self.trips.append(
+                    self.create_trip(
+                        rng.choice(self.drivers),
+                        day=rng.randrange(8),
+                        status=rng.choice(list(DailyRollup.TRIP_COUNT_FIELDS)),
+                    )
+                )
+            elif len(self.trips) > 1:
+                self.trips.remove(trip)
+                trip.delete()
+            if step % 50 == 0:
+                self.assertRollupsReconcile()
+        self.assertRollupsReconcile()
+
+    def test_trip_completion_moves_the_count(self):
+        trip = Trip.objects.get(id=self.trips[0].id)
+        trip.status = "COMPLETED"
+        trip.save()
+        rollup = DriverDailyRollup.objects.get(driver=trip.driver, day=date(2024, 1, 1))
+        self.assertEqual((rollup.trips_planned, rollup.trips_completed), (1, 1))
+        rollup = CarrierDailyRollup.objects.get(
+            carrier=trip.driver.carrier, day=date(2024, 1, 1)
+        )
+        self.assertEqual((rollup.trips_planned, rollup.trips_completed), (3, 1))
+
+    def test_trip_totals_follow_completion_and_deletion(self):
+        trip = self.trips[0]
+        ELDLog.objects.create(trip=trip, date=date(2024, 1, 3), total_miles=120.0)
+        trip = Trip.objects.get(id=trip.id)
+        trip.status = "COMPLETED"
+        trip.total_miles = 500.0
+        trip.fuel_used = Decimal("50.00")
+        trip.save()
+        rollup = DriverDailyRollup.objects.get(driver=trip.driver, day=date(2024, 1, 1))
+        self.assertEqual((rollup.trip_miles, rollup.trip_fuel_used), (500.0, 50))
+        self.assertEqual(rollup.total_miles, 0.0)
+        self.assertRollupsReconcile()
+
+        Trip.objects.get(id=trip.id).delete()
+        rollup = DriverDailyRollup.objects.get(driver=trip.driver, day=date(2024, 1, 1))
+        self.assertEqual((rollup.trip_miles, rollup.trip_fuel_used), (0.0, 0))
+        self.assertRollupsReconcile()
+
+    def test_taking_miles_away_leaves_exactly_zero(self):
+        trip = self.trips[0]
+        logs = [
+            ELDLog.objects.create(trip=trip, date=date(2024, 1, 2), total_miles=0.1),
+            ELDLog.objects.create(
+                trip=self.trips[3], date=date(2024, 1, 2), total_miles=0
+            ),
+        ]
+        logs[1].total_miles = 0.2
+        logs[1].save()
+        for log in logs:
+            log.delete()
+        rollup = DriverDailyRollup.objects.get(driver=trip.driver, day=date(2024, 1, 2))
+        self.assertEqual(rollup.total_miles, 0.0)
+        self.assertRollupsReconcile()
+
+    def test_logs_saved_with_string_dates(self):
+        trip = self.trips[0]
+        log = ELDLog.objects.create(trip=trip, date="2024-01-03", total_miles=5)
+        rollup = DriverDailyRollup.objects.get(driver=trip.driver, day=date(2024, 1, 3))
+        self.assertEqual(rollup.total_miles, 5.0)
+        log.date = "2024-01-04"
+        log.save()
+        self.assertEqual(
+            list(
+                DriverDailyRollup.objects.filter(driver=trip.driver)
+                .exclude(total_miles=0)
+                .values_list("day", flat=True)
+            ),
+            [date(2024, 1, 4)],
+        )
+
+    def test_suspended_block_refreshes_once(self):
+        trip = self.trips[0]
+        with suspend_trip_totals():
+            for day in range(1, 6):
+                ELDLog.objects.create(
+                    trip=trip, date=date(2024, 1, day), total_miles=10.0 * day
+                )
+            with CaptureQueriesContext(connection) as queries:
+                ELDLog.objects.create(trip=trip, date=date(2024, 1, 6), total_miles=1.0)
+            self.assertEqual(len(queries), 1)
+        rollups = DriverDailyRollup.objects.filter(driver=trip.driver).order_by("day")
+        self.assertEqual(
+            [rollup.total_miles for rollup in rollups],
+            [10.0, 20.0, 30.0, 40.0, 50.0, 1.0],
+        )
+        self.assertRollupsReconcile()
+
+    def test_rebuild_command_backfills_in_chunks(self):
+        for day in range(10):
+            ELDLog.objects.create(
+                trip=self.trips[day % 3],
+                date=date(2024, 1, 1) + timedelta(days=day),
+                total_miles=100.0,
+                total_engine_hours=Decimal("8.00"),
+            )
+        expected = self.rollups()
+        CarrierDailyRollup.objects.all().delete()
+        DriverDailyRollup.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_rollups", chunk_days=4, stdout=out)
+        self.assertEqual(self.rollups(), expected)
+        self.assertEqual(out.getvalue().count(" to "), 3)
@@ -0,0 +1,112 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.factories import (
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.models import DutyStatus, Trip
+from apps.core.planning_pool import PlanningPool
+from apps.core.route_cache import (
+    LRUCache,
+    get_route_plan,
+    route_plan_cache,
+    trip_plan_key,
+)
+
+
+class RoutePlanCacheTestCase(APITestCase):
+    def setUp(self):
+        route_plan_cache.clear()
+        cache.clear()
+        carrier = create_carrier()
+        driver = create_driver(carrier)
+        self.user = driver.user
+        self.trip = create_trip(driver, create_vehicle(carrier), current_cycle_hours=10)
+        self.client.force_authenticate(user=self.user)
+
+    def plan_calls(self):
+        # Route requests plan in the planning pool's worker processes.
+        return mock.patch.object(
+            PlanningPool, "plan", autospec=True, side_effect=PlanningPool.plan
+        )
+
+    def test_repeat_route_requests_plan_once(self):
+        with self.plan_calls() as planner:
+            for _ in range(3):
+                response = self.client.post(f"/api/trips/{self.trip.id}/route/")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(planner.call_count, 1)
+        self.assertGreater(len(response.data["duty_statuses"]), 2)
+
+    def test_shared_tier_survives_local_eviction(self):
+        with self.plan_calls() as planner:
+            self.client.post(f"/api/trips/{self.trip.id}/route/")
+            route_plan_cache.clear()
+            self.client.post(f"/api/trips/{self.trip.id}/route/")
+        self.assertEqual(planner.call_count, 1)
+
+    def test_cache_hits_read_the_cycle_window_loaded_with_the_trip(self):
+        # The window answers for trips starting on or after its last day.
+        self.trip.start_time = timezone.now() + timedelta(days=1)
+        self.trip.save()
+        DutyStatus.objects.create(
+            trip=self.trip,
+            status="DRIVING",
+            start_time=timezone.now() - timedelta(hours=16),
+            end_time=timezone.now() - timedelta(hours=2),
+            longitude=-118.0,
+            latitude=34.0,
+            location_description="I-10",
+        )
+        trips = Trip.objects.select_related("driver__cycle")
+        plan = get_route_plan(trips.get(id=self.trip.id))
+        trip = trips.get(id=self.trip.id)
+        with self.assertNumQueries(0):
+            self.assertIs(get_route_plan(trip), plan)
+        self.assertEqual(trip.get_cycle_hours(), 14.0)
+        self.assertEqual(
+            trip_plan_key(trip), trip_plan_key(Trip.objects.get(id=trip.id))
+        )
+
+    def test_changed_planning_inputs_invalidate(self):
+        self.client.post(f"/api/trips/{self.trip.id}/route/")
+        trip = Trip.objects.get(id=self.trip.id)
+        old_key = trip_plan_key(trip)
+        self.assertIsNotNone(cache.get(old_key))
+
+        trip.status = "IN_PROGRESS"
+        trip.save()
+        self.assertIsNotNone(cache.get(old_key))
+
+        trip.start_time += timedelta(hours=2)
+        trip.save()
+        self.assertIsNone(cache.get(old_key))
+        self.assertIsNone(route_plan_cache.local.get(old_key))
+
+        response = self.client.post(f"/api/trips/{self.trip.id}/route/")
+        self.assertTrue(
+            response.data["duty_statuses"][0]["start_time"].startswith(
+                "2024-01-01T10:00:00"
+            )
+        )
+
+
+class LRUCacheTestCase(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(max_entries=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("a"), 1)
+        self.assertEqual(lru.get("c"), 3)
@@ -0,0 +1,300 @@
+import contextlib
+import heapq
+import io
+import math
+import os
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import polyline
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.core.factories import (
+    START,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.hos_logic import HOSCalculator
+from apps.core.route_cache import plan_key
+from apps.core.routing import (
+    NoRoute,
+    RoadGraph,
+    RoadGraphRouter,
+    RoutePath,
+    build_graph,
+    get_router,
+    load_router,
+    write_graph,
+)
+from apps.core.views import ELDLogGenerateView, RouteCalculationAPIView
+
+
+def graph_file(directory, *args, **kwargs):
+    arrays, meta = build_graph(*args, **kwargs)
+    path = os.path.join(directory, "roads.graph")
+    write_graph(path, arrays, **meta)
+    return path
+
+
+def dijkstra_hours(graph, source, target):
+    best = {source: 0.0}
+    queue = [(0.0, source)]
+    while queue:
+        hours, node = heapq.heappop(queue)
+        if node == target:
+            return hours
+        if hours > best[node]:
+            continue
+        for edge in range(graph.offsets[node], graph.offsets[node + 1]):
+            total = hours + graph.hours[edge]
+            neighbour = int(graph.targets[edge])
+            if total < best.get(neighbour, math.inf):
+                best[neighbour] = total
+                heapq.heappush(queue, (total, neighbour))
+    return None
+
+
+class RoadGraphTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def corridor(self):
+        # A slow direct road from 1 to 4 and a faster detour through 2 and 3;
+        # 5 is an island and 3 -> 4 is one way.
+        return RoadGraph(
+            graph_file(
+                self.directory,
+                [1, 2, 3, 4, 5],
+                [35.0, 35.5, 35.5, 35.0, 20.0],
+                [-100.0, -100.0, -99.0, -99.0, -80.0],
+                [1, 1, 2, 3],
+                [4, 2, 3, 4],
+                [15.0, 65.0, 65.0, 65.0],
+                oneway=[False, False, False, True],
+            )
+        )
+
+    def test_routes_take_the_fastest_roads(self):
+        router = RoadGraphRouter(self.corridor())
+        route = router.route([-100.0, 35.0], [-99.0, 35.0])
+        self.assertEqual(
+            polyline.decode(route.polyline, 5),
+            [
+                (35.0, -100.0),
+                (35.0, -100.0),
+                (35.5, -100.0),
+                (35.5, -99.0),
+                (35.0, -99.0),
+                (35.0, -99.0),
+            ],
+        )
+        self.assertGreater(route.miles, 56.6)
+        self.assertAlmostEqual(route.speed_mph, 65.0)
+        self.assertAlmostEqual(route.hours, route.miles / 65.0)
+
+        # The detour is one way, so the way back is the slow road.
+        route = router.route([-99.0, 35.0], [-100.0, 35.0])
+        self.assertAlmostEqual(route.speed_mph, 15.0)
+
+    def test_unroutable_locations(self):
+        router = RoadGraphRouter(self.corridor())
+        with self.assertRaises(NoRoute):
+            router.route([-100.0, 35.0], [-80.0, 20.0])
+        with self.assertRaises(NoRoute):
+            router.route([-100.0, 35.0], [0.0, 0.0])
+
+    def test_a_star_matches_dijkstra(self):
+        rng = np.random.default_rng(7)
+        latitudes = rng.uniform(34, 36, 300)
+        longitudes = rng.uniform(-101, -99, 300)
+        sources, targets = [], []
+        for node in range(300):
+            distances = np.hypot(
+                latitudes - latitudes[node], longitudes - longitudes[node]
+            )
+            for neighbour in np.argsort(distances)[1:4]:
+                sources.append(node)
+                targets.append(int(neighbour))
+        graph = RoadGraph(
+            graph_file(
+                self.directory,
+                np.arange(300),
+                latitudes,
+                longitudes,
+                sources,
+                targets,
+                rng.choice([25.0, 45.0, 70.0], len(sources)),
+            )
+        )
+        for source, target in rng.integers(0, 300, (20, 2)).tolist():
+            edges = graph.shortest_path(source, target)
+            expected = dijkstra_hours(graph, source, target)
+            if expected is None:
+                self.assertIsNone(edges)
+            else:
+                self.assertAlmostEqual(float(graph.hours[edges].sum()), expected)
+
+    def test_route_path_points(self):
+        path = RoutePath(
+            polyline.encode([(35.0, -100.0), (36.0, -100.0), (36.0, -99.0)], 5)
+        )
+        self.assertEqual(path.point_at(0.0), [-100.0, 35.0])
+        self.assertEqual(path.point_at(1.0), [-99.0, 36.0])
+        # A quarter of the way is still on the northbound first leg.
+        longitude, latitude = path.point_at(0.25)
+        self.assertAlmostEqual(longitude, -100.0)
+        self.assertAlmostEqual(
+            latitude, 35.0 + 0.25 * path.distances[-1] / path.lengths[0]
+        )
+
+    def test_planner_uses_the_route(self):
+        router = RoadGraphRouter(self.corridor())
+        calculator = HOSCalculator(
+            START, 0.0, [-100.0, 35.0], [-99.0, 35.0], router=router
+        )
+        plan = calculator.plan_trip()
+        route = router.route([-100.0, 35.0], [-99.0, 35.0])
+        self.assertEqual(plan["total_miles"], route.miles)
+        self.assertEqual(plan["polyline"], route.polyline)
+        driving = sum(
+            (
+                datetime.fromisoformat(duty["end_time"])
+                - datetime.fromisoformat(duty["start_time"])
+            ).total_seconds()
+            / 3600
+            for duty in plan["duty_statuses"]
+            if duty["status"] == "DRIVING"
+        )
+        self.assertAlmostEqual(driving, route.hours, places=5)
+
+        closed_form = HOSCalculator(
+            START, 0.0, [-100.0, 35.0], [-99.0, 35.0], router=router
+        ).plan_trip_closed_form()
+        self.assertEqual(closed_form, plan)
+
+    def test_build_command(self):
+        nodes = os.path.join(self.directory, "nodes.csv")
+        edges = os.path.join(self.directory, "edges.csv")
+        output = os.path.join(self.directory, "built.graph")
+        with open(nodes, "w") as csv_file:
+            csv_file.write("id,latitude,longitude\n10,35.0,-100.0\n20,35.0,-99.0\n")
+        with open(edges, "w") as csv_file:
+            csv_file.write("source,target,speed_mph,oneway\n10,20,60,yes\n")
+        call_command(
+            "build_road_graph",
+            nodes=nodes,
+            edges=edges,
+            output=output,
+            stdout=io.StringIO(),
+        )
+        graph = RoadGraph(output)
+        self.assertEqual(list(graph.offsets), [0, 1, 1])
+        self.assertEqual(graph.max_speed_mph, 60.0)
+        self.assertIsNone(graph.shortest_path(1, 0))
+
+
+class RoutingBackendTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = graph_file(
+            directory.name,
+            [1, 2, 3],
+            [34.0, 35.0, 36.0],
+            [-118.0, -117.0, -115.0],
+            [1, 2],
+            [2, 3],
+            [60.0, 60.0],
+        )
+        self.addCleanup(load_router.cache_clear)
+
+    def test_default_backend_keeps_the_great_circle_plan(self):
+        self.assertIsNone(get_router())
+        calculator = HOSCalculator(START, 0.0, [-118.0, 34.0], [-115.0, 36.0])
+        plan = calculator.plan_trip()
+        self.assertEqual(set(plan), {"total_miles", "duty_statuses"})
+
+    def test_road_backend_plans_are_keyed_and_placed_on_the_route(self):
+        inputs = (START, 0.0, [-118.0, 34.0], [-115.0, 36.0])
+        great_circle_key = plan_key(*inputs)
+        with override_settings(
+            ROUTING={"BACKEND": "road_graph", "GRAPH_PATH": self.path}
+        ):
+            router = get_router()
+            self.assertIsInstance(router, RoadGraphRouter)
+            self.assertNotEqual(plan_key(*inputs), great_circle_key)
+
+            carrier = create_carrier()
+            trip = create_trip(
+                create_driver(carrier),
+                create_vehicle(carrier),
+                dropoff_longitude=-115.0,
+                dropoff_latitude=36.0,
+            )
+            plan = HOSCalculator(*inputs, router=router).plan_trip_closed_form()
+            statuses = trip.materialize_plan(plan)
+        path = RoutePath(plan["polyline"])
+        for duty_status in statuses:
+            # Every stop lies on one of the route's two straight legs.
+            on_first_leg = math.isclose(
+                (duty_status.longitude + 118.0),
+                (duty_status.latitude - 34.0),
+                abs_tol=1e-6,
+            )
+            on_second_leg = math.isclose(
+                (duty_status.longitude + 117.0),
+                2 * (duty_status.latitude - 35.0),
+                abs_tol=1e-6,
+            )
+            self.assertTrue(on_first_leg or on_second_leg, duty_status.get_location())
+        self.assertEqual(statuses[-1].get_location(), path.point_at(1.0))
+
+    def test_off_graph_trips_are_unprocessable(self):
+        carrier = create_carrier()
+        driver = create_driver(carrier)
+        trip = create_trip(
+            driver,
+            create_vehicle(carrier),
+            dropoff_longitude=-80.0,
+            dropoff_latitude=20.0,
+        )
+        requests = [
+            (RouteCalculationAPIView, f"/api/trips/{trip.id}/route/", {}),
+            (
+                ELDLogGenerateView,
+                f"/api/trips/{trip.id}/eld-logs/generate/",
+                {"all_days": True},
+            ),
+            (
+                ELDLogGenerateView,
+                f"/api/trips/{trip.id}/eld-logs/generate/",
+                {"date": "2024-01-01"},
+            ),
+        ]
+        with override_settings(
+            ROUTING={"BACKEND": "road_graph", "GRAPH_PATH": self.path}
+        ), contextlib.redirect_stdout(io.StringIO()):
+            for view, url, data in requests:
+                request = APIRequestFactory().post(url, data, format="json")
+                force_authenticate(request, user=driver.user)
+                response = view.as_view()(request, trip_id=trip.id)
+                self.assertEqual(
+                    response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+                self.assertEqual(
+                    response.data, {"error": "No road within 50 miles of the location."}
+                )
+
+    def test_unknown_backend(self):
+        from django.core.exceptions import ImproperlyConfigured
+
+        with override_settings(ROUTING={"BACKEND": "teleport"}):
+            with self.assertRaises(ImproperlyConfigured):
+                get_router()
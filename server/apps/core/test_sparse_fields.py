@@ -0,0 +1,121 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.factories import (
+    at,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_user,
+    create_vehicle,
+)
+from apps.core.models import DutyStatus
+
+
+class SparseFieldsTestCase(APITestCase):
+    def setUp(self):
+        carrier = create_carrier()
+        self.user = create_user(first_name="Dana", last_name="Reyes")
+        self.driver = create_driver(carrier, self.user)
+        self.vehicle = create_vehicle(carrier)
+        self.trip = create_trip(
+            self.driver,
+            self.vehicle,
+            pickup_location_name="Los Angeles",
+            dropoff_location_name="New York",
+            total_miles=2790.5,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [query["sql"] for query in queries]
+
+    def test_fields_trim_output_and_columns(self):
+        response, queries = self.get("/api/trips/?fields=id,status,total_miles")
+        self.assertEqual(
+            response.data,
+            [{"id": self.trip.id, "status": "PLANNED", "total_miles": 2790.5}],
+        )
+        trip_query = queries[-1]
+        self.assertIn('"core_trip"."total_miles"', trip_query)
+        self.assertNotIn('"core_trip"."dropoff_longitude"', trip_query)
+        self.assertNotIn("core_driver", trip_query)
+
+    def test_nested_objects_need_expand(self):
+        response, _ = self.get(f"/api/trips/{self.trip.id}/?fields=id,driver,vehicle")
+        self.assertEqual(response.data["driver"], self.driver.id)
+        self.assertEqual(response.data["vehicle"], self.vehicle.id)
+
+        response, queries = self.get(
+            f"/api/trips/{self.trip.id}/?fields=id,driver&expand=driver"
+        )
+        self.assertEqual(response.data["driver"]["username"], "driver1")
+        self.assertEqual(response.data["driver"]["carrier_name"], "Rapid Logistics")
+        # The trip and the ETag aggregate.
+        self.assertEqual(len(queries), 2)
+
+    def test_summary_view(self):
+        response, queries = self.get("/api/trips/?view=summary")
+        self.assertEqual(
+            response.data[0],
+            {
+                "id": self.trip.id,
+                "status": "PLANNED",
+                "driver": {"id": self.driver.id},
+                "driver_name": "Dana Reyes",
+                "vehicle": {
+                    "id": self.vehicle.id,
+                    "vehicle_number": "V1",
+                    "license_plate": "V1LP",
+                    "carrier": self.vehicle.carrier_id,
+                },
+                "pickup_location_name": "Los Angeles",
+                "dropoff_location_name": "New York",
+                "start_time": "2024-01-01T08:00:00Z",
+                "end_time": None,
+                "total_miles": 2790.5,
+                "fuel_used": "0.00",
+                "total_engine_hours": "0.00",
+            },
+        )
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("password", queries[-1])
+
+    def test_summary_pages_load_only_summary_columns(self):
+        response, queries = self.get("/api/trips/?view=summary&limit=1")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('"core_trip"."current_latitude"', queries[-1])
+
+    def test_duty_status_fields(self):
+        DutyStatus.objects.create(
+            trip=self.trip,
+            status="DRIVING",
+            start_time=at(1, 8),
+            end_time=at(1, 9),
+            longitude=-118.0,
+            latitude=34.0,
+            location_description="Interstate",
+        )
+        response, _ = self.get(
+            f"/api/trips/{self.trip.id}/duty-status/?fields=status,start_time"
+        )
+        self.assertEqual(
+            response.data, [{"status": "DRIVING", "start_time": "2024-01-01T08:00:00Z"}]
+        )
+
+    def test_writes_keep_every_column(self):
+        response = self.client.patch(
+            f"/api/trips/{self.trip.id}/?fields=id,status",
+            {"status": "IN_PROGRESS"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"id": self.trip.id, "status": "IN_PROGRESS"})
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.status, "IN_PROGRESS")
+        self.assertEqual(self.trip.dropoff_location_name, "New York")
@@ -0,0 +1,81 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.core.factories import (
+    at,
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.models import Driver, DutyStatus, ELDLog
+from apps.core.principal import load_principal
+from apps.core.route_cache import route_plan_cache
+
+User = get_user_model()
+
+
+class TripBundleTestCase(APITestCase):
+    def setUp(self):
+        route_plan_cache.clear()
+        carrier = create_carrier()
+        driver = create_driver(carrier)
+        self.user = driver.user
+        self.trip = create_trip(driver, create_vehicle(carrier), current_cycle_hours=10)
+        for hour in (10, 8, 9):
+            DutyStatus.objects.create(
+                trip=self.trip,
+                status="DRIVING",
+                start_time=at(1, hour),
+                end_time=at(1, hour, 45),
+                longitude=-118.0,
+                latitude=34.0,
+                location_description="Interstate",
+            )
+        for day in (2, 1):
+            ELDLog.objects.create(
+                trip=self.trip, date=date(2024, 1, day), total_miles=100.0 * day
+            )
+        self.client.force_authenticate(user=self.user)
+        load_principal(self.user)
+        self.url = f"/api/trips/{self.trip.id}/bundle/"
+
+    def test_bundle_matches_the_separate_endpoints(self):
+        # The trip, its duty statuses and its ELD logs.
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("route", response.data)
+        trip_id = self.trip.id
+        self.assertEqual(
+            response.data["trip"], self.client.get(f"/api/trips/{trip_id}/").data
+        )
+        self.assertEqual(
+            response.data["duty_statuses"],
+            self.client.get(f"/api/trips/{trip_id}/duty-status/").data,
+        )
+        # Logs come in date order.
+        self.assertEqual(
+            response.data["eld_logs"],
+            sorted(
+                self.client.get(f"/api/trips/{trip_id}/eld-logs/").data,
+                key=lambda log: log["date"],
+            ),
+        )
+
+    def test_route_is_optional(self):
+        response = self.client.get(self.url, {"route": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        route = self.client.post(f"/api/trips/{self.trip.id}/route/").data
+        self.assertEqual(response.data["route"], route)
+
+    def test_other_drivers_trips_are_not_found(self):
+        other_user = User.objects.create_user("driver2", "d2@example.com", "pass")
+        Driver.objects.create(
+            user=other_user, license_number="D2", carrier=self.trip.driver.carrier
+        )
+        self.client.force_authenticate(user=other_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
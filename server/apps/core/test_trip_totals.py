@@ -0,0 +1,126 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from apps.core.factories import (
+    create_carrier,
+    create_driver,
+    create_trip,
+    create_vehicle,
+)
+from apps.core.models import Trip, ELDLog, recalculate_trip_totals, suspend_trip_totals
+
+
+class TripTotalsTestCase(TestCase):
+    def setUp(self):
+        carrier = create_carrier()
+        driver = create_driver(carrier)
+        vehicle = create_vehicle(carrier)
+        self.trips = [create_trip(driver, vehicle) for _ in range(3)]
+
+    def totals(self):
+        return {
+            trip.id: (trip.total_miles, trip.fuel_used, trip.total_engine_hours)
+            for trip in Trip.objects.order_by("id")
+        }
+
+    def assertTotalsReconcile(self):
+        incremental = self.totals()
+        recalculate_trip_totals(trip.id for trip in self.trips)
+        expected = self.totals()
+        for trip_id, (miles, fuel, hours) in expected.items():
+            got_miles, got_fuel, got_hours = incremental[trip_id]
+            self.assertAlmostEqual(got_miles, miles, places=6)
+            self.assertEqual(got_fuel, fuel)
+            self.assertEqual(got_hours, hours)
+
+    def random_values(self, rng):
+        return {
+            "total_miles": round(rng.uniform(0, 700), rng.choice([0, 1, 3])),
+            "fuel_consumed": rng.choice(
+                [None, Decimal(rng.randint(0, 20000)) / 100, "12.5", 7.25]
+            ),
+            "total_engine_hours": rng.choice(
+                [None, Decimal(rng.randint(0, 1400)) / 100, 0]
+            ),
+        }
+
+    def test_incremental_totals_match_full_aggregate(self):
+        rng = random.Random(7)
+        start = date(2024, 1, 1)
+        for step in range(300):
+            logs = list(ELDLog.objects.all())
+            action = rng.random()
+            if action < 0.4 or not logs:
+                trip = rng.choice(self.trips)
+                day = start + timedelta(days=rng.randint(0, 60))
+                ELDLog.objects.update_or_create(
+                    trip=trip, date=day, defaults=self.random_values(rng)
+                )
+            elif action < 0.7:
+                log = rng.choice(logs)
+                for name, value in self.random_values(rng).items():
+                    if rng.random() < 0.6:
+                        setattr(log, name, value)
+                log.save()
+            elif action < 0.8:
+                log = rng.choice(logs)
+                log.trip = rng.choice(self.trips)
+                log.date = start + timedelta(days=100 + step)
+                log.save()
+            elif action < 0.9:
+                rng.choice(logs).delete()
+            else:
+                ELDLog.objects.filter(trip=rng.choice(self.trips)).filter(
+                    date__lt=start + timedelta(days=rng.randint(0, 60))
+                ).delete()
+            if step % 25 == 0:
+                self.assertTotalsReconcile()
+        self.assertTotalsReconcile()
+
+    def test_save_applies_delta_without_aggregating(self):
+        trip = self.trips[0]
+        log = ELDLog.objects.create(
+            trip=trip, date=date(2024, 1, 1), total_miles=100.0, fuel_consumed="10.00"
+        )
+        log = ELDLog.objects.get(id=log.id)
+        log.total_miles = 150.0
+        # The log, the trip totals, and the trip's driver and carrier for the
+        # two daily rollup updates.
+        with self.assertNumQueries(5):
+            log.save()
+        trip.refresh_from_db()
+        self.assertEqual(trip.total_miles, 150.0)
+        self.assertEqual(trip.fuel_used, Decimal("10.00"))
+
+    def test_suspended_block_reconciles_once(self):
+        trip = self.trips[0]
+        with suspend_trip_totals():
+            for day in range(1, 11):
+                ELDLog.objects.create(
+                    trip=trip,
+                    date=date(2024, 1, day),
+                    total_miles=10.0,
+                    total_engine_hours="1.50",
+                )
+            with suspend_trip_totals():
+                ELDLog.objects.filter(date=date(2024, 1, 1)).delete()
+            trip.refresh_from_db()
+            self.assertEqual(trip.total_miles, 0.0)
+        trip.refresh_from_db()
+        self.assertEqual(trip.total_miles, 90.0)
+        self.assertEqual(trip.total_engine_hours, Decimal("13.50"))
+
+    def test_suspended_block_skips_reconcile_on_error(self):
+        trip = self.trips[0]
+        with self.assertRaises(RuntimeError):
+            with suspend_trip_totals():
+                ELDLog.objects.create(trip=trip, date=date(2024, 1, 1), total_miles=5)
+                raise RuntimeError
+        trip.refresh_from_db()
+        self.assertEqual(trip.total_miles, 0.0)
+        recalculate_trip_totals([trip.id])
+        ELDLog.objects.create(trip=trip, date=date(2024, 1, 2), total_miles=7)
+        trip.refresh_from_db()
+        self.assertEqual(trip.total_miles, 12.0)
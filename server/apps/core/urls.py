@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework_nested import routers
 from .views import (
@@ -9,8 +10,20 @@ from .views import (
     ELDLogViewSet,
     UserInfoView,
     ELDLogGenerateView,
+    AsyncELDLogGenerateView,
     ELDLogListView,
+    ELDLogIngestView,
+    FleetSummaryView,
+    CarrierAnalyticsView,
+    DriverAnalyticsView,
+    DailyAnalyticsView,
     RouteCalculationAPIView,
+    AsyncRouteCalculationView,
+    BatchView,
+    DispatchView,
+    TripMapView,
+    PositionMapView,
+    DutyStatusMapView,
 )
 
 # Main router for top-level resources
@@ -25,23 +38,45 @@ trips_router = routers.NestedSimpleRouter(router, r"trips", lookup="trip")
 trips_router.register(r"duty-status", DutyStatusViewSet, basename="trip-duty-statuses")
 trips_router.register(r"eld-logs", ELDLogViewSet, basename="trip-eld-logs")
 
+# Planning endpoints hand the planner to a process pool unless it is disabled.
+if settings.PLANNING_POOL["WORKERS"]:
+    route_view = AsyncRouteCalculationView.as_view()
+    eld_log_generate_view = AsyncELDLogGenerateView.as_view()
+else:
+    route_view = RouteCalculationAPIView.as_view()
+    eld_log_generate_view = ELDLogGenerateView.as_view()
+
 # URL patterns for the core app
 urlpatterns = [
     path("user-info/", UserInfoView.as_view(), name="user-info"),
     # FIX: Correctly wired up the standalone views
     path(
         "trips/<int:trip_id>/eld-logs/generate/",
-        ELDLogGenerateView.as_view(),
+        eld_log_generate_view,
         name="eld-log-generate",
     ),
     path(
         "trips/<int:trip_id>/eld-logs/", ELDLogListView.as_view(), name="eld-log-list"
     ),
+    path("eld-logs/ingest/", ELDLogIngestView.as_view(), name="eld-log-ingest"),
     path(
         "trips/<int:trip_id>/route/",
-        RouteCalculationAPIView.as_view(),
+        route_view,
         name="route-calculation",
     ),
+    path("analytics/summary/", FleetSummaryView.as_view(), name="analytics-summary"),
+    path(
+        "analytics/carriers/", CarrierAnalyticsView.as_view(), name="analytics-carriers"
+    ),
+    path("analytics/drivers/", DriverAnalyticsView.as_view(), name="analytics-drivers"),
+    path("analytics/daily/", DailyAnalyticsView.as_view(), name="analytics-daily"),
+    path("batch/", BatchView.as_view(), name="batch"),
+    path("dispatch/", DispatchView.as_view(), name="dispatch"),
+    path("map/trips/", TripMapView.as_view(), name="map-trips"),
+    path("map/positions/", PositionMapView.as_view(), name="map-positions"),
+    path(
+        "map/duty-statuses/", DutyStatusMapView.as_view(), name="map-duty-statuses"
+    ),
     path("", include(router.urls)),
     path("", include(trips_router.urls)),
 ]
@@ -2,10 +2,42 @@
 
 from rest_framework import viewsets, permissions, generics, status
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.decorators import action
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    MethodNotAllowed,
+    NotAuthenticated,
+    PermissionDenied,
+    ValidationError,
+)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import transaction
+from django.db.models import OuterRef, Prefetch, Subquery, prefetch_related_objects
+from django.http import Http404, HttpRequest, QueryDict
+from django.shortcuts import get_object_or_404
+from django.urls import Resolver404, resolve
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from .models import Trip, DutyStatus, Vehicle, Carrier, Driver, ELDLog
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from .models import (
+    Trip,
+    DutyStatus,
+    Vehicle,
+    Carrier,
+    Driver,
+    ELDLog,
+    CarrierDailyRollup,
+    DriverDailyRollup,
+    driver_cycle_status,
+    record_cycle_minutes,
+    set_cells,
+    upsert_eld_logs,
+)
 from .serializers import (
     TripSerializer,
     DutyStatusSerializer,
@@ -13,10 +45,37 @@ from .serializers import (
     CarrierSerializer,
     DriverSerializer,
     ELDLogSerializer,
+    ELDLogIngestSerializer,
+    TripSummarySerializer,
+    AnalyticsQuerySerializer,
+    BatchRequestSerializer,
+    DispatchQuerySerializer,
+    MapQuerySerializer,
+    TripMapQuerySerializer,
+    with_query_plan,
 )
 from rest_framework.views import APIView
-from datetime import date
-from .hos_logic import HOSCalculator
+from datetime import date, timedelta
+from functools import partial
+from urllib.parse import urlsplit
+import asyncio
+import json
+from . import analytics, dispatch
+from .route_cache import aget_route_plan, get_route_plan
+from .planning_pool import PlannerBusy, PlannerUnavailable
+from .routing import NoRoute
+from .cycle_tracker import cycle_changes
+from .duty_grid import cycle_recap, driver_day_grids, forget_driver_grids
+from .geocell import within_box, within_radius
+from .eld_generation import GENERATED_FIELDS, daily_eld_logs, parse_timezone
+from .pagination import KeysetPagination
+from .conditional import (
+    aggregate_validators,
+    collection_validators,
+    conditional_response,
+    timestamped_relations,
+)
+from .principal import get_principal, remember_principal
 from drf_yasg.utils import swagger_auto_schema  # FIX: Added missing import
 
 User = get_user_model()
@@ -24,41 +83,103 @@ User = get_user_model()
 
 class IsAdminOrDriverForRead(permissions.BasePermission):
     def has_permission(self, request, view):
-        if not request.user or not request.user.is_authenticated:
+        principal = get_principal(request)
+        if not principal.is_authenticated:
             return False
-        if request.user.is_staff:
+        if principal.is_staff:
             return True
-        if (
-            hasattr(request.user, "driver")
-            and request.method in permissions.SAFE_METHODS
-        ):
+        if principal.is_driver and request.method in permissions.SAFE_METHODS:
             return True
         return False
 
 
+class IsManagerOrStaff(permissions.BasePermission):
+    def has_permission(self, request, view):
+        principal = get_principal(request)
+        if not principal.is_authenticated:
+            return False
+        return principal.is_staff or principal.is_manager
+
+
 class IsManagerOrAdminForVehicle(permissions.BasePermission):
     """Allow admins full access, managers read, create, and update."""
     def has_permission(self, request, view):
-        if not request.user or not request.user.is_authenticated:
+        principal = get_principal(request)
+        if not principal.is_authenticated:
             return False
-        if request.user.is_staff:
+        if principal.is_staff:
             return True
         # Managers can read, create, and update vehicles in their carrier
-        if hasattr(request.user, "driver") and request.user.driver.role == 'MANAGER':
+        if principal.is_manager:
             if request.method in permissions.SAFE_METHODS or request.method in ['POST', 'PATCH', 'PUT']:
                 return True
         # Drivers can only read
-        if hasattr(request.user, "driver") and request.method in permissions.SAFE_METHODS:
+        if principal.is_driver and request.method in permissions.SAFE_METHODS:
             return True
         return False
 
 
+class RequiredRelationsMixin:
+    """
+    Loads the relations the serializer reads, so listing costs the same number
+    of queries however many rows are returned. Reads also select only the
+    columns the serializer emits, which ?fields= and ?view=summary narrow.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        ordering = [order.lstrip("-") for order in getattr(self, "cursor_ordering", ())]
+        return with_query_plan(
+            queryset,
+            self.get_serializer(),
+            defer=self.request.method in permissions.SAFE_METHODS,
+            extra_columns=ordering,
+        )
+
+
+class ConditionalGetMixin:
+    """
+    Sends ETag and Last-Modified on list and retrieve, and answers 304 Not
+    Modified before serializing anything when the client's copy is current.
+    The validators come from one COUNT/MAX(updated_at) aggregate over the
+    filtered queryset, or over the object once it has passed the permission
+    checks, and include the updated_at of the related rows the serializer
+    reads. Lists only get an ETag, since deletions do not move MAX(updated_at).
+    """
+
+    def get_timestamped_relations(self):
+        return timestamped_relations(self.get_queryset().model, self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        validators = collection_validators(
+            request,
+            self.filter_queryset(self.get_queryset()),
+            self.get_timestamped_relations(),
+        )
+        return conditional_response(
+            request, validators, partial(super().list, request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        validators = aggregate_validators(
+            request,
+            self.get_queryset().filter(pk=instance.pk),
+            self.get_timestamped_relations(),
+        )
+        return conditional_response(
+            request, validators, lambda: Response(self.get_serializer(instance).data)
+        )
+
+
 class UserInfoView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    # Reports profile fields that only the User row has.
+    claims_authentication = False
 
     def get(self, request, *args, **kwargs):
         user = request.user
-        driver = getattr(user, 'driver', None)
+        principal = get_principal(request)
         
         return Response(
             {
@@ -67,97 +188,397 @@ class UserInfoView(generics.GenericAPIView):
                 "email": user.email,
                 "first_name": user.first_name,
                 "last_name": user.last_name,
-                "is_admin": user.is_staff or user.is_superuser,
-                "has_driver": driver is not None,
-                "driver_id": driver.id if driver else None,
-                "role": driver.role if driver else None,
-                "carrier_id": driver.carrier_id if driver else None,
+                "is_admin": principal.is_admin,
+                "has_driver": principal.is_driver,
+                "driver_id": principal.driver_id,
+                "role": principal.role,
+                "carrier_id": principal.carrier_id,
             }
         )
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(
+    ConditionalGetMixin, RequiredRelationsMixin, viewsets.ModelViewSet
+):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
     permission_classes = [IsManagerOrAdminForVehicle]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_staff or user.is_superuser:
+        principal = get_principal(self.request)
+        if principal.is_admin:
             return Vehicle.objects.all()
-        if hasattr(user, "driver") and user.driver.carrier:
-            return Vehicle.objects.filter(carrier=user.driver.carrier)
+        if principal.is_driver and principal.carrier_id is not None:
+            return Vehicle.objects.filter(carrier=principal.carrier_id)
         return Vehicle.objects.none()
 
     def perform_create(self, serializer):
-        user = self.request.user
+        principal = get_principal(self.request)
         # Allow admins and managers to create
-        if user.is_staff or (hasattr(user, 'driver') and user.driver.role == 'MANAGER'):
+        if principal.is_staff or principal.is_manager:
             serializer.save()
         else:
             raise PermissionDenied("You do not have permission to create a vehicle.")
 
 
-class CarrierViewSet(viewsets.ModelViewSet):
+class CarrierViewSet(RequiredRelationsMixin, viewsets.ModelViewSet):
     queryset = Carrier.objects.all()
     serializer_class = CarrierSerializer
     permission_classes = [permissions.IsAdminUser]
 
 
-class DriverViewSet(viewsets.ModelViewSet):
+class DriverViewSet(RequiredRelationsMixin, viewsets.ModelViewSet):
     queryset = Driver.objects.select_related('user', 'carrier').all()
     serializer_class = DriverSerializer
     permission_classes = [IsAdminOrDriverForRead]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_staff or user.is_superuser:
+        principal = get_principal(self.request)
+        if principal.is_admin:
             return Driver.objects.select_related('user', 'carrier').all()
-        if hasattr(user, 'driver') and user.driver.role == 'MANAGER':
-            return Driver.objects.select_related('user', 'carrier').filter(carrier=user.driver.carrier)
+        if principal.is_manager:
+            return Driver.objects.select_related('user', 'carrier').filter(carrier=principal.carrier_id)
+        if principal.is_driver and self.action in self.own_record_actions:
+            return Driver.objects.filter(pk=principal.driver_id)
         return Driver.objects.none()
 
+    # Actions drivers may call on their own record.
+    own_record_actions = ("duty_grid", "recap", "cycle")
+    duty_grid_max_days = 31
+
+    @swagger_auto_schema(
+        operation_description=(
+            "The driver's duty grids for ``days`` days (default 1, at most 31) "
+            "ending on ``date`` (default today): per-status hours, the runs to "
+            "draw, and unlogged and overlapping minute ranges."
+        ),
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="duty-grid",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def duty_grid(self, request, pk=None):
+        driver = self.get_object()
+        try:
+            end = query_date(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            days = int(request.query_params.get("days", 1))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= self.duty_grid_max_days:
+            return Response(
+                {"error": f"days must be between 1 and {self.duty_grid_max_days}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        window = [end - timedelta(days=offset) for offset in reversed(range(days))]
+        grids = driver_day_grids(driver.pk, window)
+        return Response([grids[day].as_dict() for day in window])
+
+    @swagger_auto_schema(
+        operation_description=(
+            "The driver's 70-hour/8-day recap ending on ``date`` (default "
+            "today): on-duty hours per day and the hours still available."
+        ),
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="recap",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def recap(self, request, pk=None):
+        driver = self.get_object()
+        try:
+            today = query_date(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(cycle_recap(driver.pk, today))
+
+    @swagger_auto_schema(
+        operation_description=(
+            "The driver's logged on-duty hours in the 8 days ending on "
+            "``date`` (default today) and the hours left under the 70-hour limit."
+        ),
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="cycle",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def cycle(self, request, pk=None):
+        driver = self.get_object()
+        try:
+            day = query_date(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(driver_cycle_status(driver.pk, day))
+
+
+def query_date(params):
+    """The ``date`` query parameter, or today; a ValueError carries the error."""
+    date_str = params.get("date")
+    if not date_str:
+        return timezone.localdate()
+    try:
+        return date.fromisoformat(date_str)
+    except ValueError:
+        raise ValueError("Invalid date format")
+
+
+def visible_trips(principal):
+    """Trips the principal may access: all for staff, the carrier's for managers, own for drivers."""
+    if principal.is_staff:
+        return Trip.objects.all()
+    if principal.is_driver:
+        # Managers see all trips from drivers in their carrier
+        if principal.is_manager:
+            return Trip.objects.filter(driver__carrier=principal.carrier_id)
+        # Regular drivers see only their own trips
+        return Trip.objects.filter(driver=principal.driver_id)
+    return Trip.objects.none()
+
+
+def own_trips(principal):
+    """
+    Trips the principal may plan and log: all for staff, their own for drivers.
+    Each comes with its driver's cycle window, which the route plan cache
+    key needs.
+    """
+    trips = Trip.objects.select_related("driver__cycle")
+    if principal.is_staff:
+        return trips
+    return trips.filter(driver=principal.driver_id)
+
 
-class TripViewSet(viewsets.ModelViewSet):
+def eld_log_date(data):
+    """The date of an ELD generate request; a ValueError carries the error."""
+    date_str = data.get("date")
+    if not date_str:
+        raise ValueError("Date is required")
+    try:
+        return date.fromisoformat(date_str)
+    except ValueError:
+        raise ValueError("Invalid date format")
+
+
+def eld_log_defaults(data, total_miles):
+    return {
+        "total_idle_hours": data.get("total_idle_hours", 0),
+        "total_engine_hours": data.get("total_engine_hours", 0),
+        "fuel_consumed": data.get("fuel_consumed", 0.0),
+        "total_miles": total_miles,
+    }
+
+
+def flag(data, name):
+    """Whether request data or query parameters set ``name`` to true or 1."""
+    return str(data.get(name, "")).lower() in ("true", "1")
+
+
+def generate_daily_logs(trip, route_data, data):
+    """
+    Upserts an ELD log for every day of the trip's plan and returns the
+    response body. ValueError for an unknown ``timezone``.
+    """
+    logs, days = daily_eld_logs(trip, route_data, parse_timezone(data.get("timezone")))
+    upsert_eld_logs(logs, GENERATED_FIELDS)
+    stored = ELDLog.objects.filter(trip=trip, date__in=[log.date for log in logs])
+    return {
+        "logs": ELDLogSerializer(stored.order_by("date"), many=True).data,
+        "days": days,
+    }
+
+
+def route_response_data(route_data, duty_statuses, plan_version=None):
+    response_data = {"total_miles": route_data.get("total_miles", 0)}
+    if plan_version is not None:
+        response_data["plan_version"] = plan_version
+    response_data["duty_statuses"] = DutyStatusSerializer(duty_statuses, many=True).data
+    return response_data
+
+
+class TripViewSet(ConditionalGetMixin, RequiredRelationsMixin, viewsets.ModelViewSet):
     queryset = Trip.objects.all()
     serializer_class = TripSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ("-start_time", "-id")
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_staff:
-            return Trip.objects.all()
-        if hasattr(user, "driver"):
-            # Managers see all trips from drivers in their carrier
-            if user.driver.role == 'MANAGER':
-                return Trip.objects.filter(driver__carrier=user.driver.carrier)
-            # Regular drivers see only their own trips
-            return Trip.objects.filter(driver=user.driver)
-        return Trip.objects.none()
+        return visible_trips(get_principal(self.request))
+
+    def get_serializer_class(self):
+        if (
+            self.action in ("list", "retrieve")
+            and self.request.query_params.get("view") == "summary"
+        ):
+            return TripSummarySerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
-        user = self.request.user
-        if hasattr(user, "driver"):
-            serializer.save(driver=user.driver)
+        principal = get_principal(self.request)
+        if principal.is_driver:
+            serializer.save(driver_id=principal.driver_id)
         else:
             raise PermissionDenied("You must be a driver to create a trip.")
 
+    @swagger_auto_schema(
+        operation_description=(
+            "Everything the trip page shows in one response: the trip, its "
+            "duty statuses and its ELD logs. Add ?route=true for the computed "
+            "route plan as well."
+        ),
+        responses={200: "Trip bundle", 404: "Trip not found"},
+    )
+    @action(detail=True, methods=["get"], url_path="bundle")
+    def bundle(self, request, pk=None):
+        # get_object() runs the one permission check; the children are then
+        # read with one query each, like their own list endpoints.
+        trip = self.get_object()
+        prefetch_related_objects(
+            [trip],
+            Prefetch(
+                "duty_statuses",
+                queryset=DutyStatus.objects.order_by("start_time", "id"),
+            ),
+            Prefetch("eld_logs", queryset=ELDLog.objects.order_by("date")),
+        )
+        data = {
+            "trip": self.get_serializer(trip).data,
+            "duty_statuses": DutyStatusSerializer(
+                trip.duty_statuses.all(), many=True
+            ).data,
+            "eld_logs": ELDLogSerializer(trip.eld_logs.all(), many=True).data,
+        }
+        if flag(request.query_params, "route"):
+            try:
+                route_data = get_route_plan(trip)
+            except NoRoute as e:
+                return Response(
+                    {"error": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            except ValueError as e:
+                return Response(
+                    {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            data["route"] = {
+                "total_miles": route_data.get("total_miles", 0),
+                "duty_statuses": DutyStatusSerializer(
+                    route_data.get("duty_statuses", []), many=True
+                ).data,
+            }
+        return Response(data)
 
-class DutyStatusViewSet(viewsets.ModelViewSet):
+
+class DutyStatusViewSet(
+    ConditionalGetMixin, RequiredRelationsMixin, viewsets.ModelViewSet
+):
     serializer_class = DutyStatusSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ("start_time", "id")
+    bulk_max_items = 5000
+    bulk_batch_size = 500
 
     def get_queryset(self):
-        return DutyStatus.objects.filter(trip_id=self.kwargs["trip_pk"])
+        # Served by the (trip, start_time) index.
+        return DutyStatus.objects.filter(trip_id=self.kwargs["trip_pk"]).order_by(
+            "start_time"
+        )
 
     def perform_create(self, serializer):
         trip = Trip.objects.get(id=self.kwargs["trip_pk"])
         serializer.save(trip=trip)
 
+    def perform_destroy(self, instance):
+        driver_id = instance.trip.driver_id
+        super().perform_destroy(instance)
+        forget_driver_grids(driver_id)
+        record_cycle_minutes(
+            driver_id, cycle_changes(instance.get_cycle_entry(), None)
+        )
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Upload many duty statuses for a trip at once. Valid items are "
+            "stored; invalid ones are reported by index without failing the batch."
+        ),
+        request_body=DutyStatusSerializer(many=True),
+        responses={201: "All statuses stored", 207: "Some statuses rejected"},
+    )
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request, trip_pk=None):
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"error": "Expected a list of duty statuses"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {"error": f"At most {self.bulk_max_items} duty statuses per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        trip = get_object_or_404(visible_trips(get_principal(request)), id=trip_pk)
+
+        # One serializer validates every item; errors are kept per item.
+        validator = self.get_serializer()
+        statuses = []
+        errors = []
+        for index, item in enumerate(items):
+            try:
+                validated_data = validator.run_validation(item)
+            except ValidationError as exc:
+                errors.append({"index": index, "errors": exc.detail})
+                continue
+            duty_status = DutyStatus(
+                trip=trip, **validator.apply_location(validated_data)
+            )
+            set_cells(duty_status)
+            statuses.append(duty_status)
+
+        with transaction.atomic():
+            statuses = DutyStatus.objects.bulk_create(
+                statuses, batch_size=self.bulk_batch_size
+            )
+            changes = {}
+            for duty_status in statuses:
+                for day, minutes in cycle_changes(
+                    None, duty_status.get_cycle_entry()
+                ).items():
+                    changes[day] = changes.get(day, 0) + minutes
+            record_cycle_minutes(trip.driver_id, changes)
+        forget_driver_grids(trip.driver_id)
+
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif statuses:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {
+                "created": len(statuses),
+                "ids": [duty_status.id for duty_status in statuses],
+                "errors": errors,
+            },
+            status=response_status,
+        )
+
 
-class ELDLogViewSet(viewsets.ModelViewSet):
+class ELDLogViewSet(
+    ConditionalGetMixin, RequiredRelationsMixin, viewsets.ModelViewSet
+):
     serializer_class = ELDLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    # Served by the (trip, date) index; dates are unique per trip.
+    cursor_ordering = ("date",)
 
     def get_queryset(self):
         return ELDLog.objects.filter(trip_id=self.kwargs["trip_pk"])
@@ -178,57 +599,59 @@ class ELDLogGenerateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_description="Generate ELD log data for a trip on a specific date.",
-        responses={201: ELDLogSerializer, 400: "Invalid input", 404: "Trip not found"},
+        operation_description=(
+            "Generate ELD log data for a trip on a specific date, or with "
+            '{"all_days": true} for every day of its route plan, cut at '
+            "midnight in the optional timezone."
+        ),
+        responses={
+            200: "All days generated",
+            201: ELDLogSerializer,
+            400: "Invalid input",
+            404: "Trip not found",
+            422: "No road route joins the trip's locations",
+        },
     )
     def post(self, request, trip_id):
         print("Request user:", request.user)
         try:
-            if request.user.is_staff:
-                trip = Trip.objects.get(id=trip_id)
-            else:
-                trip = Trip.objects.get(id=trip_id, driver=request.user.driver)
+            trip = own_trips(get_principal(request)).get(id=trip_id)
         except Trip.DoesNotExist:
             return Response(
                 {"error": "Trip not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        date_str = request.data.get("date")
-        if not date_str:
-            return Response(
-                {"error": "Date is required"}, status=status.HTTP_400_BAD_REQUEST
-            )
+        if flag(request.data, "all_days"):
+            try:
+                route_data = get_route_plan(trip)
+            except NoRoute as e:
+                return Response(
+                    {"error": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            try:
+                data = generate_daily_logs(trip, route_data, request.data)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(data, status=status.HTTP_200_OK)
 
         try:
-            log_date = date.fromisoformat(date_str)
-        except ValueError:
-            return Response(
-                {"error": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST
-            )
+            log_date = eld_log_date(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        calculator = HOSCalculator(
-            start_time=trip.start_time,
-            current_cycle_hours=trip.current_cycle_hours,
-            pickup_location=trip.get_pickup_location(),
-            dropoff_location=trip.get_dropoff_location(),
-        )
-        route_data = calculator.plan_trip()
         total_miles = request.data.get("total_miles")
         if total_miles is None:
-            total_miles = route_data.get("total_miles", 0)
-        total_idle_hours = request.data.get("total_idle_hours", 0)
-        total_engine_hours = request.data.get("total_engine_hours", 0)
-        fuel_consumed = request.data.get("fuel_consumed", 0.0)
+            try:
+                total_miles = get_route_plan(trip).get("total_miles", 0)
+            except NoRoute as e:
+                return Response(
+                    {"error": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
 
         eld_log, created = ELDLog.objects.update_or_create(
             trip=trip,
             date=log_date,
-            defaults={
-                "total_idle_hours": total_idle_hours,
-                "total_engine_hours": total_engine_hours,
-                "fuel_consumed": fuel_consumed,
-                "total_miles": total_miles,
-            },
+            defaults=eld_log_defaults(request.data, total_miles),
         )
 
         serializer = ELDLogSerializer(eld_log, context={"request": request})
@@ -238,8 +661,87 @@ class ELDLogGenerateView(APIView):
         )
 
 
+class ELDLogIngestView(APIView):
+    """
+    Streams newline-delimited JSON ELD rows and upserts them on (trip, date).
+
+    The body is read line by line and handled in fixed-size chunks, so memory
+    use does not depend on the size of the upload. Each chunk costs one trip
+    visibility query, one upsert and one trip-totals refresh.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    chunk_size = 1000
+    max_reported_errors = 100
+    upsert_fields = [
+        "total_miles",
+        "fuel_consumed",
+        "total_engine_hours",
+        "total_idle_hours",
+    ]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Upsert ELD logs from an application/x-ndjson body, one JSON object "
+            "per line with trip, date, total_miles and optional fuel_consumed, "
+            "total_engine_hours and total_idle_hours."
+        ),
+        responses={200: "Ingest summary with per-line errors"},
+    )
+    def post(self, request):
+        principal = get_principal(request)
+        summary = {"rows": 0, "upserted": 0, "error_count": 0, "errors": []}
+        chunk = []
+        # Iterating the Django request reads the body one line at a time.
+        for line_number, line in enumerate(request._request, start=1):
+            if not line.strip():
+                continue
+            summary["rows"] += 1
+            chunk.append((line_number, line))
+            if len(chunk) >= self.chunk_size:
+                self.ingest_chunk(principal, chunk, summary)
+                chunk = []
+        if chunk:
+            self.ingest_chunk(principal, chunk, summary)
+        return Response(summary, status=status.HTTP_200_OK)
+
+    def ingest_chunk(self, principal, chunk, summary):
+        validator = ELDLogIngestSerializer()
+        rows = []
+        for line_number, line in chunk:
+            try:
+                rows.append((line_number, validator.run_validation(json.loads(line))))
+            except ValueError:
+                self.report_error(summary, line_number, "Invalid JSON")
+            except ValidationError as exc:
+                self.report_error(summary, line_number, exc.detail)
+
+        allowed_trips = set(
+            visible_trips(principal)
+            .filter(id__in={row["trip"] for _, row in rows})
+            .values_list("id", flat=True)
+        )
+        # Later lines win when a chunk repeats a (trip, date) pair.
+        logs = {}
+        for line_number, row in rows:
+            if row["trip"] not in allowed_trips:
+                self.report_error(summary, line_number, "Trip not found")
+                continue
+            trip_id = row.pop("trip")
+            logs[trip_id, row["date"]] = ELDLog(trip_id=trip_id, **row)
+
+        upsert_eld_logs(logs.values(), self.upsert_fields)
+        summary["upserted"] += len(logs)
+
+    def report_error(self, summary, line_number, errors):
+        summary["error_count"] += 1
+        if len(summary["errors"]) < self.max_reported_errors:
+            summary["errors"].append({"line": line_number, "errors": errors})
+
+
 class ELDLogListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ("date",)
 
     @swagger_auto_schema(
         operation_description="List ELD logs for a trip.",
@@ -248,60 +750,599 @@ class ELDLogListView(APIView):
     def get(self, request, trip_id):
         print("Request user:", request.user)
         try:
-            if request.user.is_staff:
+            principal = get_principal(request)
+            if principal.is_staff:
                 trip = Trip.objects.get(id=trip_id)
             else:
-                trip = Trip.objects.get(id=trip_id, driver=request.user.driver)
+                trip = Trip.objects.get(id=trip_id, driver=principal.driver_id)
         except Trip.DoesNotExist:
             return Response(
                 {"error": "Trip not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
         eld_logs = ELDLog.objects.filter(trip=trip)
-        serializer = ELDLogSerializer(eld_logs, many=True, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return conditional_response(
+            request,
+            collection_validators(request, eld_logs),
+            lambda: self.render_logs(request, eld_logs),
+        )
+
+    def render_logs(self, request, eld_logs):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(eld_logs, request, view=self)
+        serializer = ELDLogSerializer(page, many=True, context={"request": request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class RouteCalculationAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_description="Calculate route and HOS-compliant schedule for a trip.",
+        operation_description=(
+            "Calculate route and HOS-compliant schedule for a trip. "
+            'Send {"persist": true} to store the schedule as duty statuses.'
+        ),
         responses={
             200: DutyStatusSerializer(many=True),
             404: "Trip not found",
+            422: "No road route joins the trip's locations",
             500: "Route calculation failed",
         },
     )
     def post(self, request, trip_id):
         try:
-            if request.user.is_staff:
-                trip = Trip.objects.get(id=trip_id)
-            else:
-                trip = Trip.objects.get(id=trip_id, driver=request.user.driver)
+            trip = own_trips(get_principal(request)).get(id=trip_id)
         except Trip.DoesNotExist:
             return Response(
                 {"error": "Trip not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
         try:
-            calculator = HOSCalculator(
-                start_time=trip.start_time,
-                current_cycle_hours=trip.current_cycle_hours,
-                pickup_location=trip.get_pickup_location(),
-                dropoff_location=trip.get_dropoff_location(),
-            )
-            route_data = calculator.plan_trip()
-            duty_statuses = route_data.get("duty_statuses", [])
-            serializer = DutyStatusSerializer(duty_statuses, many=True)
+            route_data = get_route_plan(trip)
+            if flag(request.data, "persist"):
+                # Store the plan so duty-status reads no longer need a re-plan.
+                duty_statuses = trip.materialize_plan(route_data)
+                response_data = route_response_data(
+                    route_data, duty_statuses, trip.plan_version
+                )
+            else:
+                response_data = route_response_data(
+                    route_data, route_data.get("duty_statuses", [])
+                )
+            return Response(response_data, status=status.HTTP_200_OK)
+        except NoRoute as e:
             return Response(
-                {
-                    "duty_statuses": serializer.data,
-                    "total_miles": route_data.get("total_miles", 0),
-                },
-                status=status.HTTP_200_OK,
+                {"error": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY
             )
         except ValueError as e:
             return Response(
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class AsyncAPIView(View):
+    """
+    The async counterpart of APIView used by the planning endpoints. It
+    authenticates with the configured DRF authenticators, requires an
+    authenticated user and renders JSON, and its handlers await the ORM and
+    the planning pool rather than holding a worker thread while they plan.
+    Handlers receive the DRF request and the request's principal.
+    """
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    # Every handler must be async.
+    http_method_names = ["post"]
+    # Seconds a client is asked to wait when the planning pool is full.
+    busy_retry_after = 1
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token-authenticated like every APIView.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[auth() for auth in self.authentication_classes],
+            parser_context={"view": self, "args": args, "kwargs": kwargs},
+        )
+        try:
+            principal = await sync_to_async(self.authenticate)(request)
+            if request.method.lower() not in self.http_method_names:
+                raise MethodNotAllowed(request.method)
+            handler = getattr(self, request.method.lower())
+            return await handler(request, *args, principal=principal, **kwargs)
+        except APIException as exc:
+            headers = {}
+            if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+                headers["WWW-Authenticate"] = request.authenticators[
+                    0
+                ].authenticate_header(request)
+            return self.render({"detail": exc.detail}, exc.status_code, headers)
+        except PlannerBusy:
+            return self.render(
+                {"error": "Too many route plans in progress, retry shortly"},
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                {"Retry-After": str(self.busy_retry_after)},
+            )
+        except PlannerUnavailable:
+            return self.render(
+                {"error": "Route planning is unavailable"},
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+    def authenticate(self, request):
+        if not request.user.is_authenticated:
+            raise NotAuthenticated()
+        return get_principal(request)
+
+    def render(self, data, status_code=status.HTTP_200_OK, headers=None):
+        response = Response(data, status=status_code, headers=headers)
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = JSONRenderer.media_type
+        response.renderer_context = {}
+        return response.render()
+
+
+class AsyncRouteCalculationView(AsyncAPIView):
+    """RouteCalculationAPIView with the plan computed in the planning pool."""
+
+    async def post(self, request, trip_id, principal):
+        try:
+            trip = await own_trips(principal).aget(id=trip_id)
+        except Trip.DoesNotExist:
+            return self.render({"error": "Trip not found"}, status.HTTP_404_NOT_FOUND)
+
+        try:
+            route_data = await aget_route_plan(trip)
+        except NoRoute as e:
+            return self.render({"error": str(e)}, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        except ValueError as e:
+            return self.render({"error": str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if flag(request.data, "persist"):
+            duty_statuses = await sync_to_async(trip.materialize_plan)(route_data)
+            return self.render(
+                route_response_data(route_data, duty_statuses, trip.plan_version)
+            )
+        return self.render(
+            route_response_data(route_data, route_data.get("duty_statuses", []))
+        )
+
+
+class AsyncELDLogGenerateView(AsyncAPIView):
+    """ELDLogGenerateView with the route plan computed in the planning pool."""
+
+    async def post(self, request, trip_id, principal):
+        try:
+            trip = await own_trips(principal).aget(id=trip_id)
+        except Trip.DoesNotExist:
+            return self.render({"error": "Trip not found"}, status.HTTP_404_NOT_FOUND)
+
+        if flag(request.data, "all_days"):
+            try:
+                route_data = await aget_route_plan(trip)
+            except NoRoute as e:
+                return self.render(
+                    {"error": str(e)}, status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            try:
+                data = await sync_to_async(generate_daily_logs)(
+                    trip, route_data, request.data
+                )
+            except ValueError as e:
+                return self.render({"error": str(e)}, status.HTTP_400_BAD_REQUEST)
+            return self.render(data)
+
+        try:
+            log_date = eld_log_date(request.data)
+        except ValueError as e:
+            return self.render({"error": str(e)}, status.HTTP_400_BAD_REQUEST)
+
+        total_miles = request.data.get("total_miles")
+        if total_miles is None:
+            try:
+                total_miles = (await aget_route_plan(trip)).get("total_miles", 0)
+            except NoRoute as e:
+                return self.render(
+                    {"error": str(e)}, status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+
+        eld_log, created = await ELDLog.objects.aupdate_or_create(
+            trip=trip,
+            date=log_date,
+            defaults=eld_log_defaults(request.data, total_miles),
+        )
+        serializer = ELDLogSerializer(eld_log, context={"request": request})
+        return self.render(
+            serializer.data,
+            status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class DispatchView(APIView):
+    """
+    Ranks a carrier's available drivers and vehicles for a load picked up at
+    the given coordinate. Managers rank their own carrier; staff name one.
+    """
+
+    permission_classes = [IsManagerOrStaff]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Drivers nearest the pickup whose remaining 70-hour cycle covers "
+            "the drive there plus ``hours_needed``, and the nearest vehicles."
+        ),
+        query_serializer=DispatchQuerySerializer,
+    )
+    def get(self, request):
+        params = DispatchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+        principal = get_principal(request)
+        if not principal.is_staff:
+            carrier_id = principal.carrier_id
+        elif "carrier" in params:
+            carrier_id = params["carrier"]
+        else:
+            return Response(
+                {"error": "carrier is required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        pickup = (params["latitude"], params["longitude"], params["radius_miles"])
+        return Response(
+            {
+                "pickup": [params["longitude"], params["latitude"]],
+                "drivers": dispatch.rank_drivers(
+                    carrier_id,
+                    *pickup,
+                    hours_needed=params["hours_needed"],
+                    limit=params["limit"],
+                ),
+                "vehicles": dispatch.rank_vehicles(
+                    carrier_id, *pickup, limit=params["limit"]
+                ),
+            }
+        )
+
+
+class MapView(APIView):
+    """
+    Base of the /api/map/ endpoints: the visible rows whose point lies in a
+    bounding box or radius, as a GeoJSON FeatureCollection for Leaflet's
+    ``L.geoJSON()``. Radius queries come back nearest first with
+    ``distance_miles``; ``truncated`` tells when ``limit`` cut the list.
+    """
+
+    query_serializer_class = MapQuerySerializer
+    property_fields = ()
+
+    def get_queryset(self, principal):
+        raise NotImplementedError
+
+    def get_point_fields(self, params):
+        """The (cell, latitude, longitude) columns of each row's point."""
+        raise NotImplementedError
+
+    @swagger_auto_schema(query_serializer=MapQuerySerializer)
+    def get(self, request):
+        params = self.query_serializer_class(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+        cell, latitude, longitude = self.get_point_fields(params)
+        rows = (
+            self.get_queryset(get_principal(request))
+            .filter(within_box(params["box"], cell, latitude, longitude))
+            .values_list("id", *self.property_fields, latitude, longitude)
+        )
+        limit = params["limit"]
+        if "center" in params:
+            points = within_radius(rows, *params["center"])
+        else:
+            points = [(row, None) for row in rows.order_by("id")[: limit + 1]]
+        return Response(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    self.feature(row, distance) for row, distance in points[:limit]
+                ],
+                "truncated": len(points) > limit,
+            }
+        )
+
+    def feature(self, row, distance):
+        properties = dict(zip(self.property_fields, row[1:-2]))
+        if distance is not None:
+            properties["distance_miles"] = round(distance, 1)
+        return {
+            "type": "Feature",
+            "id": row[0],
+            "geometry": {"type": "Point", "coordinates": [row[-1], row[-2]]},
+            "properties": properties,
+        }
+
+
+class TripMapView(MapView):
+    """Trips by their pickup (default), dropoff or current position."""
+
+    query_serializer_class = TripMapQuerySerializer
+    property_fields = (
+        "driver_id",
+        "status",
+        "start_time",
+        "pickup_location_name",
+        "dropoff_location_name",
+    )
+
+    def get_queryset(self, principal):
+        return visible_trips(principal)
+
+    def get_point_fields(self, params):
+        point = params["point"]
+        return f"{point}_cell", f"{point}_latitude", f"{point}_longitude"
+
+    @swagger_auto_schema(query_serializer=TripMapQuerySerializer)
+    def get(self, request):
+        return super().get(request)
+
+
+class PositionMapView(MapView):
+    """Where each visible driver is: the current position of their latest trip."""
+
+    property_fields = ("driver_id", "status", "current_location_name", "updated_at")
+
+    def get_queryset(self, principal):
+        latest = (
+            Trip.objects.filter(driver=OuterRef("driver"))
+            .order_by("-start_time", "-id")
+            .values("id")[:1]
+        )
+        return visible_trips(principal).filter(id=Subquery(latest))
+
+    def get_point_fields(self, params):
+        return "current_cell", "current_latitude", "current_longitude"
+
+
+class DutyStatusMapView(MapView):
+    """Duty statuses of visible trips by where they were logged or planned."""
+
+    property_fields = (
+        "trip_id",
+        "status",
+        "start_time",
+        "end_time",
+        "location_description",
+        "plan_version",
+    )
+
+    def get_queryset(self, principal):
+        return DutyStatus.objects.filter(trip__in=visible_trips(principal))
+
+    def get_point_fields(self, params):
+        return "cell", "latitude", "longitude"
+
+
+class AnalyticsView(APIView):
+    """
+    Base for the /api/analytics/ endpoints. Aggregates run over the daily
+    rollups of the carriers and drivers whose trips the user could list,
+    optionally limited to a date range.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = AnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(self.compute(params.validated_data))
+
+    def compute(self, params):
+        raise NotImplementedError
+
+    def get_rollups(self, params, per_driver=False):
+        """
+        Rollups scoped like visible_trips(): every carrier for staff, the
+        carrier's drivers for managers, their own rows for drivers.
+        """
+        principal = get_principal(self.request)
+        if principal.is_staff:
+            model = DriverDailyRollup if per_driver else CarrierDailyRollup
+            rollups = model.objects.all()
+        elif principal.is_manager:
+            if per_driver:
+                rollups = DriverDailyRollup.objects.filter(
+                    driver__carrier=principal.carrier_id
+                )
+            else:
+                rollups = CarrierDailyRollup.objects.filter(carrier=principal.carrier_id)
+        elif principal.is_driver:
+            rollups = DriverDailyRollup.objects.filter(driver=principal.driver_id)
+        else:
+            rollups = CarrierDailyRollup.objects.none()
+        if "start" in params:
+            rollups = rollups.filter(day__gte=params["start"])
+        if "end" in params:
+            rollups = rollups.filter(day__lte=params["end"])
+        return rollups
+
+
+class FleetSummaryView(AnalyticsView):
+    @swagger_auto_schema(
+        operation_description="Fleet totals and trip counts by status.",
+        query_serializer=AnalyticsQuerySerializer,
+    )
+    def get(self, request):
+        return super().get(request)
+
+    def compute(self, params):
+        return analytics.fleet_summary(self.get_rollups(params))
+
+
+class CarrierAnalyticsView(AnalyticsView):
+    @swagger_auto_schema(
+        operation_description="Totals per carrier.",
+        query_serializer=AnalyticsQuerySerializer,
+    )
+    def get(self, request):
+        return super().get(request)
+
+    def compute(self, params):
+        return analytics.carrier_totals(self.get_rollups(params))
+
+
+class DriverAnalyticsView(AnalyticsView):
+    @swagger_auto_schema(
+        operation_description="Totals per driver, largest mileage first.",
+        query_serializer=AnalyticsQuerySerializer,
+    )
+    def get(self, request):
+        return super().get(request)
+
+    def compute(self, params):
+        return analytics.driver_totals(self.get_rollups(params, per_driver=True))
+
+
+class DailyAnalyticsView(AnalyticsView):
+    @swagger_auto_schema(
+        operation_description=(
+            "Trips started and ELD miles, fuel, engine and idle hours per day; "
+            "per day and carrier with by=carrier."
+        ),
+        query_serializer=AnalyticsQuerySerializer,
+    )
+    def get(self, request):
+        return super().get(request)
+
+    def compute(self, params):
+        return analytics.daily_totals(
+            self.get_rollups(params), by_carrier=params.get("by") == "carrier"
+        )
+
+
+class BatchView(APIView):
+    """
+    Runs several GET requests against the core API in one round trip.
+
+    Sub-requests are dispatched straight to their views: they skip the
+    middleware and token checks, share the batch's user and principal, and
+    run one after another on the same database connection. Each view still
+    applies its own permissions and querysets, so a batch returns exactly
+    what the separate requests would have.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    # user-info needs the full User row, so load it once for the whole batch.
+    claims_authentication = False
+    url_prefix = "/api/"
+    batch_max_items = 20
+    # Headers of the batch request that must not leak into its sub-requests.
+    dropped_headers = (
+        "CONTENT_LENGTH",
+        "CONTENT_TYPE",
+        "HTTP_IF_NONE_MATCH",
+        "HTTP_IF_MODIFIED_SINCE",
+        "HTTP_IF_MATCH",
+        "HTTP_IF_UNMODIFIED_SINCE",
+    )
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Run up to 20 GET requests in one call, e.g. "
+            '[{"path": "/api/trips/"}, {"path": "/api/user-info/"}]. '
+            "Responses come back in order, each with its own status code."
+        ),
+        request_body=BatchRequestSerializer(many=True),
+        responses={200: "One {path, status, body} item per sub-request"},
+    )
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {"error": "Expected a list of requests"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(request.data) > self.batch_max_items:
+            return Response(
+                {"error": f"At most {self.batch_max_items} requests per batch"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        items = BatchRequestSerializer(data=request.data, many=True)
+        items.is_valid(raise_exception=True)
+
+        principal = get_principal(request)
+        results = []
+        for item in items.validated_data:
+            response = self.dispatch_item(request, principal, item)
+            results.append(
+                {
+                    "path": item["path"],
+                    "status": response.status_code,
+                    "body": self.response_body(response),
+                }
+            )
+        return Response(results)
+
+    def dispatch_item(self, request, principal, item):
+        if item["method"] != "GET":
+            return Response(
+                {"error": "Only GET requests can be batched"},
+                status=status.HTTP_405_METHOD_NOT_ALLOWED,
+            )
+        url = urlsplit(item["path"])
+        if not url.path.startswith(self.url_prefix):
+            return Response(
+                {"error": f"Paths must start with {self.url_prefix}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            match = resolve(
+                url.path[len(self.url_prefix) - 1 :], urlconf="apps.core.urls"
+            )
+        except Resolver404:
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        if getattr(match.func, "view_class", None) is type(self):
+            return Response(
+                {"error": "Batches cannot be nested"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        sub_request = self.build_request(request, url)
+        sub_request.resolver_match = match
+        remember_principal(sub_request, principal)
+        view = match.func
+        if asyncio.iscoroutinefunction(view):
+            # The planning endpoints are async views; run them to completion.
+            view = async_to_sync(view)
+        try:
+            return view(sub_request, *match.args, **match.kwargs)
+        except Http404:
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    def build_request(self, request, url):
+        """A GET HttpRequest for ``url``, authenticated as the batch's user."""
+        sub_request = HttpRequest()
+        sub_request.method = "GET"
+        sub_request.path = sub_request.path_info = url.path
+        sub_request.META = {
+            key: value
+            for key, value in request._request.META.items()
+            if key not in self.dropped_headers
+        }
+        sub_request.META.update(
+            REQUEST_METHOD="GET", PATH_INFO=url.path, QUERY_STRING=url.query
+        )
+        sub_request.GET = QueryDict(url.query)
+        # DRF authenticates requests carrying these without reading the token.
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        return sub_request
+
+    @staticmethod
+    def response_body(response):
+        if hasattr(response, "data"):
+            return response.data
+        if not response.content:
+            return None
+        try:
+            return json.loads(response.content)
+        except ValueError:
+            return response.content.decode(errors="replace")
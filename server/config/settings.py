@@ -67,13 +67,23 @@ CORS_ALLOW_HEADERS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.authentication.authentication.JWTClaimsAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
 }
 
+SIMPLE_JWT = {
+    "TOKEN_REFRESH_SERIALIZER": "apps.authentication.serializers.PrincipalTokenRefreshSerializer",
+}
+
+# Requests with these methods are authorized from the access token's claims
+# alone; others load the user. Views can opt out with claims_authentication.
+JWT_CLAIMS_AUTH_METHODS = env.list(
+    "JWT_CLAIMS_AUTH_METHODS", default=["GET", "HEAD", "OPTIONS"]
+)
+
 CORS_ALLOW_CREDENTIALS = True
 
 # Application definition
@@ -145,6 +155,69 @@ else:
     }
 
 
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Set REDIS_URL to share cached data (e.g. route plans) between workers.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": env("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Route plans are cached per process (LRU, MAX_ENTRIES) and in the cache above.
+ROUTE_PLAN_CACHE = {
+    "MAX_ENTRIES": env.int("ROUTE_PLAN_CACHE_MAX_ENTRIES", default=1024),
+    "TIMEOUT": env.int("ROUTE_PLAN_CACHE_TIMEOUT", default=60 * 60 * 24),
+    "CACHE_ALIAS": "default",
+}
+
+
+# The route and ELD-generate endpoints are async views that plan in this many
+# worker processes; requests past MAX_PENDING queued or running plans get 429.
+# PLANNING_POOL_WORKERS=0 serves the synchronous views, planning in-thread.
+PLANNING_POOL = {
+    "WORKERS": env.int("PLANNING_POOL_WORKERS", default=2),
+    "MAX_PENDING": env.int("PLANNING_POOL_MAX_PENDING", default=16),
+}
+
+
+# Route distances and driving times: "great_circle" plans a straight line at
+# 50 mph; "road_graph" routes over the file `manage.py build_road_graph` writes.
+ROUTING = {
+    "BACKEND": env("ROUTING_BACKEND", default="great_circle"),
+    "GRAPH_PATH": env("ROUTING_GRAPH_PATH", default=""),
+}
+
+# Plans add a 30-minute fueling stop after every 1000 miles only when this is
+# on or a station index is configured.
+PLAN_FUEL_STOPS = env.bool("PLAN_FUEL_STOPS", default=False)
+
+# Truck stops `manage.py build_fuel_stations` indexed; plans put their fueling
+# stops at the station nearest the route. Unset, stops have no location.
+FUEL_STATIONS_PATH = env("FUEL_STATIONS_PATH", default="")
+
+
+# Resolved request principals (user, driver, role, carrier) are cached this long.
+# Only a shared cache sees every worker's invalidations, so without REDIS_URL
+# principals are resolved once per request instead.
+PRINCIPAL_CACHE_TIMEOUT = env.int(
+    "PRINCIPAL_CACHE_TIMEOUT", default=60 * 5 if os.environ.get("REDIS_URL") else 0
+)
+
+
+# Per-driver daily duty grids are cached this long; writes invalidate them.
+DUTY_GRID_CACHE_TIMEOUT = env.int("DUTY_GRID_CACHE_TIMEOUT", default=60 * 60 * 24)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 